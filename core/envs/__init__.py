@@ -1 +1,2 @@
 from core.envs.water_management_system import WaterManagementSystem
+from core.envs.batched_water_management_system import BatchedWaterManagementSystem
@@ -0,0 +1,721 @@
+import copy
+import numpy as np
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+from gymnasium.core import ObsType
+from gymnasium.vector.utils import batch_space
+from scipy.constants import g
+from typing import Any, Union, Optional
+from core.envs.water_management_system import WaterManagementSystem
+from core.models.catchment import Catchment
+from core.models.facility import Facility, ControlledFacility
+from core.models.flow import Flow, Inflow, Outflow
+from core.models.irrigation_district import IrrigationDistrict
+from core.models.power_plant import PowerPlant
+from core.models.reservoir import Reservoir
+from core.utils import utils
+
+
+def _evaluate_objective(objective_function, n_envs: int, *args) -> np.ndarray:
+    """
+    Evaluates a scalar objective function once per scenario.
+
+    Objective functions are plain Python callables (often lambdas with conditionals), so they are applied
+    element-wise rather than on whole arrays.
+    """
+    args = np.broadcast_arrays(*[np.broadcast_to(arg, (n_envs,)) for arg in args])
+    return np.fromiter((objective_function(*values) for values in zip(*args)), dtype=np.float64, count=n_envs)
+
+
+def _interpolate_tailwater_level(X: np.ndarray, Y: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    Vectorized counterpart of `core.utils.utils.interpolate_tailwater_level`, extrapolating linearly outside X.
+    """
+    dim = len(X) - 1
+    below = (x - X[0]) * (Y[1] - Y[0]) / (X[1] - X[0]) + Y[0]
+    above = Y[dim] + (Y[dim] - Y[dim - 1]) / (X[dim] - X[dim - 1]) * (x - X[dim])
+    return np.where(x <= X[0], below, np.where(x >= X[dim], above, np.interp(x, X, Y)))
+
+
+class _BatchedNode:
+    """
+    State of one water system for all scenarios of a batch, mirroring the Facility inflow/outflow interface with
+    (n_envs,) arrays instead of floats.
+    """
+
+    def __init__(self, system: Union[Facility, ControlledFacility, Flow], n_envs: int) -> None:
+        self.system = system
+        self.name: str = system.name
+        self.n_envs: int = n_envs
+        self.controlled: bool = isinstance(system, ControlledFacility)
+        self.objective_name: str = getattr(system, "objective_name", "")
+        self.timestep: int = 0
+        self.all_inflow: list[np.ndarray] = []
+        self.all_outflow: list[np.ndarray] = []
+        self.split_release: Optional[np.ndarray] = None
+        self.has_split_release: np.ndarray = np.zeros(n_envs, dtype=bool)
+
+    def get_inflow(self, timestep: int) -> np.ndarray:
+        return self.all_inflow[timestep]
+
+    def set_inflow(self, timestep: int, inflow: np.ndarray) -> None:
+        if len(self.all_inflow) == timestep:
+            self.all_inflow.append(np.array(inflow, dtype=np.float64))
+        elif len(self.all_inflow) > timestep:
+            self.all_inflow[timestep] += inflow
+        else:
+            raise IndexError
+
+    def get_outflow(self, timestep: int) -> np.ndarray:
+        return self.all_outflow[timestep]
+
+    def current_level(self) -> np.ndarray:
+        return np.zeros(self.n_envs)
+
+    def step(self, current_date: datetime, actions: Optional[np.ndarray] = None):
+        raise NotImplementedError()
+
+    def get_state(self) -> np.ndarray:
+        """
+        Returns the state of the node per scenario, of shape (n_envs, k), each row in the layout of `get_state` of
+        the scalar water system.
+        """
+        return np.empty((self.n_envs, 0), dtype=np.float64)
+
+    def set_state(self, state: np.ndarray, timestep: int) -> None:
+        """
+        Restores the states returned by `get_state` and rewinds the inflow and outflow histories to `timestep`;
+        timesteps that were not recorded are NaN.
+        """
+        self.timestep = timestep
+        self.all_inflow = self._rewind(self.all_inflow, timestep)
+        self.all_outflow = self._rewind(self.all_outflow, timestep)
+
+    def _rewind(self, history: list[np.ndarray], timestep: int) -> list[np.ndarray]:
+        return history[:timestep] + [np.full(self.n_envs, np.nan) for _ in range(timestep - len(history))]
+
+    def reset(self) -> None:
+        self.timestep = 0
+        self.all_inflow = []
+        self.all_outflow = []
+        self.split_release = None
+        self.has_split_release = np.zeros(self.n_envs, dtype=bool)
+
+
+class _BatchedCatchment(_BatchedNode):
+    def step(self, current_date, actions=None):
+        system: Catchment = self.system
+        outflow = system.get_inflow(self.timestep) - system.determine_consumption()
+        self.all_outflow.append(np.full(self.n_envs, outflow, dtype=np.float64))
+        truncated = self.timestep >= len(system.all_water_accumulated)
+        self.timestep += 1
+        return None, np.zeros(self.n_envs), np.zeros(self.n_envs, dtype=bool), truncated
+
+
+class _BatchedIrrigationDistrict(_BatchedNode):
+    def __init__(self, system: IrrigationDistrict, n_envs: int) -> None:
+        super().__init__(system, n_envs)
+        # Like IrrigationDistrict.total_deficit, only part of the state and not updated by a step.
+        self.total_deficit: np.ndarray = np.zeros(n_envs)
+
+    def get_state(self) -> np.ndarray:
+        return self.total_deficit[:, None].copy()
+
+    def set_state(self, state: np.ndarray, timestep: int) -> None:
+        super().set_state(state, timestep)
+        self.total_deficit = state[:, 0].astype(np.float64)
+
+    def reset(self) -> None:
+        super().reset()
+        self.total_deficit = np.zeros(self.n_envs)
+
+    def step(self, current_date, actions=None):
+        system: IrrigationDistrict = self.system
+        demand = system.all_demand[self.timestep % len(system.all_demand)]
+        inflow = self.get_inflow(self.timestep)
+        consumption = np.minimum(demand, inflow)
+        self.all_outflow.append(inflow - consumption)
+
+        reward = _evaluate_objective(system.objective_function, self.n_envs, demand, inflow)
+        if system.normalize_objective > 0.0:
+            reward = reward / system.normalize_objective
+        truncated = self.timestep >= len(system.all_demand)
+        self.timestep += 1
+        return None, reward, np.zeros(self.n_envs, dtype=bool), truncated
+
+
+class _BatchedPowerPlant(_BatchedNode):
+    def __init__(self, system: PowerPlant, n_envs: int, reservoir: Optional[_BatchedNode]) -> None:
+        super().__init__(system, n_envs)
+        self.reservoir = reservoir
+        self.production_vector: list[np.ndarray] = []
+        self.total_production: np.ndarray = np.zeros(n_envs)
+
+    def determine_production(self, turbine_flow: np.ndarray, timestep_hours: float) -> np.ndarray:
+        system: PowerPlant = self.system
+        m3_to_kg_factor: int = 1000
+        w_Mw_conversion: float = 1e-6
+        head = np.maximum(0.0, self.reservoir.current_level() - system.head_start_level)
+        power_in_mw = np.minimum(
+            system.max_capacity,
+            turbine_flow * head * m3_to_kg_factor * g * system.efficiency * w_Mw_conversion,
+        )
+        return power_in_mw * timestep_hours
+
+    def determine_production_detailed(self, turbine_flow: np.ndarray, timestep_hours: float) -> np.ndarray:
+        system: PowerPlant = self.system
+        cubicFeetToCubicMeters = 0.0283  # 1 cf = 0.0283 m3
+        feetToMeters = 0.3048  # 1 ft = 0.3048 m
+        m3_to_kg_factor = 1000
+        p = np.zeros(self.n_envs)
+        deltaH = self.reservoir.current_level() - _interpolate_tailwater_level(
+            system.tailwater[0], system.tailwater[1], turbine_flow
+        )
+
+        q_split = turbine_flow
+        for j in range(0, system.n_turbines):
+            qturb = np.where(
+                q_split < system.turbines[1][j],
+                0.0,
+                np.where(q_split > system.turbines[0][j], system.turbines[0][j], q_split),
+            )
+            q_split = q_split - qturb
+            p = p + (
+                system.efficiency
+                * g
+                * m3_to_kg_factor
+                * (cubicFeetToCubicMeters * qturb)
+                * (feetToMeters * deltaH)
+                * 3600
+                / (3600 * 1000)
+            )
+        return p * timestep_hours
+
+    def step(self, current_date, actions=None):
+        system: PowerPlant = self.system
+        inflow = self.get_inflow(self.timestep)
+        turbine_flow = np.maximum(system.min_turbine_flow, np.minimum(system.max_turbine_flow, inflow))
+        self.all_outflow.append(inflow - turbine_flow * system.water_usage)
+
+        timestep_hours = system.calendar.seconds(self.timestep) / 3600
+        if system.turbines is not None and system.tailwater is not None:
+            production = self.determine_production_detailed(turbine_flow, timestep_hours)
+        else:
+            production = self.determine_production(turbine_flow, timestep_hours)
+        self.production_vector.append(production)
+        self.total_production = self.total_production + production
+
+        reward = _evaluate_objective(system.objective_function, self.n_envs, production)
+        if system.normalize_objective > 0.0:
+            reward = reward / system.normalize_objective
+        self.timestep += 1
+        return None, reward, np.zeros(self.n_envs, dtype=bool), False
+
+    def get_state(self) -> np.ndarray:
+        return self.total_production[:, None].copy()
+
+    def set_state(self, state: np.ndarray, timestep: int) -> None:
+        super().set_state(state, timestep)
+        self.total_production = state[:, 0].astype(np.float64)
+        self.production_vector = self._rewind(self.production_vector, timestep)
+
+    def reset(self) -> None:
+        super().reset()
+        self.production_vector = []
+        self.total_production = np.zeros(self.n_envs)
+
+
+class _BatchedReservoir(_BatchedNode):
+    def __init__(self, system: Reservoir, n_envs: int) -> None:
+        super().__init__(system, n_envs)
+        self.initial_storage: float = system.initial_stored_water
+        self.stored_water: np.ndarray = np.full(n_envs, self.initial_storage, dtype=np.float64)
+        self.level: Optional[np.ndarray] = None
+        self.storage_to_surface_rel = np.asarray(system.storage_to_surface_rel, dtype=np.float64)
+        self.storage_to_minmax_rel = np.asarray(system.storage_to_minmax_rel, dtype=np.float64)
+
+    def current_level(self) -> np.ndarray:
+        return self.level if self.level is not None else np.zeros(self.n_envs)
+
+    def determine_observation(self) -> np.ndarray:
+        return np.where(self.stored_water > 0, self.stored_water, 0.0)
+
+    def step(self, current_date, actions=None):
+        system: Reservoir = self.system
+        actions = actions * np.asarray(system.max_action)
+        total_action = actions.reshape(self.n_envs, -1).sum(axis=1)
+        inflow = self.get_inflow(self.timestep)
+        current_storage = self.stored_water
+
+        calendar = system.calendar
+        timestep_seconds = calendar.period_seconds(self.timestep + 1, system.evap_rates_timestep)
+        time_idx = calendar.time_idx(self.timestep, system.evap_rates_timestep)
+        evaporatio_rate_per_second = system.evap_rates[time_idx] / (100 * timestep_seconds)
+
+        current_storage, average_release = utils.integrate_reservoir(
+            current_storage,
+            inflow,
+            total_action,
+            calendar.substeps(self.timestep, system.integration_timestep_size).seconds,
+            evaporatio_rate_per_second,
+            system.spillage,
+            self.storage_to_surface_rel,
+            self.storage_to_minmax_rel,
+        )
+
+        self.stored_water = current_storage
+        self.level = np.interp(current_storage, system.storage_to_level_rel[0], system.storage_to_level_rel[1])
+        self.all_outflow.append(average_release)
+
+        reward = _evaluate_objective(system.objective_function, self.n_envs, self.level)
+        terminated = (self.stored_water > system.max_capacity) | (self.stored_water < 0)
+        self.timestep += 1
+        return self.determine_observation(), reward, terminated, False
+
+    def get_state(self) -> np.ndarray:
+        return self.stored_water[:, None].copy()
+
+    def set_state(self, state: np.ndarray, timestep: int) -> None:
+        super().set_state(state, timestep)
+        self.stored_water = state[:, 0].astype(np.float64)
+        # As in Reservoir.set_state, the level is only known once the reservoir has stepped.
+        system: Reservoir = self.system
+        self.level = (
+            np.interp(self.stored_water, system.storage_to_level_rel[0], system.storage_to_level_rel[1])
+            if timestep > 0
+            else None
+        )
+
+    def reset(self) -> None:
+        super().reset()
+        self.stored_water = np.full(self.n_envs, self.initial_storage, dtype=np.float64)
+        self.level = None
+
+
+class _BatchedFlow(_BatchedNode):
+    def __init__(self, system: Flow, n_envs: int, nodes: dict) -> None:
+        super().__init__(system, n_envs)
+        self.sources: list[_BatchedNode] = [nodes[source] for source in (system.sources or [])]
+        self.destinations: list[tuple[_BatchedNode, float]] = (
+            [(nodes[destination], ratio) for destination, ratio in system.destinations.items()]
+            if system.destinations
+            else []
+        )
+
+    def _is_delayed(self) -> bool:
+        return self.timestep - self.system.delay < 0 and bool(self.system.default_outflow)
+
+    def determine_source_outflow(self) -> np.ndarray:
+        if self._is_delayed():
+            return np.full(self.n_envs, self.system.default_outflow, dtype=np.float64)
+        timestep_after_delay_clipped = max(0, self.timestep - self.system.delay)
+        total = np.zeros(self.n_envs)
+        for source in self.sources:
+            total = total + source.get_outflow(timestep_after_delay_clipped)
+        return total
+
+    def determine_source_outflow_by_destination(self, destination_index: int, destination_inflow_ratio: float) -> np.ndarray:
+        if self._is_delayed():
+            return np.full(self.n_envs, self.system.default_outflow, dtype=np.float64)
+        timestep_after_delay_clipped = max(0, self.timestep - self.system.delay)
+        total_source_outflow = np.zeros(self.n_envs)
+        for source in self.sources:
+            source_outflow = source.get_outflow(timestep_after_delay_clipped)
+            if source.has_split_release.all():
+                total_source_outflow = total_source_outflow + source_outflow * source.split_release[:, destination_index]
+            elif source.has_split_release.any():
+                total_source_outflow = total_source_outflow + np.where(
+                    source.has_split_release,
+                    source_outflow * source.split_release[:, destination_index],
+                    source_outflow * destination_inflow_ratio,
+                )
+            else:
+                total_source_outflow = total_source_outflow + source_outflow * destination_inflow_ratio
+        return total_source_outflow
+
+    def get_state(self) -> np.ndarray:
+        # The delayed-flow buffer of Flow.get_state, per scenario.
+        delay = self.system.delay
+        columns = [
+            source.get_outflow(timestep) if timestep >= 0 else np.full(self.n_envs, self._outflow_before_start(source))
+            for source in self.sources
+            for timestep in range(self.timestep - delay, self.timestep)
+        ]
+        return np.stack(columns, axis=1) if columns else np.empty((self.n_envs, 0), dtype=np.float64)
+
+    def _outflow_before_start(self, source: _BatchedNode) -> Union[float, np.ndarray]:
+        if self.system.default_outflow:
+            return self.system.default_outflow / len(self.sources)
+        return source.get_outflow(0) if source.all_outflow else np.nan
+
+    def set_state(self, state: np.ndarray, timestep: int) -> None:
+        super().set_state(state, timestep)
+        delay = self.system.delay
+        for source_index, source in enumerate(self.sources):
+            for delay_index, delayed_timestep in enumerate(range(timestep - delay, timestep)):
+                outflow = state[:, source_index * delay + delay_index]
+                if delayed_timestep >= 0:
+                    # Unknown outflows are skipped, like in Flow.set_state.
+                    source.all_outflow[delayed_timestep] = np.where(
+                        np.isfinite(outflow), outflow, source.all_outflow[delayed_timestep]
+                    )
+
+    def step(self, current_date, actions=None):
+        if not isinstance(self.system, Outflow):
+            for destination_index, (destination, destination_inflow_ratio) in enumerate(self.destinations):
+                destination_inflow = self.determine_source_outflow_by_destination(
+                    destination_index, destination_inflow_ratio
+                )
+                destination.set_inflow(self.timestep, destination_inflow * (1.0 - self.system.evaporation_rate))
+
+        terminated = self.determine_source_outflow() > self.system.max_capacity
+        self.timestep += 1
+        return None, np.zeros(self.n_envs), terminated, False
+
+
+class _BatchedInflow(_BatchedFlow):
+    def _source_value(self) -> float:
+        system: Inflow = self.system
+        if self._is_delayed():
+            return system.default_outflow
+        return system.all_inflow[max(0, self.timestep - system.delay) % len(system.all_inflow)]
+
+    def determine_source_outflow(self) -> np.ndarray:
+        return np.full(self.n_envs, self._source_value(), dtype=np.float64)
+
+    def determine_source_outflow_by_destination(self, destination_index: int, destination_inflow_ratio: float) -> np.ndarray:
+        if self._is_delayed():
+            return np.full(self.n_envs, self.system.default_outflow, dtype=np.float64)
+        return np.full(self.n_envs, self._source_value() * destination_inflow_ratio, dtype=np.float64)
+
+    def step(self, current_date, actions=None):
+        truncated = self.timestep >= len(self.system.all_inflow)
+        observation, reward, terminated, _ = super().step(current_date, actions)
+        return observation, reward, terminated, truncated
+
+
+class _PerScenarioNode(_BatchedNode):
+    """
+    Fallback for facilities without a vectorized counterpart (e.g. custom subclasses): each scenario steps its own
+    copy of the facility, and the results are gathered into arrays for the rest of the batch.
+    """
+
+    def __init__(self, system: Union[Facility, ControlledFacility], copies: list) -> None:
+        super().__init__(system, len(copies))
+        self.copies = copies
+
+    def set_inflow(self, timestep: int, inflow: np.ndarray) -> None:
+        for facility, value in zip(self.copies, inflow):
+            facility.set_inflow(timestep, value)
+
+    def current_level(self) -> np.ndarray:
+        return np.array(
+            [facility.level_vector[-1] if getattr(facility, "level_vector", None) else 0 for facility in self.copies],
+            dtype=np.float64,
+        )
+
+    def determine_observation(self) -> np.ndarray:
+        return np.array([facility.determine_observation() for facility in self.copies], dtype=np.float64)
+
+    def step(self, current_date, actions=None):
+        results = []
+        for env_index, facility in enumerate(self.copies):
+            facility.current_date = current_date
+            if self.controlled:
+                results.append(facility.step(actions[env_index]))
+            else:
+                results.append(facility.step())
+        observations, rewards, terminated, truncated, _ = zip(*results)
+
+        self.all_outflow.append(np.array([facility.all_outflow[-1] for facility in self.copies], dtype=np.float64))
+        self.has_split_release = np.array([bool(facility.split_release) for facility in self.copies])
+        if self.has_split_release.any():
+            width = max(len(facility.split_release) for facility in self.copies if facility.split_release)
+            self.split_release = np.zeros((self.n_envs, width))
+            for env_index, facility in enumerate(self.copies):
+                if facility.split_release:
+                    self.split_release[env_index] = np.ravel(facility.split_release)
+
+        self.timestep += 1
+        return (
+            np.array(observations, dtype=np.float64) if self.controlled else None,
+            np.array(rewards, dtype=np.float64),
+            np.array(terminated, dtype=bool),
+            np.array(truncated, dtype=bool),
+        )
+
+    def get_state(self) -> np.ndarray:
+        return np.stack([facility.get_state() for facility in self.copies]).reshape(self.n_envs, -1)
+
+    def set_state(self, state: np.ndarray, timestep: int) -> None:
+        super().set_state(state, timestep)
+        for facility, facility_state in zip(self.copies, state):
+            facility.set_state(facility_state, timestep)
+        self.has_split_release = np.array([bool(facility.split_release) for facility in self.copies])
+        self.split_release = None
+        if self.has_split_release.any():
+            width = max(len(facility.split_release) for facility in self.copies if facility.split_release)
+            self.split_release = np.zeros((self.n_envs, width))
+            for env_index, facility in enumerate(self.copies):
+                if facility.split_release:
+                    self.split_release[env_index] = np.ravel(facility.split_release)
+
+    def reset(self) -> None:
+        super().reset()
+        for facility in self.copies:
+            facility.reset()
+
+
+class BatchedWaterManagementSystem(WaterManagementSystem):
+    """
+    Water management system that advances `n_envs` scenarios of the same basin in lockstep.
+
+    Storages, inflows, releases and rewards are kept as (n_envs,) arrays and every water system is advanced with
+    one vectorized pass per step. Reservoirs, power plants, irrigation districts, catchments and flows of the
+    standard classes are vectorized; any other facility (e.g. a subclass overriding its dynamics) is stepped on
+    one copy per scenario, so results always match the scalar `WaterManagementSystem`.
+
+    Actions are flat arrays of shape (n_envs, action_dim), ordered like `ReshapeArrayAction`. Observations and
+    rewards are returned with shape (n_envs, ...), termination and truncation flags with shape (n_envs,).
+    Scenarios are not reset automatically; a terminated scenario keeps stepping like the scalar environment does.
+    """
+
+    def __init__(
+        self,
+        water_systems: list[Union[Facility, ControlledFacility, Flow]],
+        rewards: dict,
+        start_date: datetime,
+        timestep_size: relativedelta,
+        n_envs: int,
+        seed: int = 42,
+        add_timestamp=None,
+        custom_obj=None,
+        max_episode_steps: Optional[int] = None,
+    ) -> None:
+        super().__init__(water_systems, rewards, start_date, timestep_size, seed, add_timestamp, custom_obj)
+        self.n_envs: int = n_envs
+        self.max_episode_steps: Optional[int] = max_episode_steps
+        if max_episode_steps is not None:
+            self.calendar.extend(max_episode_steps)
+            # Sized before the per-scenario copies are made, so the copies are sized too.
+            self.configure_history(max_episode_steps)
+
+        self.single_observation_space = self.observation_space
+        self.single_action_space = self.action_space
+        self.observation_space = batch_space(self.single_observation_space, n_envs)
+        self.action_space = batch_space(self.single_action_space, n_envs)
+
+        self._nodes: list[_BatchedNode] = self._build_nodes()
+        self._action_slices: dict[str, tuple[slice, tuple]] = {}
+        current_index = 0
+        for node in self._nodes:
+            if node.controlled:
+                number_of_actions = int(np.prod(node.system.action_space.shape))
+                self._action_slices[node.name] = (
+                    slice(current_index, current_index + number_of_actions),
+                    node.system.action_space.shape,
+                )
+                current_index += number_of_actions
+
+    @classmethod
+    def from_env(cls, env: WaterManagementSystem, n_envs: int, max_episode_steps: Optional[int] = None):
+        """
+        Builds a batched system from an existing (possibly wrapped) scalar environment of the same basin.
+
+        Args:
+            env (WaterManagementSystem): The scalar environment whose water systems are copied.
+            n_envs (int): Number of scenarios to advance in lockstep.
+            max_episode_steps (Optional[int]): Step count after which all scenarios are truncated.
+
+        Returns:
+            BatchedWaterManagementSystem: A batched system independent from `env`.
+        """
+        env = env.unwrapped
+        return cls(
+            water_systems=copy.deepcopy(env.water_systems),
+            rewards=dict(env.rewards),
+            start_date=env.start_date,
+            timestep_size=env.timestep_size,
+            n_envs=n_envs,
+            seed=env.seed,
+            add_timestamp=env.add_timestamp,
+            custom_obj=env.custom_obj,
+            max_episode_steps=max_episode_steps,
+        )
+
+    def _build_nodes(self) -> list[_BatchedNode]:
+        vectorized = {
+            water_system: type(water_system) in (Reservoir, PowerPlant, IrrigationDistrict, Catchment)
+            and not (isinstance(water_system, Reservoir) and water_system.should_split_release)
+            for water_system in self.water_systems
+            if not isinstance(water_system, Flow)
+        }
+        # A facility stepped per scenario reads its reservoir from its own copy, so the reservoir must be too.
+        for water_system, is_vectorized in list(vectorized.items()):
+            reservoir = getattr(water_system, "reservoir", None)
+            if not is_vectorized and reservoir is not None:
+                vectorized[reservoir] = False
+
+        copies = None
+        if not all(vectorized.values()):
+            # The copies share the calendar of the system instead of each holding their own.
+            copies = [copy.deepcopy(self.water_systems, {id(self.calendar): self.calendar}) for _ in range(self.n_envs)]
+            # The batched system only reports the date, so the copies do not build their info.
+            for water_systems in copies:
+                for water_system in water_systems:
+                    water_system.collect_info = False
+
+        # Facilities are built before the power plants and flows that reference them.
+        nodes = {}
+        for index, water_system in enumerate(self.water_systems):
+            if isinstance(water_system, Flow):
+                continue
+            elif not vectorized[water_system]:
+                nodes[water_system] = _PerScenarioNode(water_system, [graph[index] for graph in copies])
+            elif isinstance(water_system, Reservoir):
+                nodes[water_system] = _BatchedReservoir(water_system, self.n_envs)
+            elif isinstance(water_system, IrrigationDistrict):
+                nodes[water_system] = _BatchedIrrigationDistrict(water_system, self.n_envs)
+            elif isinstance(water_system, Catchment):
+                nodes[water_system] = _BatchedCatchment(water_system, self.n_envs)
+        for water_system in self.water_systems:
+            if isinstance(water_system, PowerPlant) and water_system not in nodes:
+                nodes[water_system] = _BatchedPowerPlant(water_system, self.n_envs, nodes.get(water_system.reservoir))
+        for water_system in self.water_systems:
+            if type(water_system) is Inflow:
+                nodes[water_system] = _BatchedInflow(water_system, self.n_envs, nodes)
+            elif type(water_system) in (Flow, Outflow):
+                nodes[water_system] = _BatchedFlow(water_system, self.n_envs, nodes)
+            elif isinstance(water_system, Flow):
+                raise ValueError(f"Flow '{water_system.name}' of type {type(water_system).__name__} cannot be batched.")
+        return [nodes[water_system] for water_system in self.water_systems]
+
+    def _split_actions(self, action: np.ndarray) -> dict[str, np.ndarray]:
+        action = np.asarray(action).reshape(self.n_envs, -1)
+        return {
+            name: np.reshape(action[:, action_slice], (self.n_envs, *shape))
+            for name, (action_slice, shape) in self._action_slices.items()
+        }
+
+    def _controlled_observations(self) -> np.ndarray:
+        return np.stack([node.determine_observation() for node in self._nodes if node.controlled], axis=1)
+
+    def _determine_batch_observation(self, observations: np.ndarray, date: datetime) -> np.ndarray:
+        """
+        Normalizes the raw (n_envs, n_controlled) observations and appends the timestamp column if requested.
+        """
+        observations = np.divide(observations, self.max_capacities)
+        if self.add_timestamp == "m":
+            observations = np.column_stack([observations, np.full(self.n_envs, date.month / 12)])
+        elif self.add_timestamp == "h":
+            observations = np.column_stack([observations, np.full(self.n_envs, date.hour / 24)])
+        return observations
+
+    def _determine_reset_observation(self, observations: np.ndarray) -> np.ndarray:
+        """
+        Normalizes the raw (n_envs, n_controlled) observations returned by `reset`.
+        """
+        observations = np.divide(observations, self.max_capacities)
+        if self.add_timestamp:
+            observations = np.column_stack([observations, np.zeros(self.n_envs)])
+        return observations
+
+    def get_state(self) -> np.ndarray:
+        """
+        Captures the state of every scenario of the batch.
+
+        Returns:
+            np.ndarray: An array of shape (n_envs, state_size), each row in the layout of
+                `WaterManagementSystem.get_state`: the timestep followed by the state of every water system.
+        """
+        return np.column_stack(
+            [np.full(self.n_envs, self.timestep, dtype=np.float64), *(node.get_state() for node in self._nodes)]
+        )
+
+    def set_state(self, state: np.ndarray) -> None:
+        """
+        Restores a state returned by `get_state`, or the state of a scalar environment of the same basin, which is
+        restored into every scenario.
+
+        Args:
+            state (np.ndarray): An array of shape (n_envs, state_size) or (state_size,).
+
+        Raises:
+            ValueError: If the state does not match the water systems of this environment, or if its scenarios are
+                at different timesteps.
+        """
+        state = np.asarray(state, dtype=np.float64)
+        size = 1 + sum(self._state_sizes)
+        if state.shape[-1] != size or state.ndim > 2 or (state.ndim == 2 and len(state) != self.n_envs):
+            raise ValueError(f"Expected a state of shape ({self.n_envs}, {size}) or ({size},), got {state.shape}.")
+        state = np.broadcast_to(state, (self.n_envs, size))
+        if np.any(state[:, 0] != state[0, 0]):
+            raise ValueError("All scenarios of a batch must be at the same timestep.")
+        self.timestep = int(state[0, 0])
+        self.current_date = self.calendar.date(self.timestep)
+
+        offsets = np.cumsum([1] + self._state_sizes)
+        # Facilities are restored first, as flows write their delayed-flow buffers into the histories of their sources.
+        for restore_flows in (False, True):
+            for node, start, end in zip(self._nodes, offsets[:-1], offsets[1:]):
+                if isinstance(node, _BatchedFlow) == restore_flows:
+                    node.set_state(state[:, start:end], self.timestep)
+
+    def reset(self, seed: Optional[int] = None, options: Optional[dict] = None) -> tuple[ObsType, dict[str, Any]]:
+        # Skip WaterManagementSystem.reset, the scalar water systems are only used as templates.
+        super(WaterManagementSystem, self).reset(seed=seed)
+        self.current_date = self.start_date
+        self.timestep = 0
+
+        # Mirrors WaterManagementSystem.reset: the observation is taken before the facilities are reset.
+        observation = self._determine_reset_observation(self._controlled_observations())
+        for key in self.rewards.keys():
+            self.rewards[key] = 0
+
+        for node in self._nodes:
+            node.reset()
+        return observation, {"date": self.current_date}
+
+    def step(self, action: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        """
+        Execute a single step in all scenarios of the batch.
+
+        Args:
+            action (np.ndarray): Flat actions of shape (n_envs, action_dim), one row per scenario.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+                Normalized observations (n_envs, obs_dim), rewards (n_envs, n_objectives), terminated and
+                truncated flags (n_envs,) and an info dictionary containing the date of the step.
+        """
+        actions = self._split_actions(action)
+        final_reward = {key: np.zeros(self.n_envs) for key in self.rewards.keys()}
+        final_observation = []
+        final_terminated = np.zeros(self.n_envs, dtype=bool)
+        final_truncated = np.zeros(self.n_envs, dtype=bool)
+        final_info = {"date": self.current_date}
+
+        for node in self._nodes:
+            observation, reward, terminated, truncated = node.step(self.current_date, actions.get(node.name))
+
+            if node.controlled:
+                final_observation.append(observation)
+            if node.objective_name:
+                final_reward[node.objective_name] += reward
+
+            final_terminated |= terminated
+            final_truncated |= truncated
+
+        self.timestep += 1
+        self.current_date = self.calendar.date(self.timestep)
+        if self.max_episode_steps is not None and self.timestep >= self.max_episode_steps:
+            final_truncated[:] = True
+
+        if self.custom_obj is not None:
+            final_reward = np.stack([final_reward[key] for key in self.custom_obj], axis=1)
+        else:
+            final_reward = np.stack(list(final_reward.values()), axis=1)
+
+        observations = self._determine_batch_observation(np.stack(final_observation, axis=1), final_info["date"])
+
+        return observations, final_reward, final_terminated, final_truncated, final_info
@@ -7,9 +7,14 @@ from gymnasium.core import ObsType, RenderFrame
 from typing import Any, Union, Optional
 from core.models.flow import Flow
 from core.models.facility import Facility, ControlledFacility
+from core.utils.simulation_calendar import SimulationCalendar
+from core.utils.shared_series import attach_series
 import time
 from gymnasium.spaces import flatten_space
 
+INFO_LEVELS = ("none", "summary", "full")
+
+
 class WaterManagementSystem(gym.Env):
     def __init__(
         self,
@@ -19,19 +24,31 @@ class WaterManagementSystem(gym.Env):
         timestep_size: relativedelta,
         seed: int = 42,
         add_timestamp = None,
-        custom_obj = None
+        custom_obj = None,
+        info_level: str = "full",
+        history_capacity: Optional[int] = None,
+        history_last: Optional[int] = None
     ) -> None:
+        if info_level not in INFO_LEVELS:
+            raise ValueError(f"info_level must be one of {INFO_LEVELS}, got {info_level}.")
+
         self.water_systems: list[Union[Facility, ControlledFacility, Flow]] = water_systems
         self.rewards: dict = rewards
+        # In worker processes, use the time series the parent published to shared memory instead of own copies.
+        attach_series(self.water_systems)
 
         self.start_date: datetime = start_date
         self.current_date: datetime = start_date
         self.timestep_size: relativedelta = timestep_size
         self.timestep: int = 0
+        self.calendar: SimulationCalendar = SimulationCalendar(start_date, timestep_size)
 
         self.seed: int = seed
         self.add_timestamp = add_timestamp
         self.custom_obj = custom_obj
+        # "full": date and the info of every water system, "summary": date and the reward of every objective,
+        # "none": empty info. Water systems only build their info in "full".
+        self.info_level: str = info_level
 
         self.observation_space: Space = self._determine_observation_space()
         self.observation_space = flatten_space(self.observation_space)
@@ -48,6 +65,8 @@ class WaterManagementSystem(gym.Env):
 
         self.observation: np.array = self._determine_observation()
 
+        self._compile_plan()
+
         
         
         
@@ -55,6 +74,31 @@ class WaterManagementSystem(gym.Env):
         for water_system in self.water_systems:
             water_system.current_date = self.current_date
             water_system.timestep_size = self.timestep_size
+            water_system.calendar = self.calendar
+            water_system.collect_info = self.info_level == "full"
+
+        if history_capacity is not None or history_last is not None:
+            self.configure_history(history_capacity or 0, history_last)
+
+    def configure_history(self, capacity: int, last: Optional[int] = None) -> None:
+        """
+        Sizes the histories of all facilities, e.g. the storage vectors of reservoirs.
+
+        Args:
+            capacity (int): Number of steps to preallocate, usually the episode horizon.
+            last (Optional[int]): Number of latest steps to keep; None keeps the whole history.
+
+        Raises:
+            ValueError: If fewer steps are kept than needed by the delay of a flow.
+        """
+        max_delay = max((water_system.delay for water_system in self.water_systems if isinstance(water_system, Flow)), default=0)
+        if last is not None and last < max(max_delay, 1):
+            raise ValueError(f"At least {max(max_delay, 1)} steps have to be kept in the history for delayed flows.")
+
+        for water_system in self.water_systems:
+            if not isinstance(water_system, Flow):
+                # One more entry for the initial state recorded by reservoirs.
+                water_system.configure_history(capacity + 1, last if last is None else last + 1)
 
     def _determine_observation(self) -> np.array:
         result = []
@@ -68,6 +112,75 @@ class WaterManagementSystem(gym.Env):
             
         return np.array(result), np.array(result_normalized)
 
+    def _compile_plan(self) -> None:
+        """
+        Compiles the water systems once into a static execution plan used by `step`.
+
+        Every entry of the plan holds the water system, whether it is controlled, the index of its objective in
+        the reward buffer (-1 if it has none) and the index of its observation in the observation buffer (-1 if it
+        is not controlled). The indices of the returned rewards (all of them or only the `custom_obj` ones) are
+        precomputed as well.
+
+        Raises:
+            ValueError: If a water system is neither a Facility, a ControlledFacility nor a Flow.
+            KeyError: If a facility has an objective that is not part of the rewards.
+        """
+        objective_indices = {key: index for index, key in enumerate(self.rewards.keys())}
+        self._plan: list[tuple[Union[Facility, ControlledFacility, Flow], bool, int, int]] = []
+        number_of_observations = 0
+        for water_system in self.water_systems:
+            if isinstance(water_system, ControlledFacility):
+                self._plan.append(
+                    (water_system, True, self._objective_index(water_system, objective_indices), number_of_observations)
+                )
+                number_of_observations += 1
+            elif isinstance(water_system, Facility):
+                self._plan.append((water_system, False, self._objective_index(water_system, objective_indices), -1))
+            elif isinstance(water_system, Flow):
+                self._plan.append((water_system, False, -1, -1))
+            else:
+                raise ValueError(f"{water_system} is neither a Facility, a ControlledFacility nor a Flow.")
+
+        self._observation_buffer: np.ndarray = np.zeros(number_of_observations, dtype=np.float64)
+        self._reward_buffer: np.ndarray = np.zeros(len(objective_indices), dtype=np.float64)
+        # Sizes of the dynamic states of the water systems, see `get_state`.
+        self._state_sizes: list[int] = [len(water_system.get_state()) for water_system in self.water_systems]
+
+        if self.custom_obj is not None:
+            self._reward_indices: np.ndarray = np.array([objective_indices[key] for key in self.custom_obj], dtype=np.int64)
+        else:
+            self._reward_indices: np.ndarray = np.arange(len(objective_indices), dtype=np.int64)
+
+    @staticmethod
+    def _objective_index(water_system: Union[Facility, ControlledFacility], objective_indices: dict[str, int]) -> int:
+        if not water_system.objective_name:
+            return -1
+        if water_system.objective_name not in objective_indices:
+            raise KeyError(f"Objective {water_system.objective_name} of {water_system.name} is not one of the rewards.")
+        return objective_indices[water_system.objective_name]
+
+    def _determine_step_observation(self, observations: np.ndarray, date: datetime) -> np.ndarray:
+        """
+        Builds the observation returned by `step` from the observations of the controlled facilities.
+
+        Args:
+            observations (np.ndarray): Raw observations of the controlled facilities, in the order of the water systems.
+            date (datetime): Date of the step that was taken.
+
+        Returns:
+            np.ndarray: Observations normalized by the maximum capacities, followed by the timestamp if requested.
+        """
+        if self.add_timestamp == 'm':
+            timestamp = date.month / 12
+        elif self.add_timestamp == 'h':
+            timestamp = date.hour / 24
+        else:
+            return np.divide(observations, self.max_capacities)
+        final_observations = np.empty(len(observations) + 1, dtype=np.float64)
+        np.divide(observations, self.max_capacities, out=final_observations[:-1])
+        final_observations[-1] = timestamp
+        return final_observations
+
     def _determine_observation_space(self) -> Dict:
         if self.add_timestamp is not None:
             return Dict(
@@ -111,6 +224,46 @@ class WaterManagementSystem(gym.Env):
         # TODO: decide on what we wnat to output in the info.
         return {"water_systems": self.water_systems}
 
+    def get_state(self) -> np.ndarray:
+        """
+        Captures the dynamic state of the simulation in a compact flat array.
+
+        The array holds the timestep (which determines the date), followed by the state of every water system in
+        the order of `water_systems`: storages of reservoirs and weirs, pump storages, cumulative deficits and
+        productions and the delayed-flow buffers. It does not depend on the facility objects, so it can be sent to
+        other processes and restored into any environment of the same basin.
+
+        Returns:
+            np.ndarray: The state of the simulation.
+        """
+        return np.concatenate([[self.timestep], *(water_system.get_state() for water_system in self.water_systems)])
+
+    def set_state(self, state: np.ndarray) -> None:
+        """
+        Restores a state returned by `get_state`, so that the simulation continues from it.
+
+        Histories of the facilities are rewound to the timestep of the state; values recorded after a state was
+        captured are discarded, values from before it are only kept if they were recorded by this environment.
+
+        Args:
+            state (np.ndarray): The state returned by `get_state`.
+
+        Raises:
+            ValueError: If the state does not match the water systems of this environment.
+        """
+        if len(state) != 1 + sum(self._state_sizes):
+            raise ValueError(f"Expected a state of size {1 + sum(self._state_sizes)}, got {len(state)}.")
+        self.timestep = int(state[0])
+        self.current_date = self.calendar.date(self.timestep)
+
+        offsets = np.cumsum([1] + self._state_sizes)
+        # Facilities are restored first, as flows write their delayed-flow buffers into the histories of their sources.
+        for restore_flows in (False, True):
+            for water_system, start, end in zip(self.water_systems, offsets[:-1], offsets[1:]):
+                if isinstance(water_system, Flow) == restore_flows:
+                    water_system.current_date = self.current_date
+                    water_system.set_state(state[start:end], self.timestep)
+
     def reset(self, seed: Optional[int] = None, options: Optional[dict] = None) -> tuple[ObsType, dict[str, Any]]:
         # We need the following line to seed self.np_random.
         super().reset(seed=seed)
@@ -125,6 +278,13 @@ class WaterManagementSystem(gym.Env):
         for water_system in self.water_systems:
             water_system.current_date = self.start_date
             water_system.reset()
+
+        if options is not None and options.get("start_timestep"):
+            # Starts the episode later in the record, from the initial state of the water systems.
+            state = self.get_state()
+            state[0] = options["start_timestep"]
+            self.set_state(state)
+            self.observation, observation_normalized = self._determine_observation()
         return observation_normalized, self._determine_info()
 
     def step(self, action: np.array) -> tuple[np.array, np.array, bool, bool, dict]:
@@ -156,9 +316,11 @@ class WaterManagementSystem(gym.Env):
               truncated.
             - dict: A dictionary containing additional information, such 
               as the current date and other relevant data from the 
-              water systems.
+              water systems, depending on `info_level`.
 
     Notes:
+        - The water systems are stepped following the plan compiled at 
+          initialization, see `_compile_plan`.
         - The method resets rewards for each facility at the beginning 
           of the step.
         - If `custom_obj` is specified, only the relevant rewards are 
@@ -166,73 +328,56 @@ class WaterManagementSystem(gym.Env):
         - Observations are normalized by dividing by their maximum 
           capacities.
         - The method increments the timestep and updates the current 
-          date based on the `timestep_size` attribute.
+          date from the simulation calendar.
 
     """
 
-        final_reward = {}
-        
-
+        observations = self._observation_buffer
+        rewards = self._reward_buffer
         # Reset rewards
-        for key in self.rewards.keys():
-            final_reward[key] = 0
+        rewards.fill(0.0)
+
+        date = self.current_date
+        collect_info = self.info_level == "full"
 
-        final_observation = {}
         final_terminated = False
         final_truncated = False
-        final_info = {"date": self.current_date}
+        final_info = {"date": date} if self.info_level != "none" else {}
 
-        for water_system in self.water_systems:
+        for water_system, controlled, objective_index, observation_index in self._plan:
             water_system.current_date = self.current_date
 
-            if isinstance(water_system, ControlledFacility):
+            if controlled:
                 observation, reward, terminated, truncated, info = water_system.step(action[water_system.name])
-
-            elif isinstance(water_system, Facility) or isinstance(water_system, Flow):
-                observation, reward, terminated, truncated, info = water_system.step()
+                # Set observation for a Controlled Facility.
+                observations[observation_index] = observation
             else:
-                raise ValueError()
-
-            # Set observation for a Controlled Facility.
-            if isinstance(water_system, ControlledFacility):
-                final_observation[water_system.name] = observation
+                observation, reward, terminated, truncated, info = water_system.step()
 
             # Add reward to the objective assigned to this Facility (unless it is a Flow or the facility has no objectives).
-            if isinstance(water_system, Facility) or isinstance(water_system, ControlledFacility):
-                if water_system.objective_name:
-                    final_reward[water_system.objective_name] += reward
+            if objective_index >= 0:
+                rewards[objective_index] += reward
 
             # Store additional information
-            final_info[water_system.name] = info
-
+            if collect_info:
+                final_info[water_system.name] = info
 
             # Determine whether program should stop
             final_terminated = final_terminated or terminated
-            final_truncated = final_truncated or truncated or self._is_truncated()
+            final_truncated = final_truncated or truncated
 
+        final_truncated = final_truncated or self._is_truncated()
 
-        self.timestep += 1
-        self.current_date += self.timestep_size
-
-        #check if only a subset of rewards to return
-        if self.custom_obj is not None:
-            final_reward = [final_reward[key] for key in self.custom_obj]
-        else:
-            final_reward = list(final_reward.values())
-
-        final_observations = list(final_observation.values())
-        #normalize the observation to be percentage of max capacity
-        final_observations = list(np.divide(final_observations, self.max_capacities))
-        if self.add_timestamp=='m':
-            final_observations.append(final_info['date'].month/12)
-        elif self.add_timestamp=='h':
-            final_observations.append(final_info['date'].hour/24)
-             
+        if self.info_level == "summary":
+            final_info["rewards"] = dict(zip(self.rewards.keys(), rewards.tolist()))
 
+        self.timestep += 1
+        self.current_date = self.calendar.date(self.timestep)
 
         return (
-            np.array(final_observations).flatten(),
-            np.array(final_reward).flatten(),
+            self._determine_step_observation(observations, date),
+            #only the rewards of custom_obj are returned if it is specified
+            rewards[self._reward_indices],
             final_terminated,
             final_truncated,
             final_info
@@ -6,6 +6,8 @@ from gymnasium.spaces import Space, Box
 from gymnasium.core import ObsType, ActType
 from typing import SupportsFloat, Optional
 from core.models.objective import Objective
+from core.utils.simulation_calendar import SimulationCalendar
+from core.utils.history import History
 
 
 class Facility(ABC):
@@ -16,9 +18,9 @@ class Facility(ABC):
     ----------
     name : str
         Identifier for the facility.
-    all_inflow : list[float]
+    all_inflow : History
         Historical inflow values recorded over time.
-    all_outflow : list[float]
+    all_outflow : History
         Historical outflow values recorded over time.
     objective_function : Callable
         Function to evaluate the facility’s performance based on defined objectives.
@@ -28,8 +30,12 @@ class Facility(ABC):
         Date associated with the current timestep of the facility.
     timestep_size : Optional[relativedelta]
         Size of the timestep for simulation. Usually 1 month.
+    calendar : Optional[SimulationCalendar]
+        Calendar of the simulation, shared by all facilities of a water management system.
     timestep : int
         Current timestep index for the facility simulation.
+    collect_info : bool
+        Whether `step` builds the info dict of the facility; if False, `step` returns None as info.
     split_release : Optional
         Placeholder for managing release strategies (usage to be defined).
     normalize_objective : float
@@ -46,15 +52,17 @@ class Facility(ABC):
             normalize_objective (float): Maximum value for normalizing the reward; defaults to 0.0.
         """
         self.name: str = name
-        self.all_inflow: list[float] = []
-        self.all_outflow: list[float] = []
+        self.all_inflow: History = History()
+        self.all_outflow: History = History()
 
         self.objective_function = objective_function
         self.objective_name = objective_name
 
         self.current_date: Optional[datetime] = None
         self.timestep_size: Optional[relativedelta] = None
+        self.calendar: Optional[SimulationCalendar] = None
         self.timestep: int = 0
+        self.collect_info: bool = True
 
         self.split_release = None
         self.normalize_objective = normalize_objective
@@ -179,7 +187,7 @@ class Facility(ABC):
             reward = reward/self.normalize_objective
         terminated = self.is_terminated()
         truncated = self.is_truncated()
-        info = self.determine_info()
+        info = self.determine_info() if self.collect_info else None
 
         self.timestep += 1
 
@@ -193,8 +201,41 @@ class Facility(ABC):
             None
         """
         self.timestep: int = 0
-        self.all_inflow: list[float] = []
-        self.all_outflow: list[float] = []
+        self.all_inflow.clear()
+        self.all_outflow.clear()
+
+    def configure_history(self, capacity: int, last: Optional[int] = None) -> None:
+        """
+        Sizes every history of the facility, usually from the episode horizon.
+
+        Args:
+            capacity (int): Number of values to preallocate per history.
+            last (Optional[int]): Number of latest values to keep per history; None keeps the whole history.
+        """
+        for history in vars(self).values():
+            if isinstance(history, History):
+                history.configure(capacity, last)
+
+    def get_state(self) -> np.ndarray:
+        """
+        Returns the dynamic state of the facility that is not shared with the other water systems.
+
+        Returns:
+            np.ndarray: A flat array, empty by default.
+        """
+        return np.empty(0, dtype=np.float64)
+
+    def set_state(self, state: np.ndarray, timestep: int) -> None:
+        """
+        Restores the dynamic state of the facility returned by `get_state` and rewinds its histories.
+
+        Args:
+            state (np.ndarray): The flat array returned by `get_state`.
+            timestep (int): The timestep of the simulation the state belongs to.
+        """
+        self.timestep = timestep
+        self.all_inflow.rewind(timestep)
+        self.all_outflow.rewind(timestep)
 
     def determine_info(self) -> dict:
         """
@@ -238,9 +279,9 @@ class ControlledFacility(ABC):
     ----------
     name : str
         Identifier for the controlled facility.
-    all_inflow : list[float]
+    all_inflow : History
         Historical inflow values recorded over time.
-    all_outflow : list[float]
+    all_outflow : History
         Historical outflow values recorded over time.
     max_capacity : float
         Maximum capacity of the facility.
@@ -258,8 +299,12 @@ class ControlledFacility(ABC):
         Date corresponding to the current timestep.
     timestep_size : Optional[relativedelta]
         Size of the simulation timestep (e.g., 1 month).
+    calendar : Optional[SimulationCalendar]
+        Calendar of the simulation, shared by all facilities of a water management system.
     timestep : int
         The current timestep index in the simulation.
+    collect_info : bool
+        Whether `step` builds the info dict of the facility; if False, `step` returns None as info.
     should_split_release : bool
         Determines whether the release needs to be split across multiple actions.
     split_release : Optional
@@ -291,8 +336,8 @@ class ControlledFacility(ABC):
             objective_name (str): Name of the objective function used (default is an empty string).
         """
         self.name: str = name
-        self.all_inflow: list[float] = []
-        self.all_outflow: list[float] = []
+        self.all_inflow: History = History()
+        self.all_outflow: History = History()
         self.max_capacity: float = max_capacity
         self.max_action: float = max_action
 
@@ -310,7 +355,9 @@ class ControlledFacility(ABC):
 
         self.current_date: Optional[datetime] = None
         self.timestep_size: Optional[relativedelta] = None
+        self.calendar: Optional[SimulationCalendar] = None
         self.timestep: int = 0
+        self.collect_info: bool = True
 
         self.should_split_release = np.prod(self.action_space.shape) > 1
         self.split_release = None
@@ -449,7 +496,7 @@ class ControlledFacility(ABC):
         reward = self.determine_reward()
         terminated = self.is_terminated()
         truncated = self.is_truncated()
-        info = self.determine_info()
+        info = self.determine_info() if self.collect_info else None
 
         self.timestep += 1
 
@@ -469,8 +516,41 @@ class ControlledFacility(ABC):
             None
         """
         self.timestep: int = 0
-        self.all_inflow: list[float] = []
-        self.all_outflow: list[float] = []
+        self.all_inflow.clear()
+        self.all_outflow.clear()
+
+    def configure_history(self, capacity: int, last: Optional[int] = None) -> None:
+        """
+        Sizes every history of the facility, usually from the episode horizon.
+
+        Args:
+            capacity (int): Number of values to preallocate per history.
+            last (Optional[int]): Number of latest values to keep per history; None keeps the whole history.
+        """
+        for history in vars(self).values():
+            if isinstance(history, History):
+                history.configure(capacity, last)
+
+    def get_state(self) -> np.ndarray:
+        """
+        Returns the dynamic state of the facility that is not shared with the other water systems.
+
+        Returns:
+            np.ndarray: A flat array, empty by default.
+        """
+        return np.empty(0, dtype=np.float64)
+
+    def set_state(self, state: np.ndarray, timestep: int) -> None:
+        """
+        Restores the dynamic state of the facility returned by `get_state` and rewinds its histories.
+
+        Args:
+            state (np.ndarray): The flat array returned by `get_state`.
+            timestep (int): The timestep of the simulation the state belongs to.
+        """
+        self.timestep = timestep
+        self.all_inflow.rewind(timestep)
+        self.all_outflow.rewind(timestep)
 
     def determine_info(self) -> dict:
         """
@@ -1,7 +1,9 @@
+import numpy as np
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from typing import Union, Optional
 from core.models.facility import Facility, ControlledFacility
+from core.utils.simulation_calendar import SimulationCalendar
 from gymnasium.core import ObsType
 
 
@@ -34,8 +36,12 @@ class Flow:
         Current date in the simulation, used to manage time-based calculations.
     timestep_size : Optional[relativedelta]
         The size of each simulation timestep.
+    calendar : Optional[SimulationCalendar]
+        Calendar of the simulation, shared by all facilities of a water management system.
     timestep : int
         Current timestep in the simulation.
+    collect_info : bool
+        Whether `step` builds the info dict of the flow; if False, `step` returns None as info.
     """
 
     def __init__(
@@ -84,7 +90,9 @@ class Flow:
 
         self.current_date: Optional[datetime] = None
         self.timestep_size: Optional[relativedelta] = None
+        self.calendar: Optional[SimulationCalendar] = None
         self.timestep: int = 0
+        self.collect_info: bool = True
 
     def determine_source_outflow(self) -> float:
         """
@@ -184,7 +192,7 @@ class Flow:
         terminated = self.determine_source_outflow() > self.max_capacity
         truncated = self.is_truncated()
         reward = float("-inf") if terminated else 0.0 
-        info = self.determine_info()
+        info = self.determine_info() if self.collect_info else None
 
         self.timestep += 1
 
@@ -196,6 +204,52 @@ class Flow:
         """
         self.timestep = 0
 
+    def get_state(self) -> np.ndarray:
+        """
+        Returns the delayed-flow buffer: the outflows of every source during the last `delay` timesteps, which
+        still have to reach the destinations. Timesteps before the start of the simulation hold the outflow the flow
+        uses instead: `default_outflow` shared evenly among the sources or, without it, the first outflow of the
+        source (NaN if the source has not released anything yet).
+
+        Returns
+        -------
+        np.ndarray
+            A flat array of `delay` outflows per source, from the oldest to the latest timestep.
+        """
+        return np.array(
+            [
+                source.get_outflow(timestep) if timestep >= 0 else self._outflow_before_start(source)
+                for source in (self.sources or [])
+                for timestep in range(self.timestep - self.delay, self.timestep)
+            ],
+            dtype=np.float64,
+        )
+
+    def _outflow_before_start(self, source: Union[Facility, ControlledFacility]) -> float:
+        if self.default_outflow:
+            return self.default_outflow / len(self.sources)
+        return source.get_outflow(0) if len(source.all_outflow) else np.nan
+
+    def set_state(self, state: np.ndarray, timestep: int) -> None:
+        """
+        Restores the delayed-flow buffer returned by `get_state` into the outflow histories of the sources.
+
+        Unknown (non-finite) outflows of the buffer are skipped, so they never become part of a history.
+
+        Parameters
+        ----------
+        state : np.ndarray
+            The flat array returned by `get_state`.
+        timestep : int
+            The timestep of the simulation the state belongs to.
+        """
+        self.timestep = timestep
+        for source_index, source in enumerate(self.sources or []):
+            for delay_index, delayed_timestep in enumerate(range(timestep - self.delay, timestep)):
+                outflow = state[source_index * self.delay + delay_index]
+                if delayed_timestep >= 0 and np.isfinite(outflow):
+                    source.all_outflow[delayed_timestep] = outflow
+
 
 class Inflow(Flow):
     """
@@ -1,4 +1,6 @@
+import numpy as np
 from core.models.facility import Facility
+from core.utils.history import History
 
 
 class IrrigationDistrict(Facility):
@@ -13,7 +15,7 @@ class IrrigationDistrict(Facility):
         Monthly water demand values for the irrigation district.
     total_deficit : float
         Cumulative water deficit experienced by the district over time.
-    all_deficit : list[float]
+    all_deficit : History
         Monthly record of deficits, calculated as demand minus consumption.
     normalize_objective : float
         Normalization factor for the objective function reward. It should be the highest monthly value in a year. Default is 0.0
@@ -39,7 +41,7 @@ class IrrigationDistrict(Facility):
         super().__init__(name, objective_function, objective_name, normalize_objective)
         self.all_demand: list[float] = all_demand
         self.total_deficit: float = 0
-        self.all_deficit: list[float] = []
+        self.all_deficit: History = History()
 
     def get_current_demand(self) -> float:
         """
@@ -114,7 +116,7 @@ class IrrigationDistrict(Facility):
             "outflow": self.get_outflow(self.timestep),
             "demand": self.get_current_demand(),
             "total_deficit": self.total_deficit,
-            "list_deficits": self.all_deficit,
+            "list_deficits": self.all_deficit.values().tolist(),
         }
 
     def reset(self) -> None:
@@ -127,4 +129,30 @@ class IrrigationDistrict(Facility):
         """        
         super().reset()
         self.total_deficit = 0
-        self.all_deficit = []
+        self.all_deficit.clear()
+
+    def get_state(self) -> np.ndarray:
+        """
+        Returns the dynamic state of the irrigation district, which is its cumulative deficit.
+
+        Returns
+        -------
+        np.ndarray
+            A flat array holding the total deficit.
+        """
+        return np.array([self.total_deficit], dtype=np.float64)
+
+    def set_state(self, state: np.ndarray, timestep: int) -> None:
+        """
+        Restores the cumulative deficit returned by `get_state` and rewinds the deficit history.
+
+        Parameters
+        ----------
+        state : np.ndarray
+            The flat array returned by `get_state`.
+        timestep : int
+            The timestep of the simulation the state belongs to.
+        """
+        super().set_state(state, timestep)
+        self.total_deficit = state[0]
+        self.all_deficit.rewind(timestep)
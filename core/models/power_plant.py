@@ -1,6 +1,7 @@
 from core.models.facility import Facility
 from core.models.reservoir import Reservoir
 from core.utils import utils
+from core.utils.history import History
 from scipy.constants import g
 import numpy as np
 
@@ -28,8 +29,10 @@ class PowerPlant(Facility):
         Coefficient that determines the water level based on the volume of outflow.
     water_usage : float
         Fraction of water used by the power plant for production.
-    production_vector : np.ndarray
-        Vector that stores the power production history of the plant.
+    production_vector : History
+        History of the power production of the plant.
+    total_production : float
+        Cumulative power production of the plant over the episode.
     tailwater : np.array
         Array of tailwater data used for detailed power production calculations.
     turbines : np.array
@@ -102,7 +105,8 @@ class PowerPlant(Facility):
         self.max_capacity: float = max_capacity
         self.reservoir: Reservoir = reservoir
         self.water_usage: float = water_usage
-        self.production_vector: np.ndarray = np.empty(0, dtype=np.float64)
+        self.production_vector: History = History()
+        self.total_production: float = 0
         self.tailwater = tailwater
         self.turbines = turbines
         self.n_turbines = n_turbines
@@ -148,12 +152,12 @@ class PowerPlant(Facility):
         )
 
         # Calculate the numbe rof hours the power plant has been running.
-        final_date = self.current_date + self.timestep_size
-        timestep_hours = (final_date - self.current_date).total_seconds() / 3600
+        timestep_hours = self.calendar.seconds(self.timestep) / 3600
 
         # Hydro-energy power production in mWh
         production = power_in_mw * timestep_hours
-        self.production_vector = np.append(self.production_vector, production)
+        self.production_vector.append(production)
+        self.total_production += production
 
         return production
     
@@ -206,11 +210,11 @@ class PowerPlant(Facility):
 
 
         # Calculate the numbe rof hours the power plant has been running.
-        final_date = self.current_date + self.timestep_size
-        timestep_hours = (final_date - self.current_date).total_seconds() / 3600
+        timestep_hours = self.calendar.seconds(self.timestep) / 3600
 
         production = p * timestep_hours
-        self.production_vector = np.append(self.production_vector, production)
+        self.production_vector.append(production)
+        self.total_production += production
 
         return production
 
@@ -264,7 +268,7 @@ class PowerPlant(Facility):
             "outflow": self.get_outflow(self.timestep),
             "monthly_production": self.production_vector[-1],
             "water_usage": self.water_usage,
-            "total production (MWh)": sum(self.production_vector),
+            "total production (MWh)": self.total_production,
         }
 
     def determine_month(self) -> int:
@@ -290,4 +294,31 @@ class PowerPlant(Facility):
             This method does not return a value but modifies the internal state.
         """
         super().reset()
-        self.production_vector = np.empty(0, dtype=np.float64)
+        self.production_vector.clear()
+        self.total_production = 0
+
+    def get_state(self) -> np.ndarray:
+        """
+        Returns the dynamic state of the power plant, which is its cumulative production.
+
+        Returns
+        -------
+        np.ndarray
+            A flat array holding the total production.
+        """
+        return np.array([self.total_production], dtype=np.float64)
+
+    def set_state(self, state: np.ndarray, timestep: int) -> None:
+        """
+        Restores the cumulative production returned by `get_state` and rewinds the production history.
+
+        Parameters
+        ----------
+        state : np.ndarray
+            The flat array returned by `get_state`.
+        timestep : int
+            The timestep of the simulation the state belongs to.
+        """
+        super().set_state(state, timestep)
+        self.total_production = state[0]
+        self.production_vector.rewind(timestep)
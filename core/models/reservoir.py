@@ -4,6 +4,8 @@ import numpy as np
 from dateutil.relativedelta import relativedelta
 from datetime import datetime
 from numpy.core.multiarray import interp as compiled_interp
+from core.utils import utils
+from core.utils.history import History
 
 
 class Reservoir(ControlledFacility):
@@ -31,12 +33,14 @@ class Reservoir(ControlledFacility):
         Relationship between storage and water level (height).
     storage_to_surface_rel : list[list[float]]
         Relationship between storage and surface area of the reservoir.
-    storage_vector : list[float]
-        List tracking the volume of water in the reservoir over time.
-    level_vector : list[float]
-        List tracking the elevation (height) of the water in the reservoir over time.
-    release_vector : list[float]
-        List tracking the actual water release per timestep.
+    initial_stored_water : float
+        The volume of water stored in the reservoir at the start of an episode (in m³).
+    storage_vector : History
+        History tracking the volume of water in the reservoir over time.
+    level_vector : History
+        History tracking the elevation (height) of the water in the reservoir over time.
+    release_vector : History
+        History tracking the actual water release per timestep.
     integration_timestep_size : relativedelta
         The timestep size used for numerical integration of reservoir processes.
     spillage : float
@@ -88,6 +92,7 @@ class Reservoir(ControlledFacility):
         """
         super().__init__(name, observation_space, action_space, max_capacity, max_action)
         self.stored_water: float = stored_water
+        self.initial_stored_water: float = stored_water
 
         self.evap_rates = evap_rates
         self.evap_rates_timestep = evap_rates_timestep_size
@@ -95,9 +100,9 @@ class Reservoir(ControlledFacility):
         self.storage_to_level_rel = storage_to_level_rel
         self.storage_to_surface_rel = storage_to_surface_rel
         
-        self.storage_vector = []
-        self.level_vector = []
-        self.release_vector = []
+        self.storage_vector = History()
+        self.level_vector = History()
+        self.release_vector = History()
 
         # Initialise storage vector
         self.storage_vector.append(stored_water)
@@ -137,37 +142,27 @@ class Reservoir(ControlledFacility):
         current_storage = self.storage_vector[-1]
         #check if we are releasing to one destination or more
         if self.should_split_release == True:
-            #if it's more destinations, we have to create a list for sub-releases during the integration loop
-            sub_releases = []
             actions = np.multiply(actions, self.max_action)
         else:
-            sub_releases = np.empty(0, dtype=np.float64)
             actions = actions*self.max_action
 
-        final_date = self.current_date + self.timestep_size
-        timestep_seconds = (final_date + self.evap_rates_timestep - final_date).total_seconds()
+        timestep_seconds = self.calendar.period_seconds(self.timestep + 1, self.evap_rates_timestep)
         evaporatio_rate_per_second = self.evap_rates[self.determine_time_idx()] / (100 * timestep_seconds)
 
-        while self.current_date < final_date:
-            next_date = min(final_date, self.current_date + self.integration_timestep_size)
-            integration_time_seconds = (next_date - self.current_date).total_seconds()
-
-            #calculate the surface to get the evaporation
-            surface = self.storage_to_surface(current_storage)
-            #evaporation per integration timestep
-            evaporation = surface * (evaporatio_rate_per_second * integration_time_seconds)
-            #get min and max possible release based on the current storage
-            min_possible_release, max_possible_release = self.storage_to_minmax(current_storage)
-            #release per second is calculated based on the min-max releases which depend on the storage level and the predicted actions
-            release_per_second = min(max_possible_release, max(min_possible_release, np.sum(actions)))
-
-            sub_releases = np.append(sub_releases, release_per_second)
-
-            total_addition = self.get_inflow(self.timestep) * integration_time_seconds
-
-            current_storage += total_addition - evaporation - (np.sum(release_per_second) - self.spillage) * integration_time_seconds
-            
-            self.current_date = next_date
+        #the whole integration loop over the sub-steps runs in a compiled kernel
+        final_storage, average_release = utils.integrate_reservoir(
+            np.array([current_storage], dtype=np.float64),
+            np.array([self.get_inflow(self.timestep)], dtype=np.float64),
+            np.array([np.sum(actions)], dtype=np.float64),
+            self.calendar.substeps(self.timestep, self.integration_timestep_size).seconds,
+            evaporatio_rate_per_second,
+            self.spillage,
+            np.asarray(self.storage_to_surface_rel, dtype=np.float64),
+            np.asarray(self.storage_to_minmax_rel, dtype=np.float64),
+        )
+        current_storage = final_storage[0]
+        average_release = average_release[0]
+        self.current_date = self.calendar.date(self.timestep + 1)
 
         # Update the amount of water in the Reservoir
         self.storage_vector.append(current_storage)
@@ -176,13 +171,6 @@ class Reservoir(ControlledFacility):
         # Record level based on storage for time t
         self.level_vector.append(self.storage_to_level(current_storage))
 
-        # Calculate the ouflow of water
-        if self.should_split_release == True:
-            sub_releases = np.array(sub_releases)
-            average_release = np.mean(sub_releases, dtype=np.float64, axis = 0)
-        else:
-            average_release = np.mean(sub_releases, dtype=np.float64)
-
         self.release_vector.append(average_release)
 
         total_action = np.sum(average_release)
@@ -240,9 +228,9 @@ class Reservoir(ControlledFacility):
 
     def determine_time_idx(self) -> int:
         """
-        Determines the index for the evaporation rate based on the current date and timestep.
+        Determines the index for the evaporation rate based on the current timestep.
 
-        The function maps the current date to the appropriate index in the evaporation rate array, considering
+        The simulation calendar maps the current timestep to the appropriate index in the evaporation rate array, considering
         the timestep size (months, days, or hours).
 
         Returns:
@@ -251,14 +239,7 @@ class Reservoir(ControlledFacility):
         Raises:
             ValueError: If the timestep size is unsupported (i.e., not months, days, or hours).
         """
-        if self.evap_rates_timestep.months > 0:
-            return self.current_date.month - 1
-        elif self.evap_rates_timestep.days > 0:
-            return self.current_date.timetuple().tm_yday - 1
-        elif self.evap_rates_timestep.hours > 0:
-            return (self.current_date.timetuple().tm_yday - 1) * 24 + self.current_date.hour - 1
-        else:
-            raise ValueError('The timestep is not supported, only time series with intervals of months, days, hours are supported')
+        return self.calendar.time_idx(self.timestep, self.evap_rates_timestep)
 
 
     def storage_to_level(self, s: float) -> float:
@@ -357,8 +338,32 @@ class Reservoir(ControlledFacility):
         This method resets the storage, release, and level vectors, and restores the initial stored water volume.
         """
         super().reset()
-        stored_water = self.storage_vector[0]
-        self.storage_vector = [stored_water]
+        stored_water = self.initial_stored_water
+        self.storage_vector.clear()
+        self.storage_vector.append(stored_water)
         self.stored_water = stored_water
-        self.level_vector = []
-        self.release_vector = []
+        self.level_vector.clear()
+        self.release_vector.clear()
+
+    def get_state(self) -> np.ndarray:
+        """
+        Returns the dynamic state of the reservoir, which is its stored water.
+
+        Returns:
+            np.ndarray: A flat array holding the stored water (in m³).
+        """
+        return np.array([self.stored_water], dtype=np.float64)
+
+    def set_state(self, state: np.ndarray, timestep: int) -> None:
+        """
+        Restores the stored water returned by `get_state` and rewinds the storage, level and release vectors.
+
+        Args:
+            state (np.ndarray): The flat array returned by `get_state`.
+            timestep (int): The timestep of the simulation the state belongs to.
+        """
+        super().set_state(state, timestep)
+        self.stored_water = state[0]
+        self.storage_vector.rewind(timestep + 1, self.stored_water)
+        self.level_vector.rewind(timestep, self.storage_to_level(self.stored_water) if timestep > 0 else None)
+        self.release_vector.rewind(timestep)
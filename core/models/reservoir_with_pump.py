@@ -7,6 +7,7 @@ from numpy.core.multiarray import interp as compiled_interp
 from typing import Callable
 import inspect
 from core.utils import utils
+from core.utils.history import History
 
 class ReservoirWithPump(ControlledFacility):
     """
@@ -20,12 +21,14 @@ class ReservoirWithPump(ControlledFacility):
         The lowercase, non-spaced name of the reservoir.
     name_pump: str
         The lowercase, non-spaced name of the pump station.
-    storage_vector: np.array (1xH)
-        A vector containing the volume of water in the reservoir (in cubic meters) over the simulation horizon.
-    level_vector: np.array (1xH)
-        A vector holding the elevation (height in meters) of water in the reservoir throughout the simulation horizon.
-    release_vector: np.array (1xH)
-        A vector that holds the average release rate (in cubic meters per second) of water from the reservoir over time.
+    initial_stored_water: float
+        The volume of water in the reservoir (in cubic meters) at the start of an episode.
+    storage_vector: History (1xH)
+        A history containing the volume of water in the reservoir (in cubic meters) over the simulation horizon.
+    level_vector: History (1xH)
+        A history holding the elevation (height in meters) of water in the reservoir throughout the simulation horizon.
+    release_vector: History (1xH)
+        A history that holds the average release rate (in cubic meters per second) of water from the reservoir over time.
     evap_rates: np.array (1x12)
         Monthly evaporation rates (in centimeters) for the reservoir.
     evap_rates_pump: np.array (1x12)
@@ -149,12 +152,13 @@ class ReservoirWithPump(ControlledFacility):
 
         self.inflows_pump = inflows_pump
         
-        self.storage_vector = []
-        self.storage_pump_vector = []
-        self.level_vector = []
-        self.release_vector = []
+        self.storage_vector = History()
+        self.storage_pump_vector = History()
+        self.level_vector = History()
+        self.release_vector = History()
 
         # Initialise storage vector
+        self.initial_stored_water: float = stored_water_reservoir
         self.storage_vector.append(stored_water_reservoir)
         self.storage_pump_vector.append(stored_water_pump)
 
@@ -227,19 +231,17 @@ class ReservoirWithPump(ControlledFacility):
             actions = actions*self.max_action
 
             
-        final_date = self.current_date + self.timestep_size
-        timestep_seconds = (final_date + self.evap_rates_timestep - final_date).total_seconds()
+        timestep_seconds = self.calendar.period_seconds(self.timestep + 1, self.evap_rates_timestep)
         evaporatio_rate_per_second = self.evap_rates[self.determine_time_idx()] / (100 * timestep_seconds)
         evaporatio_rate_per_second_pump = self.evap_rates_pump[self.determine_time_idx()] / (100 * timestep_seconds)
         
-        while self.current_date < final_date:
-            next_date = min(final_date, self.current_date + self.integration_timestep_size)
-            integration_time_seconds = (next_date - self.current_date).total_seconds()
+        substeps = self.calendar.substeps(self.timestep, self.integration_timestep_size)
+        for integration_time_seconds, weekday, hour in zip(substeps.seconds, substeps.weekdays, substeps.hours):
             
             #pumping/release of the pump
 
-            pumping, release_pump = self.pumping_rules(day = self.current_date.weekday(), 
-                                                  hour = self.current_date.hour, 
+            pumping, release_pump = self.pumping_rules(day = weekday, 
+                                                  hour = hour, 
                                                   level_reservoir = self.storage_to_level(current_storage), 
                                                   level_pump = self.storage_to_level_pump(self.stored_pump),
                                                   storage_reservoir = current_storage, storage_pump = self.stored_pump)
@@ -268,7 +270,7 @@ class ReservoirWithPump(ControlledFacility):
 
             current_storage += total_addition - evaporation - np.sum(release_per_second) * integration_time_seconds
 
-            self.current_date = next_date
+        self.current_date = self.calendar.date(self.timestep + 1)
 
         # Update the amount of water in the Reservoir
         self.storage_vector.append(current_storage)
@@ -367,14 +369,7 @@ class ReservoirWithPump(ControlledFacility):
         ValueError
             If the timestep size is unsupported (i.e., not months, days, or hours).
         """
-        if self.evap_rates_timestep.months > 0:
-            return self.current_date.month - 1
-        elif self.evap_rates_timestep.days > 0:
-            return self.current_date.timetuple().tm_yday - 1
-        elif self.evap_rates_timestep.hours > 0:
-            return (self.current_date.timetuple().tm_yday - 1) * 24 + self.current_date.hour - 1
-        else:
-            raise ValueError('The timestep is not supported, only time series with intervals of months, days, hours are supported')
+        return self.calendar.time_idx(self.timestep, self.evap_rates_timestep)
 
     def storage_to_level(self, s: float) -> float:
         """
@@ -532,8 +527,44 @@ class ReservoirWithPump(ControlledFacility):
             This method does not return any value, but it modifies the internal state of the system.
         """
         super().reset()
-        stored_water = self.storage_vector[0]
-        self.storage_vector = [stored_water]
+        stored_water = self.initial_stored_water
+        self.storage_vector.clear()
+        self.storage_vector.append(stored_water)
         self.stored_water = stored_water
-        self.level_vector = [self.storage_to_level(stored_water)]
-        self.release_vector = []
+        self.level_vector.clear()
+        self.level_vector.append(self.storage_to_level(stored_water))
+        self.release_vector.clear()
+
+    def get_state(self) -> np.ndarray:
+        """
+        Returns the dynamic state of the system: the water stored in the reservoir and in the pump station, followed
+        by the last split of the release over the destinations (NaN if the release has not been split yet).
+
+        Returns
+        -------
+        np.ndarray
+            A flat array holding the stored water, the stored pump water and the split release.
+        """
+        split_release = np.full(len(self.max_action), np.nan) if self.split_release is None else self.split_release
+        return np.concatenate(([self.stored_water, self.stored_pump], split_release)).astype(np.float64)
+
+    def set_state(self, state: np.ndarray, timestep: int) -> None:
+        """
+        Restores the state returned by `get_state` and rewinds the storage, level and release vectors.
+
+        Parameters
+        ----------
+        state : np.ndarray
+            The flat array returned by `get_state`.
+        timestep : int
+            The timestep of the simulation the state belongs to.
+        """
+        super().set_state(state, timestep)
+        self.stored_water = state[0]
+        self.stored_pump = state[1]
+        self.split_release = None if np.isnan(state[2:]).all() else list(state[2:])
+        self.storage_vector.rewind(timestep + 1, self.stored_water)
+        # The pump storage is not reset with the reservoir, only its latest value is used.
+        self.storage_pump_vector.rewind(max(len(self.storage_pump_vector), 1), self.stored_pump)
+        self.level_vector.rewind(timestep + 1, self.storage_to_level(self.stored_water))
+        self.release_vector.rewind(timestep)
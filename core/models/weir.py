@@ -4,6 +4,7 @@ import numpy as np
 from dateutil.relativedelta import relativedelta
 from datetime import datetime
 from numpy.core.multiarray import interp as compiled_interp
+from core.utils.history import History
 
 
 class Weir(ControlledFacility):
@@ -17,12 +18,14 @@ class Weir(ControlledFacility):
     ----------
     name : str
         Lowercase, non-spaced name of the weir.
-    storage_vector : np.array
-        Vector holding the volume of water in the weir throughout the simulation horizon (in cubic meters).
-    level_vector : np.array
-        Vector holding the elevation (height) of the water in the weir throughout the simulation horizon (in meters).
-    release_vector : np.array
-        Vector holding the actual average release per timestep from the weir (in cubic meters per second).
+    initial_stored_water : float
+        The volume of water in the weir at the start of an episode (in cubic meters).
+    storage_vector : History
+        History holding the volume of water in the weir throughout the simulation horizon (in cubic meters).
+    level_vector : History
+        History holding the elevation (height) of the water in the weir throughout the simulation horizon (in meters).
+    release_vector : History
+        History holding the actual average release per timestep from the weir (in cubic meters per second).
     evap_rates : np.array
         Monthly evaporation rates for the weir (in centimeters).
     stored_water : float
@@ -90,13 +93,14 @@ class Weir(ControlledFacility):
         """
         super().__init__(name, observation_space, action_space, max_capacity, max_action)
         self.stored_water: float = stored_water
+        self.initial_stored_water: float = stored_water
 
         self.should_split_release = True
         
         
-        self.storage_vector = []
-        self.level_vector = []
-        self.release_vector = []
+        self.storage_vector = History()
+        self.level_vector = History()
+        self.release_vector = History()
 
         # Initialise storage vector
         self.storage_vector.append(stored_water)
@@ -141,10 +145,7 @@ class Weir(ControlledFacility):
         destination_1_release = np.empty(0, dtype=np.float64)
         weir_observation_lst = []
 
-        final_date = self.current_date + self.timestep_size
-
-        while self.current_date < final_date:
-            next_date = min(final_date, self.current_date + self.integration_timestep_size)
+        for _ in range(len(self.calendar.substeps(self.timestep, self.integration_timestep_size))):
 
             #See what is the current inflow to weir and scale up the action to the first destination ( the action is a percentage of water going to destination 1)
             weir_observation = self.get_inflow(self.timestep)
@@ -154,8 +155,8 @@ class Weir(ControlledFacility):
             destination_1_release = np.append(destination_1_release, actions_scaled_up)
 
             weir_observation_lst = np.append(weir_observation_lst, weir_observation)
-            
-            self.current_date = next_date
+
+        self.current_date = self.calendar.date(self.timestep + 1)
 
         #Averaging inflow to weir over last step (usually month) as a potential observation space to be used
         average_release = np.mean(weir_observation_lst, dtype=np.float64)
@@ -227,8 +228,37 @@ class Weir(ControlledFacility):
             This method does not return a value, but modifies the internal state.
         """
         super().reset()
-        stored_water = self.storage_vector[0]
-        self.storage_vector = [stored_water]
+        stored_water = self.initial_stored_water
+        self.storage_vector.clear()
+        self.storage_vector.append(stored_water)
         self.stored_water = stored_water
-        self.level_vector = []
-        self.release_vector = []
+        self.level_vector.clear()
+        self.release_vector.clear()
+
+    def get_state(self) -> np.ndarray:
+        """
+        Returns the dynamic state of the weir, which is its stored water.
+
+        Returns
+        -------
+        np.ndarray
+            A flat array holding the stored water.
+        """
+        return np.array([self.stored_water], dtype=np.float64)
+
+    def set_state(self, state: np.ndarray, timestep: int) -> None:
+        """
+        Restores the stored water returned by `get_state` and rewinds the storage, level and release vectors.
+
+        Parameters
+        ----------
+        state : np.ndarray
+            The flat array returned by `get_state`.
+        timestep : int
+            The timestep of the simulation the state belongs to.
+        """
+        super().set_state(state, timestep)
+        self.stored_water = state[0]
+        self.storage_vector.rewind(timestep + 1, self.stored_water)
+        self.level_vector.rewind(timestep)
+        self.release_vector.rewind(timestep)
@@ -0,0 +1,67 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+CACHE_DIRECTORY_VARIABLE = "MORL4WATER_DATA_CACHE"
+
+# Arrays already mapped by this process, they are read-only and shared by all environments built in it.
+_loaded: dict[Path, np.ndarray] = {}
+
+
+def cache_directory() -> Path:
+    """
+    Returns the directory binary copies of the input data are cached in.
+
+    It is taken from the MORL4WATER_DATA_CACHE environment variable and defaults to ~/.cache/morl4water.
+
+    Returns:
+        Path: The cache directory.
+    """
+    directory = os.environ.get(CACHE_DIRECTORY_VARIABLE)
+    return Path(directory) if directory else Path.home() / ".cache" / "morl4water"
+
+
+def _cache_path(path: Path, directory: Path) -> Path:
+    # The key changes whenever the source file is modified, stale entries are simply never read again.
+    stat = path.stat()
+    key = hashlib.sha1(f"{path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:16]
+    return directory / f"{path.stem}-{key}.npy"
+
+
+def load_data(path: Union[str, Path], directory: Optional[Path] = None) -> np.ndarray:
+    """
+    Loads a text data file like `np.loadtxt`, parsing it only once.
+
+    On the first load the parsed array is written to a .npy file in the cache directory, keyed by the path and the
+    modification time of the text file. Later loads (in any process) memory-map that file read-only, so all workers
+    of an experiment share a single copy of the data in the page cache; within a process the mapped array is reused.
+    If the cache cannot be written, the parsed array is returned.
+
+    Args:
+        path (Union[str, Path]): Path of the text file.
+        directory (Optional[Path]): Cache directory, defaults to `cache_directory()`.
+
+    Returns:
+        np.ndarray: The read-only data of the file.
+    """
+    path = Path(path)
+    cached = _cache_path(path, directory or cache_directory())
+    if cached in _loaded:
+        return _loaded[cached]
+    if not cached.exists():
+        data = np.loadtxt(path)
+        try:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            # Written under a temporary name and renamed, so concurrent workers never read a partial file.
+            with tempfile.NamedTemporaryFile(dir=cached.parent, suffix=".npy", delete=False) as file:
+                np.save(file, data)
+            os.replace(file.name, cached)
+        except OSError:
+            return data
+    # A plain ndarray view, so arithmetic on the data does not produce memmaps.
+    _loaded[cached] = np.asarray(np.load(cached, mmap_mode="r"))
+    return _loaded[cached]
@@ -0,0 +1,195 @@
+import numpy as np
+from typing import Any, Iterator, Optional
+
+
+class History:
+    """
+    Fixed-capacity, array-backed record of a facility state over time.
+
+    It is a drop-in replacement for the lists facilities append their state to every timestep: values are indexed
+    by timestep (negative indices count from the latest value), `len` is the number of recorded timesteps and
+    `clear` only rewinds a cursor, so the buffer is reused across episodes. The buffer doubles when it is full.
+
+    With `last` set, only the latest `last` values are kept in a ring buffer, while indices and `len` still refer to
+    all recorded timesteps; reading an older value raises an IndexError.
+
+    The element shape is taken from the first value. Numeric values are stored as float64; if a later value has
+    another shape (or values are not numeric), the history falls back to storing Python objects.
+
+    Attributes
+    ----------
+    capacity : int
+        Number of values the buffer can hold before it has to grow.
+    last : Optional[int]
+        Number of latest values kept, or None to keep the whole history.
+    """
+
+    def __init__(self, capacity: int = 64, last: Optional[int] = None) -> None:
+        """
+        Initializes a History instance.
+
+        Args:
+            capacity (int): Number of values to preallocate, usually the episode horizon.
+            last (Optional[int]): Number of latest values to keep; None keeps the whole history.
+        """
+        self.configure(capacity, last)
+
+    def configure(self, capacity: int, last: Optional[int] = None) -> None:
+        """
+        Sets the capacity and the bounded mode of the history.
+
+        Values recorded so far are kept (only the latest `last` ones in bounded mode) and become the first ones of
+        the reconfigured history.
+
+        Args:
+            capacity (int): Number of values to preallocate, usually the episode horizon.
+            last (Optional[int]): Number of latest values to keep; None keeps the whole history.
+        """
+        recorded = list(self.values()) if getattr(self, "_data", None) is not None else []
+        if last is not None:
+            recorded = recorded[-last:]
+
+        # A bounded history is a ring buffer of exactly `last` values.
+        self.capacity: int = max(1, capacity if last is None else last)
+        self.last: Optional[int] = last
+        self._data: Optional[np.ndarray] = None
+        self._shape: tuple = ()
+        self._length: int = 0
+        for value in recorded:
+            self.append(value)
+
+    def _allocate(self, value: Any) -> None:
+        self._shape = np.shape(value)
+        dtype = np.float64 if np.asarray(value).dtype.kind in "iuf" else object
+        while self.last is None and self.capacity < self._length:
+            self.capacity *= 2
+        self._data = np.empty((self.capacity,) + (self._shape if dtype is np.float64 else ()), dtype=dtype)
+        # Timesteps rewound to before anything was recorded are unknown.
+        if self._length:
+            self._data[:] = self._unknown()
+
+    def _unknown(self) -> Any:
+        return np.nan if self._data.dtype != object else None
+
+    def _to_objects(self) -> None:
+        data = np.empty(self.capacity, dtype=object)
+        for index in range(min(self._length, self.capacity)):
+            data[index] = self._data[index] if self._data.ndim == 1 else self._data[index].copy()
+        self._data = data
+
+    def _grow(self) -> None:
+        self.capacity *= 2
+        data = np.empty((self.capacity,) + self._data.shape[1:], dtype=self._data.dtype)
+        data[: self._length] = self._data[: self._length]
+        self._data = data
+
+    def _position(self, timestep: int) -> int:
+        if timestep < 0:
+            timestep += self._length
+        if timestep < 0 or timestep >= self._length:
+            raise IndexError("History index out of range")
+        if self.last is None:
+            return timestep
+        if timestep < self._length - self.last:
+            raise IndexError(f"Only the last {self.last} values are kept in the history")
+        return timestep % self.capacity
+
+    def append(self, value: Any) -> None:
+        """
+        Records the value of the next timestep.
+
+        Args:
+            value (Any): The value to record.
+        """
+        if self._data is None:
+            self._allocate(value)
+        elif self._data.dtype != object:
+            shape = () if isinstance(value, (float, int, np.floating, np.integer)) else np.shape(value)
+            if shape != self._shape:
+                self._to_objects()
+
+        if self.last is None and self._length == self.capacity:
+            self._grow()
+        self._data[self._length % self.capacity if self.last is not None else self._length] = value
+        self._length += 1
+
+    def clear(self) -> None:
+        """
+        Forgets all recorded values, keeping the allocated buffer.
+        """
+        self._length = 0
+
+    def rewind(self, length: int, latest: Any = None) -> None:
+        """
+        Sets the number of recorded values, e.g. to restore the history of a snapshot.
+
+        Values that were recorded by this history are kept, values it never recorded are unknown and set to NaN
+        (None when storing objects).
+
+        Args:
+            length (int): Number of recorded timesteps.
+            latest (Any): If given, the value of the last recorded timestep.
+        """
+        if self._data is None:
+            if latest is None:
+                # The buffer is allocated by the first value, which determines its shape.
+                self._length = length
+                return
+            self._allocate(latest)
+        while self.last is None and length > self.capacity:
+            self._grow()
+
+        unknown = self._unknown()
+        if self.last is None:
+            self._data[self._length:length] = unknown
+        else:
+            # The ring buffer holds the timesteps in [first_held, self._length).
+            first_held = max(0, self._length - self.capacity)
+            for timestep in range(max(0, length - self.capacity), length):
+                if not first_held <= timestep < self._length:
+                    self._data[timestep % self.capacity] = unknown
+        self._length = length
+
+        if latest is not None:
+            self[-1] = latest
+
+    def values(self) -> np.ndarray:
+        """
+        Returns the kept values in chronological order.
+
+        Returns:
+            np.ndarray: A view on the buffer, or a copy if the ring buffer of a bounded history has wrapped around.
+        """
+        if self._data is None:
+            return np.full(min(self._length, self.last or self._length), np.nan)
+        if self.last is None or self._length <= self.capacity:
+            return self._data[: self._length]
+        start = self._length % self.capacity
+        return np.concatenate((self._data[start:], self._data[:start]))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, timestep: int) -> Any:
+        position = self._position(timestep)
+        if self._data is None:
+            return np.nan
+        value = self._data[position]
+        # Rows of a multidimensional buffer are copied, the buffer is reused once the history wraps or is cleared.
+        return value.copy() if isinstance(value, np.ndarray) and self._data.dtype != object else value
+
+    def __setitem__(self, timestep: int, value: Any) -> None:
+        position = self._position(timestep)
+        if self._data is None:
+            self._allocate(value)
+        self._data[position] = value
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.values())
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        values = self.values()
+        return values if dtype is None else values.astype(dtype)
+
+    def __repr__(self) -> str:
+        return f"History({self.values()!r})"
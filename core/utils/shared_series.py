@@ -0,0 +1,176 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Union
+
+import numpy as np
+
+from core.models.catchment import Catchment
+from core.models.facility import ControlledFacility, Facility
+from core.models.flow import Flow, Inflow
+from core.models.irrigation_district import IrrigationDistrict
+from core.models.power_plant import PowerPlant
+
+SHARED_SERIES_VARIABLE = "MORL4WATER_SHARED_SERIES"
+
+# Read-only time series of every facility type that can be shared between processes.
+SERIES_ATTRIBUTES: dict[type, tuple[str, ...]] = {
+    Inflow: ("all_inflow",),
+    Catchment: ("all_water_accumulated",),
+    IrrigationDistrict: ("all_demand",),
+    PowerPlant: ("energy_prices",),
+}
+
+# Blocks attached by this process, shared by all environments built in it and kept open for its lifetime.
+_attached: dict[str, SharedMemory] = {}
+
+
+def _series(water_systems: list[Union[Facility, ControlledFacility, Flow]]):
+    for water_system in water_systems:
+        for facility_type, attributes in SERIES_ATTRIBUTES.items():
+            if isinstance(water_system, facility_type):
+                for attribute in attributes:
+                    if getattr(water_system, attribute, None) is not None:
+                        yield water_system, attribute
+
+
+def _attach(name: str) -> SharedMemory:
+    if name not in _attached:
+        if sys.version_info >= (3, 13):
+            _attached[name] = SharedMemory(name=name, track=False)
+        else:
+            # Before Python 3.13 attaching registers the block with the resource tracker, which unlinks it when the
+            # tracker shuts down. Processes started by multiprocessing share the tracker of the publishing process,
+            # where the block is registered already; any other process has its own tracker, so the block is
+            # unregistered from it again, as only the publishing process may unlink it.
+            block = SharedMemory(name=name)
+            if os.name == "posix" and multiprocessing.parent_process() is None:
+                resource_tracker.unregister(block._name, "shared_memory")
+            _attached[name] = block
+    return _attached[name]
+
+
+class SharedSeries:
+    """
+    Publishes the time series of a basin (inflows, catchment accumulations, irrigation demands and energy prices)
+    into shared memory, so that environments built in worker processes do not each hold their own copy.
+
+    The series are copied once into one shared memory block each. While published, the descriptors of the blocks
+    are exported in the MORL4WATER_SHARED_SERIES environment variable, which worker processes inherit;
+    `WaterManagementSystem` then replaces its series by read-only views on the blocks when it is built. The blocks
+    are removed by `close`, or when leaving the `with` block.
+
+    Attributes
+    ----------
+    descriptors : dict[str, dict[str, tuple[str, list[int]]]]
+        Shared memory block name and shape of every series, per facility name and attribute.
+    """
+
+    def __init__(self, water_systems: list[Union[Facility, ControlledFacility, Flow]], export: bool = True) -> None:
+        """
+        Initializes a SharedSeries instance, copying the series of the water systems into shared memory.
+
+        Parameters
+        ----------
+        water_systems : list[Union[Facility, ControlledFacility, Flow]]
+            The water systems of the basin, e.g. `env.unwrapped.water_systems`.
+        export : bool, optional
+            Whether to export the descriptors to the environment of worker processes (default is True).
+        """
+        self.descriptors: dict[str, dict[str, tuple[str, list[int]]]] = {}
+        self._blocks: list[SharedMemory] = []
+        for water_system, attribute in _series(water_systems):
+            series = np.asarray(getattr(water_system, attribute), dtype=np.float64)
+            block = SharedMemory(create=True, size=max(series.nbytes, 1))
+            np.ndarray(series.shape, dtype=np.float64, buffer=block.buf)[...] = series
+            self._blocks.append(block)
+            # Environments built in this process use the published blocks directly.
+            _attached[block.name] = block
+            self.descriptors.setdefault(water_system.name, {})[attribute] = (block.name, list(series.shape))
+
+        self._exported: bool = export
+        if export:
+            os.environ[SHARED_SERIES_VARIABLE] = json.dumps(self.descriptors)
+
+    def close(self) -> None:
+        """
+        Removes the shared memory blocks. Environments that attached to them must not be used afterwards.
+        """
+        if self._exported and os.environ.get(SHARED_SERIES_VARIABLE) == json.dumps(self.descriptors):
+            del os.environ[SHARED_SERIES_VARIABLE]
+        for block in self._blocks:
+            _attached.pop(block.name, None)
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> "SharedSeries":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def attach_series(
+    water_systems: list[Union[Facility, ControlledFacility, Flow]],
+    descriptors: Optional[dict[str, dict[str, tuple[str, list[int]]]]] = None,
+) -> int:
+    """
+    Replaces the series of the water systems by read-only views on the published shared memory blocks.
+
+    Series are only replaced if a block was published for the facility name and attribute and has the same shape,
+    so environments built from other data keep their own series.
+
+    Parameters
+    ----------
+    water_systems : list[Union[Facility, ControlledFacility, Flow]]
+        The water systems to attach.
+    descriptors : Optional[dict[str, dict[str, tuple[str, list[int]]]]], optional
+        Descriptors of the blocks, read from the MORL4WATER_SHARED_SERIES environment variable by default.
+
+    Returns
+    -------
+    int
+        Number of series that were attached.
+    """
+    if descriptors is None:
+        if SHARED_SERIES_VARIABLE not in os.environ:
+            return 0
+        descriptors = json.loads(os.environ[SHARED_SERIES_VARIABLE])
+
+    attached = 0
+    for water_system, attribute in _series(water_systems):
+        block_name, shape = descriptors.get(water_system.name, {}).get(attribute, (None, None))
+        if block_name is None or np.shape(getattr(water_system, attribute)) != tuple(shape):
+            continue
+        series = np.ndarray(tuple(shape), dtype=np.float64, buffer=_attach(block_name).buf)
+        series.flags.writeable = False
+        setattr(water_system, attribute, series)
+        attached += 1
+    return attached
+
+
+def series_fingerprint(water_systems: list[Union[Facility, ControlledFacility, Flow]]) -> str:
+    """
+    Returns a digest of the shareable time series of a basin, which identifies its inflow scenario.
+
+    Parameters
+    ----------
+    water_systems : list[Union[Facility, ControlledFacility, Flow]]
+        The water systems of the basin, e.g. `env.unwrapped.water_systems`.
+
+    Returns
+    -------
+    str
+        Hexadecimal digest of the facility names, attributes and values of the series.
+    """
+    digest = hashlib.sha1()
+    for water_system, attribute in _series(water_systems):
+        series = np.ascontiguousarray(getattr(water_system, attribute), dtype=np.float64)
+        digest.update(f"{water_system.name}:{attribute}:{series.shape}".encode())
+        digest.update(series.tobytes())
+    return digest.hexdigest()[:16]
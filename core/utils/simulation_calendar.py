@@ -0,0 +1,190 @@
+import numpy as np
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+
+
+class CalendarSubsteps:
+    """
+    Integration sub-steps of a single simulation timestep.
+
+    Attributes
+    ----------
+    seconds : np.ndarray
+        Duration of every sub-step in seconds.
+    weekdays : np.ndarray
+        Weekday (Monday is 0) at the start of every sub-step.
+    hours : np.ndarray
+        Hour of the day at the start of every sub-step.
+    days_of_year : np.ndarray
+        Zero-based day of the year at the start of every sub-step.
+    """
+
+    def __init__(self, dates: list[datetime], seconds: list[float]) -> None:
+        self.seconds: np.ndarray = np.array(seconds, dtype=np.float64)
+        self.weekdays: np.ndarray = np.array([date.weekday() for date in dates], dtype=np.int64)
+        self.hours: np.ndarray = np.array([date.hour for date in dates], dtype=np.int64)
+        self.days_of_year: np.ndarray = np.array([date.timetuple().tm_yday - 1 for date in dates], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.seconds)
+
+
+class SimulationCalendar:
+    """
+    Calendar of a simulation, holding everything facilities need to know about the dates of every timestep.
+
+    The dates are advanced exactly as the environment advances its own date (``date += timestep_size``), so all
+    values are identical to the ones obtained with datetime arithmetic during the simulation. The calendar is built
+    once for a known horizon and grown on demand, sub-step durations and period lengths are memoised per timestep.
+
+    Attributes
+    ----------
+    start_date : datetime
+        Date of the first timestep.
+    timestep_size : relativedelta
+        Size of a simulation timestep.
+    dates : list[datetime]
+        Start date of every timestep.
+    timestep_seconds : list[float]
+        Length of every timestep in seconds.
+    months : list[int]
+        Zero-based month of every timestep.
+    days_of_year : list[int]
+        Zero-based day of the year of every timestep.
+    hours : list[int]
+        Hour of the day of every timestep.
+    weekdays : list[int]
+        Weekday (Monday is 0) of every timestep.
+    """
+
+    def __init__(self, start_date: datetime, timestep_size: relativedelta, horizon: int = 0) -> None:
+        """
+        Initializes a SimulationCalendar instance.
+
+        Args:
+            start_date (datetime): Date of the first timestep.
+            timestep_size (relativedelta): Size of a simulation timestep.
+            horizon (int): Number of timesteps to precompute; later timesteps are computed when first needed.
+        """
+        self.start_date: datetime = start_date
+        self.timestep_size: relativedelta = timestep_size
+
+        self.dates: list[datetime] = [start_date]
+        self.timestep_seconds: list[float] = []
+        self.months: list[int] = []
+        self.days_of_year: list[int] = []
+        self.hours: list[int] = []
+        self.weekdays: list[int] = []
+
+        self._period_seconds: dict[tuple[int, relativedelta], float] = {}
+        self._substeps: dict[tuple[int, relativedelta], CalendarSubsteps] = {}
+
+        self.extend(horizon)
+
+    def extend(self, timestep: int) -> None:
+        """
+        Makes sure all per-timestep values up to and including the given timestep are available.
+
+        Args:
+            timestep (int): Index of the timestep that is needed.
+        """
+        while len(self.timestep_seconds) <= timestep:
+            current_date = self.dates[-1]
+            final_date = current_date + self.timestep_size
+            self.dates.append(final_date)
+            self.timestep_seconds.append((final_date - current_date).total_seconds())
+            self.months.append(current_date.month - 1)
+            self.days_of_year.append(current_date.timetuple().tm_yday - 1)
+            self.hours.append(current_date.hour)
+            self.weekdays.append(current_date.weekday())
+
+    def date(self, timestep: int) -> datetime:
+        """
+        Returns the start date of a timestep (which is the end date of the previous one).
+
+        Args:
+            timestep (int): Index of the timestep.
+
+        Returns:
+            datetime: Start date of the timestep.
+        """
+        self.extend(timestep)
+        return self.dates[timestep]
+
+    def seconds(self, timestep: int) -> float:
+        """
+        Returns the length of a timestep in seconds.
+
+        Args:
+            timestep (int): Index of the timestep.
+
+        Returns:
+            float: Length of the timestep in seconds.
+        """
+        self.extend(timestep)
+        return self.timestep_seconds[timestep]
+
+    def period_seconds(self, timestep: int, period: relativedelta) -> float:
+        """
+        Returns the length in seconds of a period (e.g. the timestep of a time series) starting at a timestep.
+
+        Args:
+            timestep (int): Index of the timestep the period starts at.
+            period (relativedelta): Size of the period.
+
+        Returns:
+            float: Length of the period in seconds.
+        """
+        key = (timestep, period)
+        if key not in self._period_seconds:
+            start_date = self.date(timestep)
+            self._period_seconds[key] = (start_date + period - start_date).total_seconds()
+        return self._period_seconds[key]
+
+    def time_idx(self, timestep: int, series_timestep: relativedelta) -> int:
+        """
+        Maps a timestep to the index in a yearly time series with the given interval.
+
+        Args:
+            timestep (int): Index of the timestep.
+            series_timestep (relativedelta): Interval of the time series (months, days or hours).
+
+        Returns:
+            int: The index corresponding to the timestep in the time series.
+
+        Raises:
+            ValueError: If the interval is unsupported (i.e., not months, days, or hours).
+        """
+        self.extend(timestep)
+        if series_timestep.months > 0:
+            return self.months[timestep]
+        elif series_timestep.days > 0:
+            return self.days_of_year[timestep]
+        elif series_timestep.hours > 0:
+            return self.days_of_year[timestep] * 24 + self.hours[timestep] - 1
+        else:
+            raise ValueError('The timestep is not supported, only time series with intervals of months, days, hours are supported')
+
+    def substeps(self, timestep: int, integration_timestep_size: relativedelta) -> CalendarSubsteps:
+        """
+        Returns the integration sub-steps of a timestep, the last sub-step is shortened to end on the next timestep.
+
+        Args:
+            timestep (int): Index of the timestep.
+            integration_timestep_size (relativedelta): Size of a sub-step.
+
+        Returns:
+            CalendarSubsteps: Durations and dates of the sub-steps.
+        """
+        key = (timestep, integration_timestep_size)
+        if key not in self._substeps:
+            current_date = self.date(timestep)
+            final_date = self.date(timestep + 1)
+            dates, seconds = [], []
+            while current_date < final_date:
+                next_date = min(final_date, current_date + integration_timestep_size)
+                dates.append(current_date)
+                seconds.append((next_date - current_date).total_seconds())
+                current_date = next_date
+            self._substeps[key] = CalendarSubsteps(dates, seconds)
+        return self._substeps[key]
@@ -69,3 +69,82 @@ def interpolate_tailwater_level(X, Y, x):
         y = np.interp(x, X, Y)
     return y
 
+
+
+@njit
+def pairwise_sum(a, start, n):
+    # Same summation order as numpy's pairwise sum, so np.mean results are reproduced bit-for-bit.
+    if n < 8:
+        res = 0.0
+        for i in range(start, start + n):
+            res += a[i]
+        return res
+    elif n <= 128:
+        r0, r1, r2, r3 = a[start], a[start + 1], a[start + 2], a[start + 3]
+        r4, r5, r6, r7 = a[start + 4], a[start + 5], a[start + 6], a[start + 7]
+        i = 8
+        while i < n - (n % 8):
+            r0 += a[start + i]
+            r1 += a[start + i + 1]
+            r2 += a[start + i + 2]
+            r3 += a[start + i + 3]
+            r4 += a[start + i + 4]
+            r5 += a[start + i + 5]
+            r6 += a[start + i + 6]
+            r7 += a[start + i + 7]
+            i += 8
+        res = ((r0 + r1) + (r2 + r3)) + ((r4 + r5) + (r6 + r7))
+        while i < n:
+            res += a[start + i]
+            i += 1
+        return res
+    else:
+        n2 = n // 2
+        n2 -= n2 % 8
+        return pairwise_sum(a, start, n2) + pairwise_sum(a, start + n2, n - n2)
+
+
+@njit
+def integrate_reservoir(
+    storage,
+    inflow,
+    total_action,
+    integration_seconds,
+    evaporation_rate_per_second,
+    spillage,
+    storage_to_surface_rel,
+    storage_to_minmax_rel,
+):
+    """
+    Integrates the storage of a reservoir over the sub-steps of one timestep.
+
+    All inputs except the curves and sub-step durations are arrays with one entry per scenario, so the same kernel
+    serves a single reservoir (arrays of length 1) and batches of scenarios.
+
+    Returns the final storage and the mean release per second of every scenario.
+    """
+    n_scenarios = storage.shape[0]
+    n_substeps = integration_seconds.shape[0]
+    final_storage = np.empty(n_scenarios)
+    average_release = np.empty(n_scenarios)
+    sub_releases = np.empty(n_substeps)
+
+    for i in range(n_scenarios):
+        current_storage = storage[i]
+        for k in range(n_substeps):
+            integration_time_seconds = integration_seconds[k]
+            surface = np.interp(current_storage, storage_to_surface_rel[0], storage_to_surface_rel[1])
+            evaporation = surface * (evaporation_rate_per_second * integration_time_seconds)
+            min_possible_release = np.interp(current_storage, storage_to_minmax_rel[0], storage_to_minmax_rel[1])
+            max_possible_release = np.interp(current_storage, storage_to_minmax_rel[0], storage_to_minmax_rel[2])
+            release_per_second = min(max_possible_release, max(min_possible_release, total_action[i]))
+            sub_releases[k] = release_per_second
+
+            total_addition = inflow[i] * integration_time_seconds
+            current_storage += (
+                total_addition - evaporation - (release_per_second - spillage) * integration_time_seconds
+            )
+        final_storage[i] = current_storage
+        average_release[i] = pairwise_sum(sub_releases, 0, n_substeps) / n_substeps
+
+    return final_storage, average_release
@@ -0,0 +1,10 @@
+from . import cache
+from . import checkpoint
+from . import evaluator
+from . import fidelity
+from . import hypervolume
+from . import islands
+from . import progress
+from . import racing
+from . import solutions
+from . import surrogate
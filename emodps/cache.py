@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Sequence, Union
+
+import numpy as np
+
+
+class ObjectiveCache:
+    """
+    Content-addressed cache of the objectives of deterministic EMODPS rollouts.
+
+    Entries are keyed by a digest of the env id, the inflow-scenario id, the policy and simulation settings in
+    `config` (e.g. the RBF configuration and the horizon) and the decision vector, so a cache shared across runs
+    never answers a rollout of another setup. Recently used
+    entries are kept in an in-memory LRU tier of at most `max_entries`; with a `directory`, every entry is also
+    stored as a .npy file there, so runs and seeds on the same env and scenario share their rollouts. Decision
+    vectors can be rounded to `decimals` before hashing, so near-identical vectors hit the same entry.
+
+    Parameters
+    ----------
+    env_id : str
+        Id of the simulated env, e.g. "nile-v0".
+    scenario_id : str
+        Id of the inflow scenario and horizon, e.g. from `series_fingerprint`.
+    config : Optional[dict[str, Any]], optional
+        JSON-serializable settings the objectives depend on besides the decision vector, e.g. the numbers of RBF
+        inputs, outputs and kernels and the horizon.
+    max_entries : int, optional
+        Number of entries of the in-memory tier (default is 100000).
+    directory : Optional[Union[str, Path]], optional
+        Directory of the on-disk tier, which is disabled by default.
+    decimals : Optional[int], optional
+        Number of decimals decision vectors are rounded to before hashing, by default they are hashed exactly.
+
+    Attributes
+    ----------
+    hits : int
+        Number of lookups answered from the cache.
+    misses : int
+        Number of lookups that required a rollout.
+    """
+
+    def __init__(
+        self,
+        env_id: str,
+        scenario_id: str,
+        config: Optional[dict[str, Any]] = None,
+        max_entries: int = 100000,
+        directory: Optional[Union[str, Path]] = None,
+        decimals: Optional[int] = None,
+    ) -> None:
+        self.env_id: str = env_id
+        self.scenario_id: str = scenario_id
+        self.config: dict[str, Any] = dict(config or {})
+        self.config_id: str = hashlib.sha1(json.dumps(self.config, sort_keys=True).encode()).hexdigest()[:16]
+        self.max_entries: int = max_entries
+        self.directory: Optional[Path] = Path(directory) / env_id / scenario_id if directory is not None else None
+        self.decimals: Optional[int] = decimals
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+
+    def key(self, decision_vector: Sequence[float]) -> str:
+        """
+        Returns the content address of a decision vector.
+
+        Parameters
+        ----------
+        decision_vector : Sequence[float]
+            The decoded decision vector.
+
+        Returns
+        -------
+        str
+            Hexadecimal digest of the env id, the scenario id, the config and the decision vector.
+        """
+        decision_vector = np.ascontiguousarray(decision_vector, dtype=np.float64)
+        if self.decimals is not None:
+            # Adding 0.0 turns -0.0 into 0.0, so both round to the same key.
+            decision_vector = np.round(decision_vector, self.decimals) + 0.0
+        digest = hashlib.sha1(f"{self.env_id}:{self.scenario_id}:{self.config_id}:".encode())
+        digest.update(decision_vector.tobytes())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[tuple]:
+        """
+        Looks up the objectives stored under a key, counting a hit or a miss.
+
+        Parameters
+        ----------
+        key : str
+            The key returned by `key`.
+
+        Returns
+        -------
+        Optional[tuple]
+            The objectives, or None if they are not cached.
+        """
+        objectives = self._entries.get(key)
+        if objectives is not None:
+            self._entries.move_to_end(key)
+        elif self.directory is not None and (self.directory / f"{key}.npy").exists():
+            objectives = tuple(float(objective) for objective in np.load(self.directory / f"{key}.npy"))
+            self._remember(key, objectives)
+
+        if objectives is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return objectives
+
+    def put(self, key: str, objectives: Sequence[float]) -> None:
+        """
+        Stores the objectives of a rollout under a key.
+
+        Parameters
+        ----------
+        key : str
+            The key returned by `key`.
+        objectives : Sequence[float]
+            The objectives returned by `run_episode`.
+        """
+        objectives = tuple(float(objective) for objective in np.atleast_1d(objectives))
+        self._remember(key, objectives)
+        if self.directory is not None:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                # Written under a temporary name and renamed, so concurrent runs never read a partial file.
+                with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".npy", delete=False) as file:
+                    np.save(file, np.asarray(objectives, dtype=np.float64))
+                os.replace(file.name, self.directory / f"{key}.npy")
+            except OSError:
+                pass
+
+    def _remember(self, key: str, objectives: tuple) -> None:
+        self._entries[key] = objectives
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Fraction of the lookups answered from the cache.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,208 @@
+import logging
+import os
+import pickle
+import random
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+from platypus.config import PlatypusConfig
+from platypus.core import nondominated_sort
+
+from .solutions import export_solutions, import_solutions
+
+LOGGER = logging.getLogger(__name__)
+
+CHECKPOINT_PREFIX = "checkpoint-"
+
+
+class Checkpointer:
+    """
+    Periodic, atomic checkpoints of an EpsNSGAII run, written in a background thread.
+
+    Every `interval` NFE, called as (part of) the run callback, it snapshots the population, the epsilon-archive and
+    its improvements, the NFE counter, the population size, the counters of the algorithm's extensions, the states
+    of `random` and of the NumPy RNG, and the `get_state()` of every entry of `components` (e.g. TrackProgress).
+    The snapshot is pickled and written by a background thread, under a temporary name that is then renamed, so a
+    crash never leaves a partial checkpoint. If the previous checkpoint is still being written, the pending one is
+    replaced by the newer snapshot, so the search never waits for the disk. Only the `keep` most recent checkpoints
+    are kept.
+
+    Parameters
+    ----------
+    directory : Union[str, Path]
+        Directory the checkpoints are written to.
+    interval : int, optional
+        NFE between two checkpoints (default is 5000).
+    components : Optional[dict[str, Any]], optional
+        Objects with `get_state()` and `set_state(state)` saved with the algorithm, by name.
+    keep : int, optional
+        Number of checkpoints kept (default is 2).
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        interval: int = 5000,
+        components: Optional[dict[str, Any]] = None,
+        keep: int = 2,
+    ) -> None:
+        self.directory: Path = Path(directory)
+        self.interval: int = interval
+        self.components: dict[str, Any] = components or {}
+        self.keep: int = keep
+        self.next_checkpoint: int = interval
+
+        self._pending: Optional[dict] = None
+        self._closed: bool = False
+        self._condition = threading.Condition()
+        self._writer = threading.Thread(target=self._write_pending, name="checkpoint-writer", daemon=True)
+        self._writer.start()
+
+    def __call__(self, algorithm) -> None:
+        if algorithm.nfe >= self.next_checkpoint:
+            self.next_checkpoint = (algorithm.nfe // self.interval + 1) * self.interval
+            self.save(algorithm)
+
+    def snapshot(self, algorithm) -> dict:
+        """
+        Captures the state of a run.
+
+        Parameters
+        ----------
+        algorithm : EpsNSGAII
+            The running algorithm.
+
+        Returns
+        -------
+        dict
+            The state, holding only plain Python and NumPy objects.
+        """
+        return {
+            "nfe": algorithm.nfe,
+            "population_size": algorithm.population_size,
+            "population": export_solutions(algorithm.population),
+            "archive": export_solutions(algorithm.archive),
+            "improvements": algorithm.archive.improvements,
+            "extensions": [
+                {
+                    key: value for key, value in vars(extension).items()
+                    if isinstance(value, int) and not isinstance(value, bool)
+                }
+                for extension in algorithm._extensions
+            ],
+            "random": random.getstate(),
+            "numpy_random": np.random.get_state(),
+            "components": {name: component.get_state() for name, component in self.components.items()},
+        }
+
+    def save(self, algorithm) -> None:
+        """
+        Queues a checkpoint of the current state of a run for the background writer.
+
+        Parameters
+        ----------
+        algorithm : EpsNSGAII
+            The running algorithm.
+        """
+        snapshot = self.snapshot(algorithm)
+        with self._condition:
+            self._pending = snapshot
+            self._condition.notify()
+
+    def _write_pending(self) -> None:
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                snapshot, self._pending = self._pending, None
+            try:
+                self._write(snapshot)
+            except OSError:
+                LOGGER.exception("Writing the checkpoint at %d NFE failed", snapshot["nfe"])
+
+    def _write(self, snapshot: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{CHECKPOINT_PREFIX}{snapshot['nfe']:012d}.pkl"
+        # Written under a temporary name and renamed, so a crash never leaves a partial checkpoint.
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as file:
+            pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(file.name, path)
+        LOGGER.info("Wrote checkpoint %s", path)
+
+        for old in sorted(self.directory.glob(f"{CHECKPOINT_PREFIX}*.pkl"))[:-self.keep]:
+            old.unlink(missing_ok=True)
+
+    def latest(self) -> Optional[Path]:
+        """
+        Returns the most recent checkpoint in the directory, or None if there is none.
+        """
+        checkpoints = sorted(self.directory.glob(f"{CHECKPOINT_PREFIX}*.pkl"))
+        return checkpoints[-1] if checkpoints else None
+
+    def restore(self, algorithm, path: Optional[Union[str, Path]] = None) -> bool:
+        """
+        Restores a checkpoint into a freshly created algorithm, so that running it continues the checkpointed run.
+
+        The archive is restored in place, so evaluators racing or screening against it keep working.
+
+        Parameters
+        ----------
+        algorithm : EpsNSGAII
+            The algorithm, created like the checkpointed one and not run yet.
+        path : Optional[Union[str, Path]], optional
+            The checkpoint, the latest one in the directory by default.
+
+        Returns
+        -------
+        bool
+            Whether a checkpoint was restored.
+        """
+        path = Path(path) if path is not None else self.latest()
+        if path is None:
+            return False
+        with open(path, "rb") as file:
+            snapshot = pickle.load(file)
+
+        algorithm.nfe = snapshot["nfe"]
+        algorithm.population_size = snapshot["population_size"]
+        algorithm.population = import_solutions(algorithm.problem, snapshot["population"])
+        # Selection relies on the ranks and crowding distances of the population.
+        nondominated_sort(algorithm.population)
+        algorithm.archive.extend(import_solutions(algorithm.problem, snapshot["archive"]))
+        algorithm.archive.improvements = snapshot["improvements"]
+        algorithm.result = algorithm.archive
+        if algorithm.variator is None:
+            algorithm.variator = PlatypusConfig.default_variator(algorithm.problem)
+        for extension, counters in zip(algorithm._extensions, snapshot["extensions"]):
+            for key, value in counters.items():
+                setattr(extension, key, value)
+
+        random.setstate(snapshot["random"])
+        np.random.set_state(snapshot["numpy_random"])
+        for name, state in snapshot["components"].items():
+            if name in self.components:
+                self.components[name].set_state(state)
+
+        self.next_checkpoint = (algorithm.nfe // self.interval + 1) * self.interval
+        LOGGER.info("Resumed from checkpoint %s at %d NFE", path, algorithm.nfe)
+        return True
+
+    def close(self) -> None:
+        """
+        Waits until the pending checkpoint is written and stops the background writer.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._writer.join()
+
+    def __enter__(self) -> "Checkpointer":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,279 @@
+import logging
+import math
+import multiprocessing
+import os
+import time
+from typing import Any, Callable, Optional, Sequence, Union
+
+import numpy as np
+from platypus.core import Direction
+from platypus.evaluator import Evaluator
+
+from .cache import ObjectiveCache
+
+LOGGER = logging.getLogger(__name__)
+
+# Trainer (e.g. TrainNile) built once by every worker process of a WarmPoolEvaluator.
+_worker_trainer = None
+
+
+def _initialize_worker(create_trainer: Callable, create_trainer_args: tuple) -> None:
+    global _worker_trainer
+    _worker_trainer = create_trainer(*create_trainer_args)
+
+
+def _evaluate_chunk(task: tuple[int, np.ndarray, str, tuple]) -> tuple[int, list, int, float]:
+    chunk_index, decision_vectors, method, args = task
+    start = time.perf_counter()
+    if method == "run_episodes":
+        results = list(_worker_trainer.run_episodes(decision_vectors))
+    else:
+        function = getattr(_worker_trainer, method)
+        results = [function(decision_vector, *args) for decision_vector in decision_vectors]
+    return chunk_index, results, os.getpid(), time.perf_counter() - start
+
+
+class WorkerStats:
+    """
+    Throughput of a single worker of a WarmPoolEvaluator.
+
+    Attributes
+    ----------
+    evaluations : int
+        Number of decision vectors evaluated by the worker.
+    chunks : int
+        Number of chunks processed by the worker.
+    abandoned : int
+        Number of episodes abandoned by a race.
+    busy_seconds : float
+        Time the worker spent simulating.
+    """
+
+    def __init__(self) -> None:
+        self.evaluations: int = 0
+        self.chunks: int = 0
+        self.abandoned: int = 0
+        self.busy_seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """
+        Evaluations per second of simulation time.
+        """
+        return self.evaluations / self.busy_seconds if self.busy_seconds > 0 else 0.0
+
+
+class WarmPoolEvaluator(Evaluator):
+    """
+    Platypus evaluator running EMODPS rollouts on long-lived worker processes.
+
+    Every worker builds its trainer (env and RBF policy) once when it starts, afterwards only the decoded decision
+    vectors are sent to the workers, in chunks, and the objective tuples are sent back. Nothing is pickled per job
+    besides the decision vectors, and the workers stay warm for the whole run.
+
+    With `chunk_size="auto"`, every batch of jobs is split into about `chunks_per_worker` chunks per worker, which
+    balances the load while keeping the number of messages small. Per-worker throughput is collected in `stats` to
+    tune the chunk size and the number of workers.
+
+    After `race_against(algorithm)`, the objectives of the algorithm's archive are sent along with every chunk and
+    the workers abandon an episode as soon as it provably cannot enter the archive; its objectives are then the
+    optimistic bound returned by the trainer, flagged as `RacedObjectives`, which are never cached.
+
+    Parameters
+    ----------
+    create_trainer : Callable
+        Picklable function building the trainer in a worker; the trainer provides `run_episode(decision_vector)`
+        (and `run_episodes(decision_vectors)` if `batch_episodes` is set, or `run_episode(decision_vector,
+        race_front)` for racing).
+    create_trainer_args : tuple, optional
+        Arguments passed to `create_trainer`.
+    n_workers : Optional[int], optional
+        Number of worker processes, defaults to the number of CPUs.
+    chunk_size : Union[int, str], optional
+        Number of decision vectors sent to a worker at once, or "auto" (default).
+    chunks_per_worker : int, optional
+        Number of chunks per worker and batch of jobs when `chunk_size` is "auto" (default is 4).
+    batch_episodes : bool, optional
+        Whether workers simulate a chunk in lockstep with `run_episodes` instead of one episode at a time.
+    cache : Optional[ObjectiveCache], optional
+        Cache looked up before sending a decision vector to the workers; `run_episode` must return the objectives
+        only, without constraints.
+    """
+
+    def __init__(
+        self,
+        create_trainer: Callable,
+        create_trainer_args: tuple = (),
+        n_workers: Optional[int] = None,
+        chunk_size: Union[int, str] = "auto",
+        chunks_per_worker: int = 4,
+        batch_episodes: bool = False,
+        cache: Optional[ObjectiveCache] = None,
+    ) -> None:
+        super().__init__()
+        if chunk_size != "auto" and (not isinstance(chunk_size, int) or chunk_size < 1):
+            raise ValueError(f"chunk_size must be a positive integer or 'auto', got {chunk_size}.")
+
+        self.n_workers: int = n_workers or os.cpu_count() or 1
+        self.chunk_size: Union[int, str] = chunk_size
+        self.chunks_per_worker: int = chunks_per_worker
+        self.batch_episodes: bool = batch_episodes
+        self.cache: Optional[ObjectiveCache] = cache
+        self.race_archive = None
+
+        self.stats: dict[int, WorkerStats] = {}
+        self.wall_seconds: float = 0.0
+        self.pool = multiprocessing.Pool(self.n_workers, _initialize_worker, (create_trainer, create_trainer_args))
+        LOGGER.info("Started warm pool evaluator with %d workers", self.n_workers)
+
+    def race_against(self, algorithm) -> None:
+        """
+        Races the episodes of later evaluations against the archive of an algorithm.
+
+        Parameters
+        ----------
+        algorithm : AbstractGeneticAlgorithm
+            An algorithm with an archive, e.g. EpsNSGAII, whose objectives are all maximized.
+        """
+        if self.batch_episodes:
+            raise ValueError("Racing is not supported when simulating chunks with run_episodes.")
+        if any(direction != Direction.MAXIMIZE for direction in algorithm.problem.directions):
+            raise ValueError("Racing requires all objectives to be maximized.")
+        self.race_archive = algorithm.archive
+
+    def determine_chunk_size(self, n_jobs: int) -> int:
+        """
+        Determines the number of decision vectors per chunk for a batch of jobs.
+
+        Parameters
+        ----------
+        n_jobs : int
+            Number of jobs in the batch.
+
+        Returns
+        -------
+        int
+            The chunk size.
+        """
+        if self.chunk_size != "auto":
+            return self.chunk_size
+        return max(1, math.ceil(n_jobs / (self.n_workers * self.chunks_per_worker)))
+
+    def evaluate_decision_vectors(self, decision_vectors: Sequence[Sequence[float]]) -> list:
+        """
+        Evaluates decision vectors on the workers, answering the vectors found in `cache` without simulating them.
+
+        Parameters
+        ----------
+        decision_vectors : Sequence[Sequence[float]]
+            The decoded decision vectors.
+
+        Returns
+        -------
+        list
+            The results of `run_episode` for every decision vector, in order.
+        """
+        if self.cache is None:
+            return self._evaluate_on_workers(decision_vectors)
+
+        # Only the first occurrence of a vector missing from the cache is simulated, repeats count as hits.
+        keys = [self.cache.key(decision_vector) for decision_vector in decision_vectors]
+        cached: dict[str, Any] = {}
+        missing: dict[str, int] = {}
+        for index, key in enumerate(keys):
+            if key in missing:
+                self.cache.hits += 1
+                continue
+            objectives = self.cache.get(key)
+            if objectives is None:
+                missing[key] = index
+            else:
+                cached[key] = objectives
+
+        if missing:
+            results = self._evaluate_on_workers([decision_vectors[index] for index in missing.values()])
+            for key, result in zip(missing, results):
+                if not getattr(result, "abandoned", False):
+                    self.cache.put(key, result)
+                cached[key] = result
+        return [cached[key] for key in keys]
+
+    def _evaluate_on_workers(
+        self, decision_vectors: Sequence[Sequence[float]], method: Optional[str] = None, args: tuple = ()
+    ) -> list:
+        start = time.perf_counter()
+        chunk_size = self.determine_chunk_size(len(decision_vectors))
+        if method is None:
+            if self.batch_episodes:
+                method = "run_episodes"
+            elif self.race_archive is not None:
+                method = "run_episode"
+                args = (np.array([list(solution.objectives) for solution in self.race_archive], dtype=np.float64),)
+            else:
+                method = "run_episode"
+        tasks = [
+            (
+                chunk_index,
+                np.asarray(decision_vectors[first:first + chunk_size], dtype=np.float64),
+                method,
+                args,
+            )
+            for chunk_index, first in enumerate(range(0, len(decision_vectors), chunk_size))
+        ]
+
+        results: list[Any] = [None] * len(tasks)
+        for chunk_index, chunk_results, worker, busy_seconds in self.pool.imap_unordered(_evaluate_chunk, tasks):
+            results[chunk_index] = chunk_results
+            worker_stats = self.stats.setdefault(worker, WorkerStats())
+            worker_stats.evaluations += len(chunk_results)
+            worker_stats.chunks += 1
+            worker_stats.abandoned += sum(getattr(result, "abandoned", False) for result in chunk_results)
+            worker_stats.busy_seconds += busy_seconds
+
+        self.wall_seconds += time.perf_counter() - start
+        return [result for chunk_results in results for result in chunk_results]
+
+    def evaluate_all(self, jobs, **kwargs):
+        solutions = [job.solution for job in jobs]
+        decision_vectors = [
+            [solution.problem.types[i].decode(solution.variables[i]) for i in range(solution.problem.nvars)]
+            for solution in solutions
+        ]
+
+        # Mirrors Problem.__call__ and Problem.evaluate, with the function evaluated on the workers.
+        for solution, result in zip(solutions, self.evaluate_decision_vectors(decision_vectors)):
+            problem = solution.problem
+            objectives, constraints = result if problem.nconstrs > 0 else (result, [])
+            solution.objectives[:] = objectives if hasattr(objectives, "__getitem__") else [objectives]
+            solution.constraints[:] = constraints if hasattr(constraints, "__getitem__") else [constraints]
+            solution.constraint_violation = sum(
+                abs(f(x)) for (f, x) in zip(problem.constraints, solution.constraints)
+            )
+            solution.feasible = solution.constraint_violation == 0.0
+            solution.evaluated = True
+        return jobs
+
+    @property
+    def utilization(self) -> float:
+        """
+        Fraction of the wall-clock time of the evaluations the workers spent simulating.
+        """
+        busy_seconds = sum(worker_stats.busy_seconds for worker_stats in self.stats.values())
+        return busy_seconds / (self.wall_seconds * self.n_workers) if self.wall_seconds > 0 else 0.0
+
+    def log_stats(self) -> None:
+        """
+        Logs the throughput of every worker and the utilization of the pool.
+        """
+        for worker, worker_stats in sorted(self.stats.items()):
+            LOGGER.info(
+                "Worker %d: %d evaluations (%d abandoned) in %d chunks, %.2f evaluations/s",
+                worker, worker_stats.evaluations, worker_stats.abandoned, worker_stats.chunks, worker_stats.throughput,
+            )
+        LOGGER.info("Pool utilization: %.1f%%", 100 * self.utilization)
+
+    def close(self) -> None:
+        LOGGER.debug("Closing warm pool evaluator")
+        self.pool.close()
+        self.pool.join()
+        LOGGER.info("Closed warm pool evaluator")
@@ -0,0 +1,280 @@
+import logging
+from typing import Optional, Sequence, Union
+
+import numpy as np
+from platypus.core import Direction
+from scipy.stats import rankdata
+
+from core.models.facility import ControlledFacility, Facility
+from core.models.flow import Flow, Inflow
+
+from .evaluator import WarmPoolEvaluator
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LowFidelityObjectives(tuple):
+    """
+    Objectives of a candidate that was not promoted to a full-horizon simulation, capped at the worst objectives of
+    the archive so that it never enters it.
+
+    Attributes
+    ----------
+    estimate : tuple
+        The objectives estimated on short windows of the record.
+    """
+
+    low_fidelity = True
+
+    def __new__(cls, objectives: Sequence[float], estimate: Sequence[float]) -> "LowFidelityObjectives":
+        low_fidelity = super().__new__(cls, (float(objective) for objective in objectives))
+        low_fidelity.estimate = tuple(float(objective) for objective in estimate)
+        return low_fidelity
+
+    def __reduce__(self):
+        return LowFidelityObjectives, (tuple(self), self.estimate)
+
+
+def select_windows(
+    water_systems: list[Union[Facility, ControlledFacility, Flow]], horizon: int, window_steps: int, n_windows: int
+) -> list[int]:
+    """
+    Selects hydrologically diverse windows of the simulated record.
+
+    The horizon is split into consecutive windows of `window_steps`, which are ranked by the total inflow of the
+    basin; the selected windows are evenly spread over that ranking, from the driest to the wettest window.
+
+    Parameters
+    ----------
+    water_systems : list[Union[Facility, ControlledFacility, Flow]]
+        The water systems of the basin, e.g. `env.unwrapped.water_systems`.
+    horizon : int
+        Number of steps of a full episode.
+    window_steps : int
+        Number of steps of a window.
+    n_windows : int
+        Number of windows to select.
+
+    Returns
+    -------
+    list[int]
+        The first timesteps of the selected windows, in chronological order.
+    """
+    n_candidates = horizon // window_steps
+    if not 0 < n_windows <= n_candidates:
+        raise ValueError(f"Cannot select {n_windows} windows of {window_steps} steps from a horizon of {horizon}.")
+
+    timesteps = np.arange(n_candidates * window_steps)
+    inflow = np.zeros(len(timesteps))
+    for water_system in water_systems:
+        if isinstance(water_system, Inflow):
+            # Inflows loop over their series like Inflow.determine_source_inflow.
+            all_inflow = np.asarray(water_system.all_inflow, dtype=np.float64)
+            inflow += all_inflow[timesteps % len(all_inflow)]
+
+    ranking = np.argsort(inflow.reshape(n_candidates, window_steps).sum(axis=1), kind="stable")
+    selected = ranking[np.round(np.linspace(0, n_candidates - 1, n_windows)).astype(int)]
+    return sorted(int(window) * window_steps for window in selected)
+
+
+def _decision_vector(solution) -> list[float]:
+    # Decoded like WarmPoolEvaluator.evaluate_all.
+    return [solution.problem.types[i].decode(solution.variables[i]) for i in range(solution.problem.nvars)]
+
+
+def _key(decision_vector: Sequence[float]) -> bytes:
+    return np.asarray(decision_vector, dtype=np.float64).tobytes()
+
+
+def rank_correlation(x: np.ndarray, y: np.ndarray) -> float:
+    """
+    Returns the Spearman rank correlation of two samples.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        First sample.
+    y : np.ndarray
+        Second sample, of the same length.
+
+    Returns
+    -------
+    float
+        The rank correlation, or nan if either sample is constant or has less than two values.
+    """
+    if len(x) < 2 or np.ptp(x) == 0 or np.ptp(y) == 0:
+        return float("nan")
+    # Tied values share their average rank, so the correlation does not depend on the order of the samples.
+    return float(np.corrcoef(rankdata(x, method="average"), rankdata(y, method="average"))[0, 1])
+
+
+class MultiFidelityEvaluator(WarmPoolEvaluator):
+    """
+    WarmPoolEvaluator screening every candidate on short windows of the record before simulating the full horizon.
+
+    Every batch is first simulated with `run_windows` on the `window_starts`. Windows start from the initial state of
+    the basin, so their objectives are biased and are not compared with the full-horizon objectives of the archive:
+    the low-fidelity objectives of every promoted candidate are kept, and a candidate is screened against those of
+    the archive members. Candidates whose low-fidelity objectives, widened by `margin` times the range of the
+    archive's low-fidelity objectives, are not dominated by the low-fidelity objectives of a member are promoted to
+    a full-horizon evaluation (through the cache and race of the WarmPoolEvaluator). The others are returned as
+    `LowFidelityObjectives`, capped at the worst objectives of the archive, so they never enter it. Until
+    `screen_against(algorithm)` is called, for the first `calibration_evaluations`, and while fewer than two archive
+    members have low-fidelity objectives, every candidate is promoted.
+
+    Promoted candidates are evaluated at both fidelities, and `calibration_report` returns the rank correlation
+    between the fidelities per objective. The first batches are random candidates, so their correlation is not
+    biased towards promising candidates. Dominance is only tested on the objectives whose correlation is at least
+    `min_correlation`, as the windows do not rank candidates on the others; without any such objective, every
+    candidate is promoted.
+
+    Parameters
+    ----------
+    create_trainer : Callable
+        Picklable function building the trainer in a worker, which also provides
+        `run_windows(decision_vector, window_starts, window_steps)`.
+    window_starts : Sequence[int]
+        First timesteps of the windows, e.g. from `select_windows`.
+    window_steps : int
+        Number of steps of a window.
+    margin : float, optional
+        Fraction of the archive range low-fidelity objectives are widened by before screening (default is 0.05).
+    calibration_evaluations : int, optional
+        Number of first evaluations that are all promoted (default is 100).
+    min_correlation : float, optional
+        Smallest rank correlation between the fidelities of an objective screened on (default is 0.3).
+    **kwargs
+        Arguments of the WarmPoolEvaluator.
+    """
+
+    def __init__(
+        self,
+        create_trainer,
+        window_starts: Sequence[int],
+        window_steps: int,
+        margin: float = 0.05,
+        calibration_evaluations: int = 100,
+        min_correlation: float = 0.3,
+        **kwargs,
+    ) -> None:
+        super().__init__(create_trainer, **kwargs)
+        self.window_starts: tuple[int, ...] = tuple(int(window_start) for window_start in window_starts)
+        self.window_steps: int = window_steps
+        self.margin: float = margin
+        self.calibration_evaluations: int = calibration_evaluations
+        self.min_correlation: float = min_correlation
+
+        self.screen_archive = None
+        self.screened: int = 0
+        self.promoted: int = 0
+        self.screened_after_calibration: int = 0
+        self.promoted_after_calibration: int = 0
+        self._low_fidelity: list[tuple] = []
+        self._high_fidelity: list[tuple] = []
+        # Low-fidelity objectives of the promoted candidates, by decision vector, pruned to the archive members.
+        self._archive_low_fidelity: dict[bytes, tuple] = {}
+
+    def screen_against(self, algorithm) -> None:
+        """
+        Screens the candidates of later evaluations against the archive of an algorithm.
+
+        Parameters
+        ----------
+        algorithm : AbstractGeneticAlgorithm
+            An algorithm with an archive, e.g. EpsNSGAII, whose objectives are all maximized.
+        """
+        if any(direction != Direction.MAXIMIZE for direction in algorithm.problem.directions):
+            raise ValueError("Screening requires all objectives to be maximized.")
+        self.screen_archive = algorithm.archive
+
+    def evaluate_decision_vectors(self, decision_vectors: Sequence[Sequence[float]]) -> list:
+        low_fidelity = self._evaluate_on_workers(
+            decision_vectors, "run_windows", (self.window_starts, self.window_steps)
+        )
+        low_fidelity = np.array(low_fidelity, dtype=np.float64)
+        promoted = self._promote(low_fidelity)
+        if promoted is None:
+            promoted = list(range(len(decision_vectors)))
+        else:
+            self.screened_after_calibration += len(decision_vectors)
+            self.promoted_after_calibration += len(promoted)
+        self.screened += len(decision_vectors)
+        self.promoted += len(promoted)
+
+        results: list = [None] * len(decision_vectors)
+        if len(promoted) < len(decision_vectors):
+            archive = np.array([list(solution.objectives) for solution in self.screen_archive], dtype=np.float64)
+            nadir = archive.min(axis=0)
+            results = [LowFidelityObjectives(np.minimum(objectives, nadir), objectives) for objectives in low_fidelity]
+        if promoted:
+            high_fidelity = super().evaluate_decision_vectors([decision_vectors[index] for index in promoted])
+            for index, objectives in zip(promoted, high_fidelity):
+                results[index] = objectives
+                self._archive_low_fidelity[_key(decision_vectors[index])] = tuple(low_fidelity[index])
+                if not getattr(objectives, "abandoned", False):
+                    self._low_fidelity.append(tuple(low_fidelity[index]))
+                    self._high_fidelity.append(tuple(objectives))
+        return results
+
+    def _promote(self, low_fidelity: np.ndarray) -> Optional[list[int]]:
+        # Returns the promoted candidates, or None while every candidate is promoted to calibrate.
+        if self.screen_archive is None or self.screened < self.calibration_evaluations:
+            return None
+
+        members = {_key(_decision_vector(solution)) for solution in self.screen_archive}
+        self._archive_low_fidelity = {
+            key: objectives for key, objectives in self._archive_low_fidelity.items() if key in members
+        }
+        if len(self._archive_low_fidelity) < 2:
+            return None
+
+        # Constant or unrelated objectives have a nan or small correlation and are left out.
+        screened = np.array(self.calibration_report()) >= self.min_correlation
+        if not screened.any():
+            return list(range(len(low_fidelity)))
+        front = np.array(list(self._archive_low_fidelity.values()), dtype=np.float64)[:, screened]
+        widened = low_fidelity[:, screened] + self.margin * np.ptp(front, axis=0)
+        dominated = np.any(
+            np.all(front[None, :, :] >= widened[:, None, :], axis=2)
+            & np.any(front[None, :, :] > widened[:, None, :], axis=2),
+            axis=1,
+        )
+        return [int(index) for index in np.flatnonzero(~dominated)]
+
+    @property
+    def promotion_rate(self) -> float:
+        """
+        Fraction of the screened candidates that were simulated on the full horizon.
+        """
+        return self.promoted / self.screened if self.screened > 0 else 0.0
+
+    def calibration_report(self) -> list[float]:
+        """
+        Returns the rank correlation between the low- and the full-fidelity objectives of the promoted candidates.
+
+        Returns
+        -------
+        list[float]
+            The Spearman rank correlation per objective.
+        """
+        if not self._high_fidelity:
+            return []
+        low_fidelity = np.array(self._low_fidelity, dtype=np.float64)
+        high_fidelity = np.array(self._high_fidelity, dtype=np.float64)
+        return [
+            rank_correlation(low_fidelity[:, objective], high_fidelity[:, objective])
+            for objective in range(high_fidelity.shape[1])
+        ]
+
+    def log_stats(self) -> None:
+        super().log_stats()
+        LOGGER.info(
+            "Promoted %d of %d screened candidates (%.1f%%), rank correlation between fidelities per objective: %s",
+            self.promoted, self.screened, 100 * self.promotion_rate,
+            ", ".join(f"{correlation:.3f}" for correlation in self.calibration_report()),
+        )
+        if self.screened_after_calibration > 0 and self.promoted_after_calibration == self.screened_after_calibration:
+            LOGGER.warning(
+                "Screening rejected none of the %d candidates after calibration, consider a smaller margin or "
+                "min_correlation, or other windows", self.screened_after_calibration,
+            )
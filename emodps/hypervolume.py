@@ -0,0 +1,138 @@
+import logging
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from morl_baselines.common.performance_indicators import hypervolume
+
+LOGGER = logging.getLogger(__name__)
+
+
+class HypervolumeTracker:
+    """
+    Hypervolume of an archive of maximized objectives, updated with the points entering and leaving it.
+
+    `update(points)` compares the archive with the previous call and only does work if it changed. While the
+    archive has at most `max_exact_dimension` objectives and `max_exact_size` members, the hypervolume is exact and
+    computed from scratch: within these limits one computation is as cheap as the exclusive contribution of a single
+    point entering or leaving the archive, and summing contributions would let the value drift over a long run.
+    Beyond either limit it is a Monte Carlo estimate, updated incrementally: `n_samples` points drawn in the box
+    between the reference point and the archive keep the number of members dominating them, so a change of the
+    archive costs one comparison with the samples. The box grows, and the samples are drawn again, when a point
+    leaves it.
+
+    Parameters
+    ----------
+    ref_point : Sequence[float]
+        Reference point, dominated by the archive.
+    max_exact_dimension : int, optional
+        Largest number of objectives with an exact hypervolume (default is 5).
+    max_exact_size : int, optional
+        Largest archive with an exact hypervolume (default is 1000).
+    n_samples : int, optional
+        Number of samples of the Monte Carlo estimate (default is 100000).
+    seed : int, optional
+        Seed of the samples, drawn from their own generator so the search is not affected.
+    """
+
+    def __init__(
+        self,
+        ref_point: Sequence[float],
+        max_exact_dimension: int = 5,
+        max_exact_size: int = 1000,
+        n_samples: int = 100000,
+        seed: int = 0,
+    ) -> None:
+        self.ref_point: np.ndarray = np.asarray(ref_point, dtype=np.float64)
+        self.max_exact_dimension: int = max_exact_dimension
+        self.max_exact_size: int = max_exact_size
+        self.n_samples: int = n_samples
+        self.rng = np.random.default_rng(seed)
+
+        self.members: set[tuple] = set()
+        self.exact: bool = True
+        self.value: float = 0.0
+
+        self.samples: Optional[np.ndarray] = None
+        self.dominators: Optional[np.ndarray] = None
+        self.upper: Optional[np.ndarray] = None
+
+    def update(self, points: Iterable[Sequence[float]]) -> float:
+        """
+        Updates the hypervolume to the current archive.
+
+        Parameters
+        ----------
+        points : Iterable[Sequence[float]]
+            Objectives of all members of the archive.
+
+        Returns
+        -------
+        float
+            The hypervolume of the archive.
+        """
+        members = {tuple(float(objective) for objective in point) for point in points}
+        exact = len(self.ref_point) <= self.max_exact_dimension and len(members) <= self.max_exact_size
+        if exact != self.exact or not self.members:
+            if self.members:
+                LOGGER.info("Switching to %s hypervolume at %d points", "exact" if exact else "estimated", len(members))
+            self.exact = exact
+            self._rebuild(members)
+        elif members == self.members:
+            return self.value
+        elif exact:
+            self._rebuild(members)
+        else:
+            added = np.array(list(members - self.members)).reshape(-1, len(self.ref_point))
+            removed = self.members - members
+            # Rebuilding compares every member with the samples, so it is cheaper when most of the archive changed.
+            if self.upper is None or np.any(added > self.upper) or len(added) + len(removed) >= len(members):
+                self._rebuild(members)
+            else:
+                for point in removed:
+                    self.dominators -= np.all(np.array(point) >= self.samples, axis=1)
+                for point in added:
+                    self.dominators += np.all(point >= self.samples, axis=1)
+                self.members = members
+                self.value = self._estimate()
+        return self.value
+
+    def _rebuild(self, members: set[tuple]) -> None:
+        self.members = members
+        points = np.array(list(members)).reshape(-1, len(self.ref_point))
+        if self.exact:
+            self.samples = self.dominators = self.upper = None
+            inside = points[np.all(points > self.ref_point, axis=1)]
+            self.value = hypervolume(self.ref_point, inside) if len(inside) else 0.0
+            return
+
+        # A margin above the archive, so the box is not redrawn every time the archive improves.
+        extent = np.max(np.vstack([points, self.ref_point]), axis=0) - self.ref_point
+        self.upper = self.ref_point + 1.1 * extent
+        self.samples = self.rng.uniform(self.ref_point, self.upper, size=(self.n_samples, len(self.ref_point)))
+        self.dominators = np.zeros(self.n_samples, dtype=np.int64)
+        for point in points:
+            self.dominators += np.all(point >= self.samples, axis=1)
+        self.value = self._estimate()
+
+    def _estimate(self) -> float:
+        return float(np.prod(self.upper - self.ref_point) * np.mean(self.dominators > 0))
+
+    @property
+    def standard_error(self) -> float:
+        """
+        Standard error of the hypervolume, 0 while it is exact.
+        """
+        if self.exact:
+            return 0.0
+        dominated = np.mean(self.dominators > 0)
+        return float(np.prod(self.upper - self.ref_point) * np.sqrt(dominated * (1.0 - dominated) / self.n_samples))
+
+    def reset(self) -> None:
+        """
+        Forgets the archive, so the next update computes the hypervolume from scratch.
+        """
+        self.members = set()
+        self.exact = True
+        self.value = 0.0
+        self.samples = self.dominators = self.upper = None
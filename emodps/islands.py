@@ -0,0 +1,233 @@
+import logging
+import multiprocessing
+import queue
+import random
+from typing import Callable, Optional
+
+from platypus.algorithms import EpsNSGAII
+from platypus.core import EpsilonBoxArchive, Problem, nondominated_sort, nondominated_truncate
+from platypus.evaluator import MapEvaluator
+
+from .evaluator import WarmPoolEvaluator
+from .solutions import export_solutions, import_solutions
+
+LOGGER = logging.getLogger(__name__)
+
+
+class _Migration:
+    """
+    Callback of an island run, exchanging archive members with the neighbouring island every `interval` NFE.
+
+    Emigrants are put on the queue of the next island of the ring and immigrants are taken from the own queue without
+    waiting, so islands never block on each other.
+    """
+
+    def __init__(
+        self,
+        island: int,
+        interval: int,
+        n_migrants: int,
+        inbox: multiprocessing.Queue,
+        outbox: multiprocessing.Queue,
+        reports: multiprocessing.Queue,
+    ) -> None:
+        self.island = island
+        self.interval = interval
+        self.n_migrants = n_migrants
+        self.inbox = inbox
+        self.outbox = outbox
+        self.reports = reports
+        self.next_migration = interval
+
+    def __call__(self, algorithm: EpsNSGAII) -> None:
+        if algorithm.nfe < self.next_migration:
+            return
+        self.next_migration += self.interval
+
+        archive = list(algorithm.archive)
+        emigrants = random.sample(archive, min(self.n_migrants, len(archive)))
+        self.outbox.put(export_solutions(emigrants))
+        self.reports.put(("progress", self.island, algorithm.nfe, export_solutions(archive)))
+
+        immigrants = []
+        while True:
+            try:
+                immigrants.extend(import_solutions(algorithm.problem, self.inbox.get_nowait()))
+            except queue.Empty:
+                break
+        if immigrants:
+            population = algorithm.population + immigrants
+            nondominated_sort(population)
+            algorithm.population = nondominated_truncate(population, algorithm.population_size)
+            algorithm.archive.extend(immigrants)
+
+
+def _run_island(
+    island: int,
+    problem: Problem,
+    epsilons: list[float],
+    nfes: int,
+    seed: int,
+    population_size: int,
+    create_trainer: Optional[Callable],
+    create_trainer_args: tuple,
+    workers_per_island: int,
+    migration: _Migration,
+) -> None:
+    random.seed(seed)
+    # The migrant queues are not drained after the run, buffered migrants must not keep the island alive.
+    migration.inbox.cancel_join_thread()
+    migration.outbox.cancel_join_thread()
+
+    if workers_per_island > 1:
+        evaluator = WarmPoolEvaluator(create_trainer, create_trainer_args, n_workers=workers_per_island)
+    else:
+        evaluator = MapEvaluator()
+
+    with evaluator:
+        algorithm = EpsNSGAII(problem, epsilons=epsilons, population_size=population_size, evaluator=evaluator)
+        algorithm.run(nfes, migration)
+
+    migration.reports.put(("done", island, algorithm.nfe, export_solutions(algorithm.archive)))
+
+
+class IslandModel:
+    """
+    Island-model EpsNSGAII running independent populations in separate processes.
+
+    Every island runs its own EpsNSGAII on an equal share of the NFE budget. Every `migration_interval` NFE of an
+    island, `n_migrants` random members of its epsilon-archive migrate to the next island of a ring, where they
+    compete for a place in the population and the archive. Migration is asynchronous: islands send and collect
+    migrants without waiting, so there is no synchronization between the islands besides the end of the run.
+
+    Islands evaluate in their own process, or on a WarmPoolEvaluator with `workers_per_island` workers. The archive
+    snapshots sent at every migration are merged into `archive`, an epsilon-nondominated archive over all islands,
+    which is also the result of the run. Like an algorithm, an IslandModel provides `nfe`, `archive` and `result` to
+    the progress callback.
+
+    Parameters
+    ----------
+    problem : Problem
+        The problem to optimize, evaluated by `problem.function` in islands without workers.
+    epsilons : list[float]
+        The epsilons of the archives.
+    n_islands : int
+        Number of islands.
+    migration_interval : int, optional
+        NFE of an island between two migrations (default is 1000).
+    n_migrants : int, optional
+        Number of archive members sent at every migration (default is 5).
+    population_size : int, optional
+        Population size of every island (default is 100).
+    seed : int, optional
+        Random seed, island `i` is seeded with `seed + i`.
+    create_trainer : Optional[Callable], optional
+        Picklable function building the trainer of the worker processes, required if `workers_per_island` > 1.
+    create_trainer_args : tuple, optional
+        Arguments passed to `create_trainer`.
+    workers_per_island : int, optional
+        Number of evaluator worker processes of every island (default is 1, evaluating in the island process).
+    """
+
+    def __init__(
+        self,
+        problem: Problem,
+        epsilons: list[float],
+        n_islands: int,
+        migration_interval: int = 1000,
+        n_migrants: int = 5,
+        population_size: int = 100,
+        seed: int = 0,
+        create_trainer: Optional[Callable] = None,
+        create_trainer_args: tuple = (),
+        workers_per_island: int = 1,
+    ) -> None:
+        if n_islands < 1:
+            raise ValueError(f"n_islands must be positive, got {n_islands}.")
+        if workers_per_island > 1 and create_trainer is None:
+            raise ValueError("create_trainer is required when islands have more than one worker.")
+
+        self.problem = problem
+        self.epsilons = epsilons
+        self.n_islands = n_islands
+        self.migration_interval = migration_interval
+        self.n_migrants = n_migrants
+        self.population_size = population_size
+        self.seed = seed
+        self.create_trainer = create_trainer
+        self.create_trainer_args = create_trainer_args
+        self.workers_per_island = workers_per_island
+
+        self.nfe: int = 0
+        self.archive: EpsilonBoxArchive = EpsilonBoxArchive(epsilons)
+
+    @property
+    def result(self) -> EpsilonBoxArchive:
+        return self.archive
+
+    def run(self, nfes: int, callback: Optional[Callable] = None) -> None:
+        """
+        Runs all islands until they have used up their share of `nfes`.
+
+        Parameters
+        ----------
+        nfes : int
+            Total number of function evaluations over all islands.
+        callback : Optional[Callable], optional
+            Called with this island model after every archive snapshot received from an island.
+        """
+        inboxes = [multiprocessing.Queue() for _ in range(self.n_islands)]
+        reports = multiprocessing.Queue()
+        islands = [
+            multiprocessing.Process(
+                target=_run_island,
+                args=(
+                    island,
+                    self.problem,
+                    self.epsilons,
+                    nfes // self.n_islands + (island < nfes % self.n_islands),
+                    self.seed + island,
+                    self.population_size,
+                    self.create_trainer,
+                    self.create_trainer_args,
+                    self.workers_per_island,
+                    _Migration(
+                        island,
+                        self.migration_interval,
+                        self.n_migrants,
+                        inboxes[island],
+                        inboxes[(island + 1) % self.n_islands],
+                        reports,
+                    ),
+                ),
+            )
+            for island in range(self.n_islands)
+        ]
+        for process in islands:
+            process.start()
+        LOGGER.info("Started %d islands", self.n_islands)
+
+        island_nfe = [0] * self.n_islands
+        running = self.n_islands
+        while running > 0:
+            try:
+                kind, island, nfe, members = reports.get(timeout=1.0)
+            except queue.Empty:
+                failed = [i for i, process in enumerate(islands) if process.exitcode not in (None, 0)]
+                if failed:
+                    for process in islands:
+                        process.terminate()
+                    raise RuntimeError(f"Islands {failed} failed.")
+                continue
+
+            island_nfe[island] = nfe
+            self.nfe = sum(island_nfe)
+            self.archive.extend(import_solutions(self.problem, members))
+            if kind == "done":
+                running -= 1
+                LOGGER.info("Island %d finished after %d NFE", island, nfe)
+            if callback is not None:
+                callback(self)
+
+        for process in islands:
+            process.join()
@@ -0,0 +1,195 @@
+import csv
+import os
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+CHUNK_PREFIX = "progress-"
+
+
+class ProgressStore:
+    """
+    Append-only, columnar record of how an archive changes over a run.
+
+    Instead of a copy of the archive at every recorded NFE, `record(nfe, points)` appends only the members that left
+    (`change` -1) and entered (`change` +1) the archive since the previous record, with the NFE they changed at, to
+    preallocated NumPy columns. Every `chunk_size` changes the columns are written to `directory` as a compressed npz
+    chunk and cleared, so memory stays bounded however long the run is; without a directory, full chunks are kept in
+    memory. `archive_at(nfe)` and `frames()` replay the changes to reconstruct the archive at any recorded NFE.
+
+    Parameters
+    ----------
+    n_objectives : int
+        Number of objectives of the archive members.
+    directory : Optional[Union[str, Path]], optional
+        Directory the chunks are streamed to, in memory by default.
+    chunk_size : int, optional
+        Number of changes per chunk (default is 10000).
+    """
+
+    def __init__(
+        self, n_objectives: int, directory: Optional[Union[str, Path]] = None, chunk_size: int = 10000
+    ) -> None:
+        self.n_objectives: int = n_objectives
+        self.directory: Optional[Path] = Path(directory) if directory is not None else None
+        self.chunk_size: int = chunk_size
+
+        self.nfes: list[int] = []
+        self.members: Counter = Counter()
+        self.n_chunks: int = 0
+        self._chunks: list[dict[str, np.ndarray]] = []
+        self._clear()
+
+    def _clear(self) -> None:
+        self._nfe = np.empty(self.chunk_size, dtype=np.int64)
+        self._change = np.empty(self.chunk_size, dtype=np.int8)
+        self._objectives = np.empty((self.chunk_size, self.n_objectives), dtype=np.float64)
+        self._size = 0
+
+    def record(self, nfe: int, points: Iterable[Sequence[float]]) -> None:
+        """
+        Records the archive at an NFE.
+
+        Parameters
+        ----------
+        nfe : int
+            The NFE, not smaller than the previous one.
+        points : Iterable[Sequence[float]]
+            Objectives of all members of the archive.
+        """
+        members = Counter(tuple(float(objective) for objective in point) for point in points)
+        for point in (self.members - members).elements():
+            self._append(nfe, -1, point)
+        for point in (members - self.members).elements():
+            self._append(nfe, 1, point)
+        self.members = members
+        self.nfes.append(nfe)
+
+    def _append(self, nfe: int, change: int, point: tuple) -> None:
+        self._nfe[self._size] = nfe
+        self._change[self._size] = change
+        self._objectives[self._size] = point
+        self._size += 1
+        if self._size == self.chunk_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        chunk = dict(nfe=self._nfe, change=self._change, objectives=self._objectives)
+        if self.directory is None:
+            self._chunks.append(chunk)
+        else:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Written under a temporary name and renamed, so a crash never leaves a partial chunk.
+            with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as file:
+                np.savez_compressed(file, **chunk)
+            os.replace(file.name, self._chunk_path(self.n_chunks))
+        self.n_chunks += 1
+        self._clear()
+
+    def _chunk_path(self, index: int) -> Path:
+        return self.directory / f"{CHUNK_PREFIX}{index:06d}.npz"
+
+    def _changes(self) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        for index in range(self.n_chunks):
+            if self.directory is None:
+                chunk = self._chunks[index]
+            else:
+                with np.load(self._chunk_path(index)) as file:
+                    chunk = {key: file[key] for key in file.files}
+            yield chunk["nfe"], chunk["change"], chunk["objectives"]
+        yield self._nfe[:self._size], self._change[:self._size], self._objectives[:self._size]
+
+    def frames(self) -> Iterator[tuple[int, np.ndarray]]:
+        """
+        Replays the changes, yielding the archive at every recorded NFE in order.
+
+        Yields
+        ------
+        tuple[int, np.ndarray]
+            The NFE and the objectives of the archive members, of shape (n_members, n_objectives).
+        """
+        members: Counter = Counter()
+        stamps = iter(self.nfes)
+        stamp = next(stamps, None)
+        for nfes, changes, objectives in self._changes():
+            for nfe, change, point in zip(nfes.tolist(), changes.tolist(), map(tuple, objectives.tolist())):
+                while stamp is not None and stamp < nfe:
+                    yield stamp, self._to_array(members)
+                    stamp = next(stamps, None)
+                members[point] += change
+                if members[point] == 0:
+                    del members[point]
+        while stamp is not None:
+            yield stamp, self._to_array(members)
+            stamp = next(stamps, None)
+
+    def _to_array(self, members: Counter) -> np.ndarray:
+        return np.array(list(members.elements()), dtype=np.float64).reshape(-1, self.n_objectives)
+
+    def archive_at(self, nfe: int) -> np.ndarray:
+        """
+        Reconstructs the archive as it was recorded at an NFE.
+
+        Parameters
+        ----------
+        nfe : int
+            The NFE, the archive of the last record at or before it is returned.
+
+        Returns
+        -------
+        np.ndarray
+            Objectives of the archive members, of shape (n_members, n_objectives).
+        """
+        archive = np.empty((0, self.n_objectives))
+        for stamp, members in self.frames():
+            if stamp > nfe:
+                break
+            archive = members
+        return archive
+
+    def to_csv(self, path: Union[str, Path]) -> None:
+        """
+        Writes the archive at every recorded NFE to a CSV file, one frame at a time, in the layout of
+        `to_dataframe().to_csv(path)`.
+        """
+        with open(path, "w", encoding="UTF8", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(["", ""] + list(range(self.n_objectives)))
+            for nfe, members in self.frames():
+                for i, point in enumerate(members.tolist()):
+                    writer.writerow([nfe, i] + point)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns the archive at every recorded NFE, indexed by NFE and member.
+        """
+        return pd.concat({nfe: pd.DataFrame(members) for nfe, members in self.frames()}, axis=0)
+
+    def get_state(self) -> dict:
+        return dict(
+            nfes=list(self.nfes),
+            members=Counter(self.members),
+            n_chunks=self.n_chunks,
+            chunks=list(self._chunks),
+            buffer=(self._nfe[:self._size].copy(), self._change[:self._size].copy(), self._objectives[:self._size].copy()),
+        )
+
+    def set_state(self, state: dict) -> None:
+        self.nfes = list(state["nfes"])
+        self.members = Counter(state["members"])
+        self.n_chunks = state["n_chunks"]
+        self._chunks = list(state["chunks"])
+        if self.directory is not None:
+            # Chunks written after the state was taken are replayed again from the buffer.
+            for path in sorted(self.directory.glob(f"{CHUNK_PREFIX}*.npz"))[self.n_chunks:]:
+                path.unlink()
+        self._clear()
+        nfe, change, objectives = state["buffer"]
+        self._size = len(nfe)
+        self._nfe[:self._size] = nfe
+        self._change[:self._size] = change
+        self._objectives[:self._size] = objectives
@@ -0,0 +1,71 @@
+from typing import Sequence
+
+import numpy as np
+
+
+class RacedObjectives(tuple):
+    """
+    Optimistic bound on the objectives of an episode abandoned by a race, returned instead of its objectives.
+
+    Attributes
+    ----------
+    steps : int
+        Number of steps simulated before the episode was abandoned.
+    """
+
+    abandoned = True
+
+    def __new__(cls, bound: Sequence[float], steps: int) -> "RacedObjectives":
+        raced = super().__new__(cls, (float(objective) for objective in bound))
+        raced.steps = steps
+        return raced
+
+    def __reduce__(self):
+        return RacedObjectives, (tuple(self), self.steps)
+
+
+def optimistic_bound(partial_rewards: np.ndarray, reward_bounds: np.ndarray, remaining_steps: int) -> np.ndarray:
+    """
+    Returns the best objectives an episode can still reach.
+
+    Parameters
+    ----------
+    partial_rewards : np.ndarray
+        Rewards summed over the steps simulated so far, per objective.
+    reward_bounds : np.ndarray
+        Largest reward of a single step per objective; 0 for objectives that can only decrease, np.inf if unbounded.
+    remaining_steps : int
+        Number of steps left in the episode.
+
+    Returns
+    -------
+    np.ndarray
+        Upper bound of the final objectives.
+    """
+    if remaining_steps <= 0:
+        return np.asarray(partial_rewards, dtype=np.float64)
+    return partial_rewards + remaining_steps * reward_bounds
+
+
+def is_dominated(objectives: np.ndarray, front: np.ndarray) -> bool:
+    """
+    Checks whether objectives to maximize are Pareto-dominated by a member of a front.
+
+    A Pareto-dominated solution is also epsilon-box dominated, so it cannot enter an EpsilonBoxArchive holding the
+    front.
+
+    Parameters
+    ----------
+    objectives : np.ndarray
+        Objectives of shape (n_objectives,).
+    front : np.ndarray
+        Objectives of the front of shape (n_members, n_objectives).
+
+    Returns
+    -------
+    bool
+        Whether a member is at least as good on every objective and better on one.
+    """
+    if len(front) == 0:
+        return False
+    return bool(np.any(np.all(front >= objectives, axis=1) & np.any(front > objectives, axis=1)))
@@ -0,0 +1,49 @@
+from platypus.core import Problem, Solution
+
+
+def export_solutions(solutions) -> list[tuple[list, list, list]]:
+    """
+    Converts evaluated solutions to plain lists, which can be sent to other processes or written to disk.
+
+    Parameters
+    ----------
+    solutions : Iterable[Solution]
+        The solutions.
+
+    Returns
+    -------
+    list[tuple[list, list, list]]
+        The encoded variables, objectives and constraints of every solution.
+    """
+    return [
+        (list(solution.variables), list(solution.objectives), list(solution.constraints)) for solution in solutions
+    ]
+
+
+def import_solutions(problem: Problem, members: list[tuple[list, list, list]]) -> list[Solution]:
+    """
+    Rebuilds evaluated solutions of a problem from `export_solutions`, without evaluating them again.
+
+    Parameters
+    ----------
+    problem : Problem
+        The problem of the solutions.
+    members : list[tuple[list, list, list]]
+        The exported solutions.
+
+    Returns
+    -------
+    list[Solution]
+        The solutions.
+    """
+    solutions = []
+    for variables, objectives, constraints in members:
+        solution = Solution(problem)
+        solution.variables[:] = variables
+        solution.objectives[:] = objectives
+        solution.constraints[:] = constraints
+        solution.constraint_violation = sum(abs(f(x)) for (f, x) in zip(problem.constraints, solution.constraints))
+        solution.feasible = solution.constraint_violation == 0.0
+        solution.evaluated = True
+        solutions.append(solution)
+    return solutions
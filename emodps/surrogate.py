@@ -0,0 +1,233 @@
+import logging
+import math
+import random
+from collections import deque
+from typing import Optional, Sequence
+
+import numpy as np
+from platypus.core import Direction
+
+from .evaluator import WarmPoolEvaluator
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PredictedObjectives(tuple):
+    """
+    Objectives of a candidate that was not simulated because the surrogate predicted it to be unpromising.
+
+    Attributes
+    ----------
+    prediction : tuple
+        The objectives predicted by the surrogate.
+    """
+
+    predicted = True
+
+    def __new__(cls, objectives: Sequence[float], prediction: Sequence[float]) -> "PredictedObjectives":
+        predicted = super().__new__(cls, (float(objective) for objective in objectives))
+        predicted.prediction = tuple(float(objective) for objective in prediction)
+        return predicted
+
+    def __reduce__(self):
+        return PredictedObjectives, (tuple(self), self.prediction)
+
+
+class RBFSurrogate:
+    """
+    Gaussian radial basis function network predicting objectives from decision vectors.
+
+    The network has one basis function centered on every training sample, with a common width set to the median
+    distance between the samples, and its weights are fitted by ridge regression on standardized objectives. Only
+    the `max_samples` most recent samples are used, so fitting costs at most one solve of that size.
+
+    Parameters
+    ----------
+    max_samples : int, optional
+        Number of most recent samples the network is fitted on (default is 500).
+    regularization : float, optional
+        Ridge regularization of the weights (default is 1e-6).
+    """
+
+    def __init__(self, max_samples: int = 500, regularization: float = 1e-6) -> None:
+        self.max_samples: int = max_samples
+        self.regularization: float = regularization
+        self.centers: Optional[np.ndarray] = None
+        self.weights: Optional[np.ndarray] = None
+        self.width: float = 1.0
+        self.mean: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+
+    def _squared_distances(self, x: np.ndarray) -> np.ndarray:
+        # Expanded form, so no (n, n_centers, n_variables) array is built for long decision vectors.
+        squared_distances = (
+            np.sum(x ** 2, axis=1)[:, None] + np.sum(self.centers ** 2, axis=1)[None, :] - 2.0 * x @ self.centers.T
+        )
+        return np.maximum(squared_distances, 0.0)
+
+    def _kernel(self, x: np.ndarray) -> np.ndarray:
+        return np.exp(-self._squared_distances(x) / (2.0 * self.width ** 2))
+
+    def fit(self, decision_vectors: np.ndarray, objectives: np.ndarray) -> None:
+        """
+        Fits the network.
+
+        Parameters
+        ----------
+        decision_vectors : np.ndarray
+            Decision vectors of shape (n_samples, n_variables).
+        objectives : np.ndarray
+            Objectives of shape (n_samples, n_objectives).
+        """
+        self.centers = np.asarray(decision_vectors[-self.max_samples:], dtype=np.float64)
+        objectives = np.asarray(objectives[-self.max_samples:], dtype=np.float64)
+        self.mean = objectives.mean(axis=0)
+        self.scale = np.where(objectives.std(axis=0) > 0, objectives.std(axis=0), 1.0)
+
+        distances = np.sqrt(self._squared_distances(self.centers))
+        positive = distances[np.triu_indices_from(distances, k=1)]
+        positive = positive[positive > 0]
+        self.width = float(np.median(positive)) if len(positive) else 1.0
+
+        kernel = self._kernel(self.centers)
+        kernel[np.diag_indices_from(kernel)] += self.regularization
+        self.weights = np.linalg.solve(kernel, (objectives - self.mean) / self.scale)
+
+    def predict(self, decision_vectors: np.ndarray) -> np.ndarray:
+        """
+        Predicts the objectives of decision vectors.
+
+        Parameters
+        ----------
+        decision_vectors : np.ndarray
+            Decision vectors of shape (n, n_variables).
+
+        Returns
+        -------
+        np.ndarray
+            Predicted objectives of shape (n, n_objectives).
+        """
+        return self._kernel(np.asarray(decision_vectors, dtype=np.float64)) @ self.weights * self.scale + self.mean
+
+
+class SurrogateEvaluator(WarmPoolEvaluator):
+    """
+    WarmPoolEvaluator simulating only the candidates a surrogate predicts to be the most promising.
+
+    The surrogate is refitted on all simulated (decision vector, objectives) pairs before every batch. Candidates
+    are ranked by the number of archive members dominating their prediction, then by the sum of their predicted
+    objectives scaled by the archive range; the best `fraction` of a batch is simulated, plus an `exploration`
+    fraction drawn at random from the rest. The other candidates are not simulated: they get their prediction capped
+    at the worst objectives of the archive, flagged as `PredictedObjectives`, so they are dominated by the archive and
+    never enter it. Until `screen_against(algorithm)` is called and `min_samples` candidates were simulated, every
+    candidate is simulated; so is every candidate while the archive has a single member, which could equal the capped
+    predictions.
+
+    Parameters
+    ----------
+    create_trainer : Callable
+        Picklable function building the trainer in a worker.
+    fraction : float, optional
+        Fraction of every batch simulated based on the prediction (default is 0.5).
+    exploration : float, optional
+        Fraction of every batch simulated at random among the remaining candidates (default is 0.1).
+    min_samples : int, optional
+        Number of simulated candidates before the surrogate is used (default is 200).
+    surrogate : Optional[RBFSurrogate], optional
+        The surrogate, an RBFSurrogate by default.
+    **kwargs
+        Arguments of the WarmPoolEvaluator.
+    """
+
+    def __init__(
+        self,
+        create_trainer,
+        fraction: float = 0.5,
+        exploration: float = 0.1,
+        min_samples: int = 200,
+        surrogate: Optional[RBFSurrogate] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(create_trainer, **kwargs)
+        self.fraction: float = fraction
+        self.exploration: float = exploration
+        self.min_samples: int = min_samples
+        self.surrogate: RBFSurrogate = surrogate or RBFSurrogate()
+
+        self.screen_archive = None
+        self.screened: int = 0
+        self.simulated: int = 0
+        self.samples: int = 0
+        # Only the samples the surrogate is fitted on are kept.
+        self._decision_vectors: deque[tuple] = deque(maxlen=self.surrogate.max_samples)
+        self._objectives: deque[tuple] = deque(maxlen=self.surrogate.max_samples)
+
+    def screen_against(self, algorithm) -> None:
+        """
+        Screens the candidates of later evaluations against the archive of an algorithm.
+
+        Parameters
+        ----------
+        algorithm : AbstractGeneticAlgorithm
+            An algorithm with an archive, e.g. EpsNSGAII, whose objectives are all maximized.
+        """
+        if any(direction != Direction.MAXIMIZE for direction in algorithm.problem.directions):
+            raise ValueError("Screening requires all objectives to be maximized.")
+        self.screen_archive = algorithm.archive
+
+    def evaluate_decision_vectors(self, decision_vectors: Sequence[Sequence[float]]) -> list:
+        decision_vectors = np.asarray(decision_vectors, dtype=np.float64)
+        self.screened += len(decision_vectors)
+        if self.screen_archive is None or len(self.screen_archive) < 2 or self.samples < self.min_samples:
+            selected = list(range(len(decision_vectors)))
+            results: list = [None] * len(decision_vectors)
+        else:
+            selected, results = self._select(decision_vectors)
+
+        self.simulated += len(selected)
+        for index, objectives in zip(selected, super().evaluate_decision_vectors(decision_vectors[selected])):
+            results[index] = objectives
+            # Bounds of abandoned or screened episodes would bias the surrogate.
+            if not any(getattr(objectives, flag, False) for flag in ("abandoned", "low_fidelity")):
+                self._decision_vectors.append(tuple(decision_vectors[index]))
+                self._objectives.append(tuple(objectives))
+                self.samples += 1
+        return results
+
+    def _select(self, decision_vectors: np.ndarray) -> tuple[list[int], list]:
+        self.surrogate.fit(np.array(self._decision_vectors), np.array(self._objectives))
+        predictions = self.surrogate.predict(decision_vectors)
+
+        front = np.array([list(solution.objectives) for solution in self.screen_archive], dtype=np.float64)
+        dominating = np.sum(
+            np.all(front[None, :, :] >= predictions[:, None, :], axis=2)
+            & np.any(front[None, :, :] > predictions[:, None, :], axis=2),
+            axis=1,
+        )
+        ranges = np.where(np.ptp(front, axis=0) > 0, np.ptp(front, axis=0), 1.0)
+        order = np.lexsort((-np.sum(predictions / ranges, axis=1), dominating))
+
+        n_promising = math.ceil(self.fraction * len(decision_vectors))
+        remaining = [int(index) for index in order[n_promising:]]
+        n_exploration = min(len(remaining), math.ceil(self.exploration * len(decision_vectors)))
+        selected = sorted([int(index) for index in order[:n_promising]] + random.sample(remaining, n_exploration))
+
+        nadir = front.min(axis=0)
+        results: list = [
+            PredictedObjectives(np.minimum(prediction, nadir), prediction) for prediction in predictions
+        ]
+        return selected, results
+
+    @property
+    def simulation_rate(self) -> float:
+        """
+        Fraction of the screened candidates that were simulated.
+        """
+        return self.simulated / self.screened if self.screened > 0 else 0.0
+
+    def log_stats(self) -> None:
+        super().log_stats()
+        LOGGER.info(
+            "Simulated %d of %d candidates (%.1f%%) after surrogate screening",
+            self.simulated, self.screened, 100 * self.simulation_rate,
+        )
@@ -1,8 +1,8 @@
-import numpy as np
 from pathlib import Path
 from gymnasium.spaces import Box
 from gymnasium.wrappers import TimeLimit
 from core.envs.water_management_system import WaterManagementSystem
+from core.envs.batched_water_management_system import BatchedWaterManagementSystem
 from core.models.reservoir import Reservoir
 from core.models.flow import Flow, Inflow
 from core.models.objective import Objective
@@ -10,6 +10,7 @@ from core.models.power_plant import PowerPlant
 from core.models.irrigation_district import IrrigationDistrict
 from core.models.catchment import Catchment
 from core.wrappers.transform_action import ReshapeArrayAction
+from core.utils.data_cache import load_data
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from gymnasium.envs.registration import register
@@ -34,7 +35,7 @@ register(
 )
 
 
-def create_nile_river_env(custom_obj = None, render_mode=None) -> WaterManagementSystem:
+def create_nile_river_env(custom_obj = None, render_mode=None, info_level="full") -> WaterManagementSystem:
     # Ethiopia
     GERD_reservoir = Reservoir(
         "GERD",
@@ -43,11 +44,11 @@ def create_nile_river_env(custom_obj = None, render_mode=None) -> WaterManagemen
         integration_timestep_size=relativedelta(minutes=240),
         objective_function=Objective.no_objective,
         stored_water=15000000000.0,
-        evap_rates=np.loadtxt(data_directory / "reservoirs" / "evap_GERD.txt"),
+        evap_rates=load_data(data_directory / "reservoirs" / "evap_GERD.txt"),
         evap_rates_timestep_size=relativedelta(months=1),
-        storage_to_minmax_rel=np.loadtxt(data_directory / "reservoirs" / "store_min_max_release_GERD.txt"),
-        storage_to_level_rel=np.loadtxt(data_directory / "reservoirs" / "store_level_rel_GERD.txt"),
-        storage_to_surface_rel=np.loadtxt(data_directory / "reservoirs" / "store_sur_rel_GERD.txt"),
+        storage_to_minmax_rel=load_data(data_directory / "reservoirs" / "store_min_max_release_GERD.txt"),
+        storage_to_level_rel=load_data(data_directory / "reservoirs" / "store_level_rel_GERD.txt"),
+        storage_to_surface_rel=load_data(data_directory / "reservoirs" / "store_sur_rel_GERD.txt"),
     )
     GERD_power_plant = PowerPlant(
         "GERD_power_plant",
@@ -64,35 +65,35 @@ def create_nile_river_env(custom_obj = None, render_mode=None) -> WaterManagemen
     # Sudan
     DSSennar_irr_system = IrrigationDistrict(
         "DSSennar_irr",
-        np.loadtxt(data_directory / "irrigation" / "irr_demand_DSSennar.txt"),
+        load_data(data_directory / "irrigation" / "irr_demand_DSSennar.txt"),
         Objective.deficit_minimised,
         "sudan_deficit_minimised",
         normalize_objective=12.73148148
     )
     Gezira_irr_system = IrrigationDistrict(
         "Gezira_irr",
-        np.loadtxt(data_directory / "irrigation" / "irr_demand_Gezira.txt"),
+        load_data(data_directory / "irrigation" / "irr_demand_Gezira.txt"),
         Objective.deficit_minimised,
         "sudan_deficit_minimised",
         normalize_objective=388.2915173
     )
     Hassanab_irr_system = IrrigationDistrict(
         "Hassanab_irr",
-        np.loadtxt(data_directory / "irrigation" / "irr_demand_Hassanab.txt"),
+        load_data(data_directory / "irrigation" / "irr_demand_Hassanab.txt"),
         Objective.deficit_minimised,
         "sudan_deficit_minimised",
         normalize_objective=38.96604938
     )
     Tamaniat_irr_system = IrrigationDistrict(
         "Tamaniat_irr",
-        np.loadtxt(data_directory / "irrigation" / "irr_demand_Tamaniat.txt"),
+        load_data(data_directory / "irrigation" / "irr_demand_Tamaniat.txt"),
         Objective.deficit_minimised,
         "sudan_deficit_minimised",
         normalize_objective=25.84876543
     )
     USSennar_irr_system = IrrigationDistrict(
         "USSennar_irr",
-        np.loadtxt(data_directory / "irrigation" / "irr_demand_USSennar.txt"),
+        load_data(data_directory / "irrigation" / "irr_demand_USSennar.txt"),
         Objective.deficit_minimised,
         "sudan_deficit_minimised",
         normalize_objective=148.2228196
@@ -104,11 +105,11 @@ def create_nile_river_env(custom_obj = None, render_mode=None) -> WaterManagemen
         integration_timestep_size=relativedelta(minutes=240),
         objective_function=Objective.no_objective,
         stored_water=4571250000.0,
-        evap_rates=np.loadtxt(data_directory / "reservoirs" / "evap_Roseires.txt"),
+        evap_rates=load_data(data_directory / "reservoirs" / "evap_Roseires.txt"),
         evap_rates_timestep_size=relativedelta(months=1),
-        storage_to_minmax_rel=np.loadtxt(data_directory / "reservoirs" / "store_min_max_release_Roseires.txt"),
-        storage_to_level_rel=np.loadtxt(data_directory / "reservoirs" / "store_level_rel_Roseires.txt"),
-        storage_to_surface_rel=np.loadtxt(data_directory / "reservoirs" / "store_sur_rel_Roseires.txt"),
+        storage_to_minmax_rel=load_data(data_directory / "reservoirs" / "store_min_max_release_Roseires.txt"),
+        storage_to_level_rel=load_data(data_directory / "reservoirs" / "store_level_rel_Roseires.txt"),
+        storage_to_surface_rel=load_data(data_directory / "reservoirs" / "store_sur_rel_Roseires.txt"),
     )
     Sennar_reservoir = Reservoir(
         "Sennar",
@@ -117,16 +118,16 @@ def create_nile_river_env(custom_obj = None, render_mode=None) -> WaterManagemen
         integration_timestep_size=relativedelta(minutes=240),
         objective_function=Objective.no_objective,
         stored_water=434925000.0,
-        evap_rates=np.loadtxt(data_directory / "reservoirs" / "evap_Sennar.txt"),
+        evap_rates=load_data(data_directory / "reservoirs" / "evap_Sennar.txt"),
         evap_rates_timestep_size=relativedelta(months=1),
-        storage_to_minmax_rel=np.loadtxt(data_directory / "reservoirs" / "store_min_max_release_Sennar.txt"),
-        storage_to_level_rel=np.loadtxt(data_directory / "reservoirs" / "store_level_rel_Sennar.txt"),
-        storage_to_surface_rel=np.loadtxt(data_directory / "reservoirs" / "store_sur_rel_Sennar.txt"),
+        storage_to_minmax_rel=load_data(data_directory / "reservoirs" / "store_min_max_release_Sennar.txt"),
+        storage_to_level_rel=load_data(data_directory / "reservoirs" / "store_level_rel_Sennar.txt"),
+        storage_to_surface_rel=load_data(data_directory / "reservoirs" / "store_sur_rel_Sennar.txt"),
     )
     # Egypt
     Egypt_irr_system = IrrigationDistrict(
         "Egypt_irr",
-        np.loadtxt(data_directory / "irrigation" / "irr_demand_Egypt.txt"),
+        load_data(data_directory / "irrigation" / "irr_demand_Egypt.txt"),
         Objective.deficit_minimised,
         "egypt_deficit_minimised",
         normalize_objective=2523.894863
@@ -139,11 +140,11 @@ def create_nile_river_env(custom_obj = None, render_mode=None) -> WaterManagemen
         objective_function=Objective.is_greater_than_minimum(159),
         objective_name="HAD_minimum_water_level",
         stored_water=137025000000.0,
-        evap_rates=np.loadtxt(data_directory / "reservoirs" / "evap_HAD.txt"),
+        evap_rates=load_data(data_directory / "reservoirs" / "evap_HAD.txt"),
         evap_rates_timestep_size=relativedelta(months=1),
-        storage_to_minmax_rel=np.loadtxt(data_directory / "reservoirs" / "store_min_max_release_HAD.txt"),
-        storage_to_level_rel=np.loadtxt(data_directory / "reservoirs" / "store_level_rel_HAD.txt"),
-        storage_to_surface_rel=np.loadtxt(data_directory / "reservoirs" / "store_sur_rel_HAD.txt"),
+        storage_to_minmax_rel=load_data(data_directory / "reservoirs" / "store_min_max_release_HAD.txt"),
+        storage_to_level_rel=load_data(data_directory / "reservoirs" / "store_level_rel_HAD.txt"),
+        storage_to_surface_rel=load_data(data_directory / "reservoirs" / "store_sur_rel_HAD.txt"),
     )
     # Create 'edges' between Facilities.
     # TODO: determine max capacity for flows
@@ -151,11 +152,11 @@ def create_nile_river_env(custom_obj = None, render_mode=None) -> WaterManagemen
         "gerd_inflow",
         GERD_reservoir,
         float("inf"),
-        np.loadtxt(data_directory / "catchments" / "InflowBlueNile.txt"),
+        load_data(data_directory / "catchments" / "InflowBlueNile.txt"),
     )
 
     GerdToRoseires_catchment = Catchment(
-        "GerdToRoseires_catchment", np.loadtxt(data_directory / "catchments" / "InflowGERDToRoseires.txt")
+        "GerdToRoseires_catchment", load_data(data_directory / "catchments" / "InflowGERDToRoseires.txt")
     )
     # TODO: add catchment 1 inflow to sources of Roseires (inflow with destination Roseires)
 
@@ -166,7 +167,7 @@ def create_nile_river_env(custom_obj = None, render_mode=None) -> WaterManagemen
     )
 
     RoseiresToAbuNaama_catchment = Catchment(
-        "RoseiresToAbuNaama_catchment", np.loadtxt(data_directory / "catchments" / "InflowRoseiresToAbuNaama.txt")
+        "RoseiresToAbuNaama_catchment", load_data(data_directory / "catchments" / "InflowRoseiresToAbuNaama.txt")
     )
 
     # TODO: add catchment 2 inflow to sources of USSennar (inflow with destination USSennar)
@@ -178,7 +179,7 @@ def create_nile_river_env(custom_obj = None, render_mode=None) -> WaterManagemen
     )
 
     SukiToSennar_catchment = Catchment(
-        "SukiToSennar_catchment", np.loadtxt(data_directory / "catchments" / "InflowSukiToSennar.txt")
+        "SukiToSennar_catchment", load_data(data_directory / "catchments" / "InflowSukiToSennar.txt")
     )
 
     # TODO: add catchment 3 inflow to sources of Sennar (inflow with destination USSennar)
@@ -186,9 +187,9 @@ def create_nile_river_env(custom_obj = None, render_mode=None) -> WaterManagemen
 
     Gezira_received_flow = Flow("gezira_received_flow", [Sennar_reservoir], Gezira_irr_system, float("inf"))
 
-    Dinder_catchment = Catchment("dinder_catchment", np.loadtxt(data_directory / "catchments" / "InflowDinder.txt"))
+    Dinder_catchment = Catchment("dinder_catchment", load_data(data_directory / "catchments" / "InflowDinder.txt"))
 
-    Rahad_catchment = Catchment("rahad_catchment", np.loadtxt(data_directory / "catchments" / "InflowRahad.txt"))
+    Rahad_catchment = Catchment("rahad_catchment", load_data(data_directory / "catchments" / "InflowRahad.txt"))
 
     downstream_Sennar_received_flow = Flow(
         "downstream_sennar_received_flow",
@@ -198,7 +199,7 @@ def create_nile_river_env(custom_obj = None, render_mode=None) -> WaterManagemen
     )
     WhiteNile_catchment = Catchment(
         "whitenile_catchment",
-        np.loadtxt(data_directory / "catchments" / "InflowWhiteNile.txt"),
+        load_data(data_directory / "catchments" / "InflowWhiteNile.txt"),
     )
     Taminiat_received_flow = Flow(
         "taminiat_received_flow",
@@ -207,7 +208,7 @@ def create_nile_river_env(custom_obj = None, render_mode=None) -> WaterManagemen
         float("inf"),
     )
 
-    Atbara_catchment = Catchment("atbara_catchment", np.loadtxt(data_directory / "catchments" / "InflowAtbara.txt"))
+    Atbara_catchment = Catchment("atbara_catchment", load_data(data_directory / "catchments" / "InflowAtbara.txt"))
 
     # TODO: change Hassanab received flow to depend on leftover flow from Taminiat in previous month (see A.2.8)
     Hassanab_received_flow = Flow(
@@ -264,7 +265,9 @@ def create_nile_river_env(custom_obj = None, render_mode=None) -> WaterManagemen
         timestep_size=relativedelta(months=1),
         seed=42
         ,add_timestamp='m',
-        custom_obj=custom_obj
+        custom_obj=custom_obj,
+        info_level=info_level,
+        history_capacity=240
         
     )
 
@@ -272,3 +275,7 @@ def create_nile_river_env(custom_obj = None, render_mode=None) -> WaterManagemen
     water_management_system = TimeLimit(water_management_system, max_episode_steps=240)
 
     return water_management_system
+
+
+def create_nile_river_batched_env(n_envs: int, custom_obj = None) -> BatchedWaterManagementSystem:
+    return BatchedWaterManagementSystem.from_env(create_nile_river_env(custom_obj), n_envs, max_episode_steps=240)
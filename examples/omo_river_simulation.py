@@ -1,8 +1,8 @@
-import numpy as np
 from pathlib import Path
 from gymnasium.spaces import Box
 from gymnasium.wrappers.time_limit import TimeLimit
 from core.envs.water_management_system import WaterManagementSystem
+from core.envs.batched_water_management_system import BatchedWaterManagementSystem
 from core.models.reservoir import Reservoir
 from core.models.weir import Weir
 from core.models.flow import Flow, Inflow
@@ -11,6 +11,7 @@ from core.models.power_plant import PowerPlant
 from core.models.irrigation_district import IrrigationDistrict
 from core.models.catchment import Catchment
 from core.wrappers.transform_action import ReshapeArrayAction
+from core.utils.data_cache import load_data
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from gymnasium.envs.registration import register
@@ -34,7 +35,7 @@ register(
 
 
 
-def create_omo_river_env(custom_obj = None, render_mode=None) -> WaterManagementSystem:
+def create_omo_river_env(custom_obj = None, render_mode=None, info_level="full") -> WaterManagementSystem:
 
 
     #Gibe_III
@@ -45,11 +46,11 @@ def create_omo_river_env(custom_obj = None, render_mode=None) -> WaterManagement
         integration_timestep_size=relativedelta(minutes=720), #integration timestep in Omo is 12 hours ()
         objective_function=Objective.no_objective,
         stored_water=11750000000.0, #initial state 11750000000.0
-        evap_rates=np.loadtxt(data_directory / "reservoirs" / "evap_GIBE_III.txt"), # cm/month
+        evap_rates=load_data(data_directory / "reservoirs" / "evap_GIBE_III.txt"), # cm/month
         evap_rates_timestep_size=relativedelta(months=1), # TODO How does it work again?
-        storage_to_minmax_rel=np.loadtxt(data_directory / "reservoirs" / "store_min_max_release_GIBE_III.txt"),#m^3/s #Yugdeep does not change the max/min actions based on storage. The file shows contant min and max value 
-        storage_to_level_rel=np.loadtxt(data_directory / "reservoirs" / "store_level_rel_GIBE_III.txt"), #data for interpolating from storage to height
-        storage_to_surface_rel=np.loadtxt(data_directory / "reservoirs" / "store_sur_rel_GIBE_III.txt"), #data for interpolating from storage to surface
+        storage_to_minmax_rel=load_data(data_directory / "reservoirs" / "store_min_max_release_GIBE_III.txt"),#m^3/s #Yugdeep does not change the max/min actions based on storage. The file shows contant min and max value 
+        storage_to_level_rel=load_data(data_directory / "reservoirs" / "store_level_rel_GIBE_III.txt"), #data for interpolating from storage to height
+        storage_to_surface_rel=load_data(data_directory / "reservoirs" / "store_sur_rel_GIBE_III.txt"), #data for interpolating from storage to surface
     )
 
     GIBE_III_power_plant = PowerPlant(
@@ -72,11 +73,11 @@ def create_omo_river_env(custom_obj = None, render_mode=None) -> WaterManagement
         integration_timestep_size=relativedelta(minutes=720), #integration timestep in Omo is 12 hours
         objective_function=Objective.no_objective,
         stored_water=6000000000.0/2, #initial state
-        evap_rates=np.loadtxt(data_directory / "reservoirs" / "evap_KOYSHA.txt"), # cm/month
+        evap_rates=load_data(data_directory / "reservoirs" / "evap_KOYSHA.txt"), # cm/month
         evap_rates_timestep_size=relativedelta(months=1),
-        storage_to_minmax_rel=np.loadtxt(data_directory / "reservoirs" / "store_min_max_release_KOYSHA.txt"),
-        storage_to_level_rel=np.loadtxt(data_directory / "reservoirs" / "store_level_rel_KOYSHA.txt"), #data for interpolating from storage to height
-        storage_to_surface_rel=np.loadtxt(data_directory / "reservoirs" / "store_sur_rel_KOYSHA.txt") #data for interpolating from storage to surface
+        storage_to_minmax_rel=load_data(data_directory / "reservoirs" / "store_min_max_release_KOYSHA.txt"),
+        storage_to_level_rel=load_data(data_directory / "reservoirs" / "store_level_rel_KOYSHA.txt"), #data for interpolating from storage to height
+        storage_to_surface_rel=load_data(data_directory / "reservoirs" / "store_sur_rel_KOYSHA.txt") #data for interpolating from storage to surface
     )
 
     KOYSHA_power_plant = PowerPlant(
@@ -95,7 +96,7 @@ def create_omo_river_env(custom_obj = None, render_mode=None) -> WaterManagement
     #IRRIGATION DISTRICTS
     Canals_to_Kuraz_Sugar_Plantations = IrrigationDistrict(
         "Canals_to_Kuraz_Sugar_Plantations_irr",
-        np.loadtxt(data_directory / "irrigation" / "irr_demand_Kuraz.txt"), #TODO what is the unit here?
+        load_data(data_directory / "irrigation" / "irr_demand_Kuraz.txt"), #TODO what is the unit here?
         Objective.deficit_minimised,
         "Kuraz_deficit_minimised",
         normalize_objective=105.45 #simply the highest monthly demand in a year
@@ -103,7 +104,7 @@ def create_omo_river_env(custom_obj = None, render_mode=None) -> WaterManagement
 
     Omorate = IrrigationDistrict(
         "Omorate_irr",
-        np.loadtxt(data_directory / "irrigation" / "irr_demand_Omorate.txt"),
+        load_data(data_directory / "irrigation" / "irr_demand_Omorate.txt"),
         Objective.deficit_minimised,
         "Omorate_deficit_minimised",
         normalize_objective=328.39 #simply the highest monthly demand in a year
@@ -126,21 +127,21 @@ def create_omo_river_env(custom_obj = None, render_mode=None) -> WaterManagement
         "Flow_A_inflow",
         GIBE_III_reservoir,
         float("inf"),
-        np.loadtxt(data_directory / "catchments" / "Flow_A_inflow.txt") # m^3/s
+        load_data(data_directory / "catchments" / "Flow_A_inflow.txt") # m^3/s
     )
 
     Flow_B_inflow = Inflow(
         "Flow_B_inflow",
         KOYSHA_reservoir,
         float("inf"),
-        np.loadtxt(data_directory / "catchments" / "Flow_B_inflow.txt")
+        load_data(data_directory / "catchments" / "Flow_B_inflow.txt")
     )
 
     Flow_C_inflow = Inflow(
         "Flow_C_inflow",
         Omorate,
         float("inf"),
-        np.loadtxt(data_directory / "catchments" / "Flow_C_inflow.txt")
+        load_data(data_directory / "catchments" / "Flow_C_inflow.txt")
     )
     #FLOWS
 
@@ -187,7 +188,9 @@ def create_omo_river_env(custom_obj = None, render_mode=None) -> WaterManagement
         timestep_size=relativedelta(months=1),
         seed=42
         ,add_timestamp='m', #adds month as a percentage (x/12) to observation space
-        custom_obj=custom_obj
+        custom_obj=custom_obj,
+        info_level=info_level,
+        history_capacity=144
         
     )
 
@@ -195,3 +198,7 @@ def create_omo_river_env(custom_obj = None, render_mode=None) -> WaterManagement
     water_management_system = TimeLimit(water_management_system, max_episode_steps=144) #normally 144 for 12 years
 
     return water_management_system
+
+
+def create_omo_river_batched_env(n_envs: int, custom_obj = None) -> BatchedWaterManagementSystem:
+    return BatchedWaterManagementSystem.from_env(create_omo_river_env(custom_obj), n_envs, max_episode_steps=144)
@@ -5,6 +5,7 @@ from gymnasium.wrappers.time_limit import TimeLimit
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from core.envs.water_management_system import WaterManagementSystem
+from core.envs.batched_water_management_system import BatchedWaterManagementSystem
 from core.models.reservoir import Reservoir
 from core.models.reservoir_with_pump import ReservoirWithPump
 from core.models.flow import Flow, Inflow
@@ -13,6 +14,7 @@ from core.models.power_plant import PowerPlant
 from core.models.irrigation_district import IrrigationDistrict
 from core.wrappers.transform_action import ReshapeArrayAction
 from core.models.facility import Facility, ControlledFacility
+from core.utils.data_cache import load_data
 import time
 from gymnasium.envs.registration import register
 from typing import Any, Union, Optional
@@ -120,78 +122,47 @@ class WaterManagementSystemWithWaterLevels(WaterManagementSystem):
         for water_system in self.water_systems:
             water_system.current_date = self.start_date
             water_system.reset()
-        return observation, self._determine_info()
-
-    #We overwrite the step method
-    def step(self, action: np.array) -> tuple[np.array, np.array, bool, bool, dict]:
-        final_reward = {}
-
-        # Reset rewards
-        for key in self.rewards.keys():
-            final_reward[key] = 0
-
-        final_observation = {}
-        final_terminated = False
-        final_truncated = False
-        final_info = {"date": self.current_date}
-
-        for water_system in self.water_systems:
-            water_system.current_date = self.current_date
-
-            if isinstance(water_system, ControlledFacility):
-                observation, reward, terminated, truncated, info = water_system.step(action[water_system.name])
-
-            elif isinstance(water_system, Facility) or isinstance(water_system, Flow):
-                observation, reward, terminated, truncated, info = water_system.step()
-            else:
-                raise ValueError()
 
-            # Set observation for a Controlled Facility.
-            if isinstance(water_system, ControlledFacility):
-                final_observation[water_system.name] = observation
-
-            # Add reward to the objective assigned to this Facility (unless it is a Flow).
-            if isinstance(water_system, Facility) or isinstance(water_system, ControlledFacility):
-                if water_system.objective_name:
-                    final_reward[water_system.objective_name] += reward
-
-            # Store additional information
-            final_info[water_system.name] = info
+        if options is not None and options.get("start_timestep"):
+            # Starts the episode later in the record, from the initial state; the observed level does not change.
+            state = self.get_state()
+            state[0] = options["start_timestep"]
+            self.set_state(state)
+        return observation, self._determine_info()
 
+    #We change the step observation as we model the problem with water levels and not the storage volume as is by default
+    def _determine_step_observation(self, observations: np.ndarray, date: datetime) -> np.ndarray:
+        final_observations = [self.water_systems[2].level_vector[-1]/self.max_capacity_level]
+        if self.add_timestamp=='m':
+            final_observations.append(date.month/12)
+        elif self.add_timestamp=='h':
+            final_observations.append(date.hour/24)
+        return np.array(final_observations)
 
-            # Determine whether program should stop
-            final_terminated = final_terminated or terminated
-            final_truncated = final_truncated or truncated or self._is_truncated()
 
+class BatchedWaterManagementSystemWithWaterLevels(BatchedWaterManagementSystem):
+    def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
 
-        self.timestep += 1
-        self.current_date += self.timestep_size
+            self.max_capacity_level = self.water_systems[2].storage_to_level(self.water_systems[2].max_capacity)
 
-        #check if only a subset of rewards to return
-        if self.custom_obj is not None:
-            final_reward = [final_reward[key] for key in self.custom_obj]
-        else:
-            final_reward = list(final_reward.values())
+    #same as WaterManagementSystemWithWaterLevels.reset, the storage after the reset is converted to a water level
+    def reset(self, seed: Optional[int] = None, options: Optional[dict] = None) -> tuple[ObsType, dict[str, Any]]:
+        _, info = super().reset(seed=seed, options=options)
+        levels = [self.water_systems[2].storage_to_level(storage) for storage in self._controlled_observations()[:, 0]]
+        return np.column_stack([levels, np.zeros(self.n_envs)]), info
 
-        #We change the final observation as we model the problem with water levels and not the storage volume as is by default
-        final_observations = [final_info['Conowingo']['current_level']/self.max_capacity_level]
+    #same as WaterManagementSystemWithWaterLevels.step, water levels are used instead of the storage volume
+    def _determine_batch_observation(self, observations: np.ndarray, date: datetime) -> np.ndarray:
+        levels = self._nodes[2].current_level() / self.max_capacity_level
         if self.add_timestamp=='m':
-            final_observations.append(final_info['date'].month/12)
+            return np.column_stack([levels, np.full(self.n_envs, date.month/12)])
         elif self.add_timestamp=='h':
-            final_observations.append(final_info['date'].hour/24)
-             
-
+            return np.column_stack([levels, np.full(self.n_envs, date.hour/24)])
+        return levels[:, np.newaxis]
 
-        return (
-            np.array(final_observations).flatten(),
-            np.array(final_reward).flatten(),
-            final_terminated,
-            final_truncated,
-            final_info
-        )
 
-
-def create_susquehanna_river_env(custom_obj = None, render_mode=None) -> WaterManagementSystemWithWaterLevels:
+def create_susquehanna_river_env(custom_obj = None, render_mode=None, info_level="full") -> WaterManagementSystemWithWaterLevels:
 
 
     class ReservoirwithPumpDateDependendObjetive(ReservoirWithPump):
@@ -253,10 +224,10 @@ def create_susquehanna_river_env(custom_obj = None, render_mode=None) -> WaterMa
             # Check if it doesn't exceed the spillway capacity
             Tcap = 85412  # total turbine capacity (cfs)
             # maxSpill = 1242857.0 # total spillway combined (cfs)
-            w_atomic = np.loadtxt(data_directory / "reservoirs" / "wAtomic.txt")
-            w_baltimore = np.loadtxt(data_directory / "reservoirs" / "wBaltimore.txt")
-            w_chester = np.loadtxt(data_directory / "reservoirs" / "wChester.txt")
-            spillways = np.loadtxt(data_directory / "reservoirs" / "spillways_Conowingo.txt")
+            w_atomic = load_data(data_directory / "reservoirs" / "wAtomic.txt")
+            w_baltimore = load_data(data_directory / "reservoirs" / "wBaltimore.txt")
+            w_chester = load_data(data_directory / "reservoirs" / "wChester.txt")
+            spillways = load_data(data_directory / "reservoirs" / "spillways_Conowingo.txt")
             # minimum discharge values at APP, Balitomore, Chester and downstream
             qm_A = 0.0
             qm_B = 0.0
@@ -329,19 +300,19 @@ def create_susquehanna_river_env(custom_obj = None, render_mode=None) -> WaterMa
                 sub_releases = np.empty(0, dtype=np.float64)
                 actions = actions*self.max_action
 
-            final_date = self.current_date + self.timestep_size
-            timestep_seconds = (final_date + self.evap_rates_timestep - final_date).total_seconds()
+            timestep_seconds = self.calendar.period_seconds(self.timestep + 1, self.evap_rates_timestep)
             evaporatio_rate_per_second = self.evap_rates[self.determine_time_idx()] / (timestep_seconds)
             evaporatio_rate_per_second_pump = self.evap_rates_pump[self.determine_time_idx()] / (timestep_seconds)
 
-            while self.current_date < final_date:
-                next_date = min(final_date, self.current_date + self.integration_timestep_size)
-                integration_time_seconds = (next_date - self.current_date).total_seconds()
+            substeps = self.calendar.substeps(self.timestep, self.integration_timestep_size)
+            for integration_time_seconds, weekday, hour, day_of_year in zip(
+                substeps.seconds, substeps.weekdays, substeps.hours, substeps.days_of_year
+            ):
                 
                 #pumping/release of the pump
 
-                pumping, release_pump = self.pumping_rules(day_of_the_week = self.current_date.weekday(), 
-                                                    hour = self.current_date.hour, 
+                pumping, release_pump = self.pumping_rules(day_of_the_week = weekday, 
+                                                    hour = hour, 
                                                     level_reservoir = self.storage_to_level(current_storage), 
                                                     level_pump = self.storage_to_level_pump(current_storage_pump),
                                                     storage_reservoir = current_storage, 
@@ -355,7 +326,6 @@ def create_susquehanna_river_env(custom_obj = None, render_mode=None) -> WaterMa
                 evaporation_pump = surface_pump * evaporatio_rate_per_second_pump 
 
                 current_storage_pump = current_storage_pump + (self.inflows_pump[self.timestep] + pumping - release_pump - evaporation_pump) * integration_time_seconds 
-                day_of_year = self.current_date.timetuple().tm_yday - 1 #to read from a np array indexed at 1
                 release_per_second = self.actual_release(actions, self.storage_to_level(current_storage), day_of_year)
 
                 if self.should_split_release == True:
@@ -370,8 +340,8 @@ def create_susquehanna_river_env(custom_obj = None, render_mode=None) -> WaterMa
                                                                               -evaporation
                                                                               -pumping
                                                                               -self.spillage)
-                
-                self.current_date = next_date
+
+            self.current_date = self.calendar.date(self.timestep + 1)
                 
 
             
@@ -421,17 +391,17 @@ def create_susquehanna_river_env(custom_obj = None, render_mode=None) -> WaterMa
         objective_function=Objective.is_greater_than_minimum_with_condition(106.5),
         objective_name="recreation",
         stored_water_reservoir=2641905256.0,
-        evap_rates=np.loadtxt(data_directory / "reservoirs" / "evap_Conowingo.txt"),
+        evap_rates=load_data(data_directory / "reservoirs" / "evap_Conowingo.txt"),
         evap_rates_timestep_size=relativedelta(days=1),
-        storage_to_minmax_rel=np.loadtxt(data_directory / "reservoirs" / "store_min_max_release_Conowingo.txt"),
-        storage_to_level_rel=np.loadtxt(data_directory / "reservoirs" / "store_level_rel_Conowingo.txt"),
-        storage_to_surface_rel=np.loadtxt(data_directory / "reservoirs" / "store_sur_rel_Conowingo.txt"),
+        storage_to_minmax_rel=load_data(data_directory / "reservoirs" / "store_min_max_release_Conowingo.txt"),
+        storage_to_level_rel=load_data(data_directory / "reservoirs" / "store_level_rel_Conowingo.txt"),
+        storage_to_surface_rel=load_data(data_directory / "reservoirs" / "store_sur_rel_Conowingo.txt"),
         pumping_rules=muddyrun_pumpturb_,
         stored_water_pump = 1931101920.0,
-        evap_rates_pump = np.loadtxt(data_directory / "reservoirs" / "evap_Muddy.txt"),
-        storage_to_surface_rel_pump = np.loadtxt(data_directory / "reservoirs" / "storage_surface_rel_MR.txt"),
-        storage_to_level_rel_pump = np.loadtxt(data_directory / "reservoirs" / "storage_level_rel_MR.txt"),
-        inflows_pump = np.loadtxt(data_directory / "inflows" / "InflowMuddy.txt"),
+        evap_rates_pump = load_data(data_directory / "reservoirs" / "evap_Muddy.txt"),
+        storage_to_surface_rel_pump = load_data(data_directory / "reservoirs" / "storage_surface_rel_MR.txt"),
+        storage_to_level_rel_pump = load_data(data_directory / "reservoirs" / "storage_level_rel_MR.txt"),
+        inflows_pump = load_data(data_directory / "inflows" / "InflowMuddy.txt"),
         spillage = 800,
         max_capacity=6962264495.999999,
         max_action=[41.302169, 464.16667, 54.748458, 85412]
@@ -439,7 +409,7 @@ def create_susquehanna_river_env(custom_obj = None, render_mode=None) -> WaterMa
 
     Power_plant = PowerPlantSequentialObjetive(
         name="Power_plant",
-        objective_function=Objective.sequential_scalar(np.loadtxt(data_directory / "reservoirs" / "avg_energy_prices.txt")),
+        objective_function=Objective.sequential_scalar(load_data(data_directory / "reservoirs" / "avg_energy_prices.txt")),
         objective_name="energy_revenue",
         normalize_objective=198445191.2586579,
         efficiency=0.79,
@@ -448,35 +418,35 @@ def create_susquehanna_river_env(custom_obj = None, render_mode=None) -> WaterMa
         head_start_level=0,
         max_capacity=float("inf"),
         reservoir=Conowingo_reservoir,
-        turbines = np.loadtxt(data_directory / "reservoirs" / "turbines_Conowingo2.txt"),
+        turbines = load_data(data_directory / "reservoirs" / "turbines_Conowingo2.txt"),
         n_turbines = 13,
-        tailwater =  np.loadtxt(data_directory / "reservoirs" / "tailwater.txt")
+        tailwater =  load_data(data_directory / "reservoirs" / "tailwater.txt")
     )
 
     Atomic_system = IrrigationDistrict(
         name="Atomic",
-        all_demand=np.loadtxt(data_directory / "demands" / "Atomic.txt"),
+        all_demand=load_data(data_directory / "demands" / "Atomic.txt"),
         objective_function=Objective.supply_ratio_maximised,
         objective_name="water_supply_Atomic",
     )
 
     Baltimore_system = IrrigationDistrict(
         name="Baltimore",
-        all_demand=np.loadtxt(data_directory / "demands" / "Baltimore.txt"),
+        all_demand=load_data(data_directory / "demands" / "Baltimore.txt"),
         objective_function=Objective.supply_ratio_maximised,
         objective_name="water_supply_Baltimore",
     )
 
     Chester_system = IrrigationDistrict(
         name="Chester",
-        all_demand=np.loadtxt(data_directory / "demands" / "Chester.txt"),
+        all_demand=load_data(data_directory / "demands" / "Chester.txt"),
         objective_function=Objective.supply_ratio_maximised,
         objective_name="water_supply_Chester",
     )
 
     Downstream_system = IrrigationDistrict(
         name="Downstream",
-        all_demand=np.loadtxt(data_directory / "demands" / "Downstream.txt"),
+        all_demand=load_data(data_directory / "demands" / "Downstream.txt"),
         objective_function=Objective.deficit_squared_ratio_minimised,
         objective_name="enviromental_shortage",
     )
@@ -485,14 +455,14 @@ def create_susquehanna_river_env(custom_obj = None, render_mode=None) -> WaterMa
         name="conowingo_inflow_main",
         destinations=Conowingo_reservoir,
         max_capacity=float("inf"),
-        all_inflow=np.loadtxt(data_directory / "inflows" / "InflowConowingoMain.txt"),
+        all_inflow=load_data(data_directory / "inflows" / "InflowConowingoMain.txt"),
     )
 
     Conowingo_inflow_lateral = Inflow(
         name="conowingo_inflow_lateral",
         destinations=Conowingo_reservoir,
         max_capacity=float("inf"),
-        all_inflow=np.loadtxt(data_directory / "inflows" / "InflowConowingoLateral.txt"),
+        all_inflow=load_data(data_directory / "inflows" / "InflowConowingoLateral.txt"),
     )
 
     Conowingo_outflow = Flow(
@@ -517,10 +487,10 @@ def create_susquehanna_river_env(custom_obj = None, render_mode=None) -> WaterMa
     #     objective_function=Objective.no_objective,
     #     objective_name="",
     #     stored_water=0,
-    #     evap_rates=np.loadtxt(data_directory / "reservoirs" / "evap_Muddy.txt"),
-    #     storage_to_minmax_rel=np.loadtxt(data_directory / "reservoirs" / "store_min_max_release_Muddy.txt"),
-    #     storage_to_level_rel=np.loadtxt(data_directory / "reservoirs" / "store_level_rel_Muddy.txt"),
-    #     storage_to_surface_rel=np.loadtxt(data_directory / "reservoirs" / "store_sur_rel_Muddy.txt"),
+    #     evap_rates=load_data(data_directory / "reservoirs" / "evap_Muddy.txt"),
+    #     storage_to_minmax_rel=load_data(data_directory / "reservoirs" / "store_min_max_release_Muddy.txt"),
+    #     storage_to_level_rel=load_data(data_directory / "reservoirs" / "store_level_rel_Muddy.txt"),
+    #     storage_to_surface_rel=load_data(data_directory / "reservoirs" / "store_sur_rel_Muddy.txt"),
     # )
 
     water_management_system = WaterManagementSystemWithWaterLevels(
@@ -548,10 +518,18 @@ def create_susquehanna_river_env(custom_obj = None, render_mode=None) -> WaterMa
         timestep_size=relativedelta(hours=4),
         seed=42,
         add_timestamp='h',
-        custom_obj = custom_obj
+        custom_obj = custom_obj,
+        info_level = info_level,
+        history_capacity = 2190
     )
 
     water_management_system = ReshapeArrayAction(water_management_system)
     water_management_system = TimeLimit(water_management_system, max_episode_steps=2190)
 
     return water_management_system
+
+
+def create_susquehanna_river_batched_env(n_envs: int, custom_obj = None) -> BatchedWaterManagementSystemWithWaterLevels:
+    return BatchedWaterManagementSystemWithWaterLevels.from_env(
+        create_susquehanna_river_env(custom_obj), n_envs, max_episode_steps=2190
+    )
@@ -1,4 +1,3 @@
-import numpy as np
 from pathlib import Path
 from gymnasium.spaces import Box
 from gymnasium.wrappers import TimeLimit
@@ -10,6 +9,7 @@ from core.models.power_plant import PowerPlant
 from core.models.irrigation_district import IrrigationDistrict
 from core.models.catchment import Catchment
 from core.wrappers.transform_action import ReshapeArrayAction
+from core.utils.data_cache import load_data
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from gymnasium.envs.registration import register
@@ -32,11 +32,11 @@ def create_zambezi_river_env(custom_obj=None, render_mode=None) -> WaterManageme
         integration_timestep_size=relativedelta(minutes=240),
         objective_function=Objective.no_objective,
         stored_water=500000000.0,
-        evap_rates=np.loadtxt(data_directory / "reservoirs" / "evap_Kafue.txt"),
+        evap_rates=load_data(data_directory / "reservoirs" / "evap_Kafue.txt"),
         evap_rates_timestep_size=relativedelta(months=1),
-        storage_to_minmax_rel=np.loadtxt(data_directory / "reservoirs" / "store_min_max_release_Kafue.txt"),
-        storage_to_level_rel=np.loadtxt(data_directory / "reservoirs" / "store_level_rel_Kafue.txt"),
-        storage_to_surface_rel=np.loadtxt(data_directory / "reservoirs" / "store_surf_rel_Kafue.txt"),
+        storage_to_minmax_rel=load_data(data_directory / "reservoirs" / "store_min_max_release_Kafue.txt"),
+        storage_to_level_rel=load_data(data_directory / "reservoirs" / "store_level_rel_Kafue.txt"),
+        storage_to_surface_rel=load_data(data_directory / "reservoirs" / "store_surf_rel_Kafue.txt"),
     )
     
     ItezhiTezhi_reservoir = Reservoir(
@@ -46,11 +46,11 @@ def create_zambezi_river_env(custom_obj=None, render_mode=None) -> WaterManageme
         integration_timestep_size=relativedelta(minutes=240),
         objective_function=Objective.no_objective,
         stored_water=200000000.0,
-        evap_rates=np.loadtxt(data_directory / "reservoirs" / "evap_ItezhiTezhi.txt"),
+        evap_rates=load_data(data_directory / "reservoirs" / "evap_ItezhiTezhi.txt"),
         evap_rates_timestep_size=relativedelta(months=1),
-        storage_to_minmax_rel=np.loadtxt(data_directory / "reservoirs" / "store_min_max_release_ItezhiTezhi.txt"),
-        storage_to_level_rel=np.loadtxt(data_directory / "reservoirs" / "store_level_rel_ItezhiTezhi.txt"),
-        storage_to_surface_rel=np.loadtxt(data_directory / "reservoirs" / "store_surf_rel_ItezhiTezhi.txt"),
+        storage_to_minmax_rel=load_data(data_directory / "reservoirs" / "store_min_max_release_ItezhiTezhi.txt"),
+        storage_to_level_rel=load_data(data_directory / "reservoirs" / "store_level_rel_ItezhiTezhi.txt"),
+        storage_to_surface_rel=load_data(data_directory / "reservoirs" / "store_surf_rel_ItezhiTezhi.txt"),
     )
     
     Kariba_reservoir = Reservoir(
@@ -60,11 +60,11 @@ def create_zambezi_river_env(custom_obj=None, render_mode=None) -> WaterManageme
         integration_timestep_size=relativedelta(minutes=240),
         objective_function=Objective.no_objective,
         stored_water=900000000.0,
-        evap_rates=np.loadtxt(data_directory / "reservoirs" / "evap_Kariba.txt"),
+        evap_rates=load_data(data_directory / "reservoirs" / "evap_Kariba.txt"),
         evap_rates_timestep_size=relativedelta(months=1),
-        storage_to_minmax_rel=np.loadtxt(data_directory / "reservoirs" / "store_min_max_release_Kariba.txt"),
-        storage_to_level_rel=np.loadtxt(data_directory / "reservoirs" / "store_level_rel_Kariba.txt"),
-        storage_to_surface_rel=np.loadtxt(data_directory / "reservoirs" / "store_surf_rel_Kariba.txt"),
+        storage_to_minmax_rel=load_data(data_directory / "reservoirs" / "store_min_max_release_Kariba.txt"),
+        storage_to_level_rel=load_data(data_directory / "reservoirs" / "store_level_rel_Kariba.txt"),
+        storage_to_surface_rel=load_data(data_directory / "reservoirs" / "store_surf_rel_Kariba.txt"),
     )
     
     CahoraBassa_reservoir = Reservoir(
@@ -74,11 +74,11 @@ def create_zambezi_river_env(custom_obj=None, render_mode=None) -> WaterManageme
         integration_timestep_size=relativedelta(minutes=240),
         objective_function=Objective.no_objective,
         stored_water=300000000.0,
-        evap_rates=np.loadtxt(data_directory / "reservoirs" / "evap_CahoraBassa.txt"),
+        evap_rates=load_data(data_directory / "reservoirs" / "evap_CahoraBassa.txt"),
         evap_rates_timestep_size=relativedelta(months=1),
-        storage_to_minmax_rel=np.loadtxt(data_directory / "reservoirs" / "store_min_max_release_CahoraBassa.txt"),
-        storage_to_level_rel=np.loadtxt(data_directory / "reservoirs" / "store_level_rel_CahoraBassa.txt"),
-        storage_to_surface_rel=np.loadtxt(data_directory / "reservoirs" / "store_surf_rel_CahoraBassa.txt"),
+        storage_to_minmax_rel=load_data(data_directory / "reservoirs" / "store_min_max_release_CahoraBassa.txt"),
+        storage_to_level_rel=load_data(data_directory / "reservoirs" / "store_level_rel_CahoraBassa.txt"),
+        storage_to_surface_rel=load_data(data_directory / "reservoirs" / "store_surf_rel_CahoraBassa.txt"),
     )
 
     # Inflows
@@ -86,14 +86,14 @@ def create_zambezi_river_env(custom_obj=None, render_mode=None) -> WaterManageme
         "Kafue_inflow",
         Kafue_reservoir,
         float("inf"),
-        np.loadtxt(data_directory / "catchments" / "InflowKafue.txt"),
+        load_data(data_directory / "catchments" / "InflowKafue.txt"),
     )
 
     ItezhiTezhi_inflow = Inflow(
         "ItezhiTezhi_inflow",
         ItezhiTezhi_reservoir,
         float("inf"),
-        np.loadtxt(data_directory / "catchments" / "InflowItezhiTezhi.txt"),
+        load_data(data_directory / "catchments" / "InflowItezhiTezhi.txt"),
     )
 
     # Flows
@@ -104,7 +104,7 @@ def create_zambezi_river_env(custom_obj=None, render_mode=None) -> WaterManageme
     # Irrigation Districts
     IrrigationDistrict_1 = IrrigationDistrict(
         "IrrigationDistrict_1",
-        np.loadtxt(data_directory / "irrigation" / "irr_demand_1.txt"),
+        load_data(data_directory / "irrigation" / "irr_demand_1.txt"),
         Objective.deficit_minimised,
         "irrigation_1_deficit_minimised",
         normalize_objective=100.0  # Example normalization factor
@@ -112,7 +112,7 @@ def create_zambezi_river_env(custom_obj=None, render_mode=None) -> WaterManageme
 
     IrrigationDistrict_2 = IrrigationDistrict(
         "IrrigationDistrict_2",
-        np.loadtxt(data_directory / "irrigation" / "irr_demand_2.txt"),
+        load_data(data_directory / "irrigation" / "irr_demand_2.txt"),
         Objective.deficit_minimised,
         "irrigation_2_deficit_minimised",
         normalize_objective=150.0  # Example normalization factor
@@ -15,6 +15,8 @@ from morl_baselines.common.performance_indicators import (
     hypervolume,
     igd,
     maximum_utility_loss,
+    monte_carlo_hypervolume,
+    select_hypervolume_method,
     sparsity,
 )
 from morl_baselines.common.weights import equally_spaced_weights
@@ -150,6 +152,7 @@ def log_all_multi_policy_metrics(
     global_step: int,
     n_sample_weights: int,
     ref_front: Optional[List[np.ndarray]] = None,
+    hv_method: str = "exact",
 ):
     """Logs all metrics for multi-policy training.
 
@@ -168,9 +171,18 @@ def log_all_multi_policy_metrics(
         global_step: global step for logging
         n_sample_weights: number of weights to sample for EUM and MUL computation
         ref_front: reference front, if known
+        hv_method: "exact", "mc" (Monte Carlo, also logs its standard error) or "auto" (by number of objectives)
     """
     filtered_front = list(filter_pareto_dominated(current_front))
-    hv = hypervolume(hv_ref_point, filtered_front)
+    if hv_method == "auto":
+        hv_method = select_hypervolume_method(reward_dim)
+    hv_metrics = {}
+    if hv_method == "mc":
+        estimate = monte_carlo_hypervolume(hv_ref_point, filtered_front)
+        hv = estimate.value
+        hv_metrics["eval/hypervolume_std_error"] = estimate.standard_error
+    else:
+        hv = hypervolume(hv_ref_point, filtered_front, method=hv_method)
     sp = sparsity(filtered_front)
     eum = expected_utility(filtered_front, weights_set=equally_spaced_weights(reward_dim, n_sample_weights))
     card = cardinality(filtered_front)
@@ -181,6 +193,7 @@ def log_all_multi_policy_metrics(
             "eval/sparsity": sp,
             "eval/eum": eum,
             "eval/cardinality": card,
+            **hv_metrics,
             "global_step": global_step,
         },
         commit=False,
@@ -1,35 +1,137 @@
 """Pareto utilities."""
+import bisect
+import heapq
 from copy import deepcopy
-from typing import List, Union
+from typing import Callable, List, Optional, Union
 
 import numpy as np
 from scipy.spatial import ConvexHull
 
 
-def get_non_pareto_dominated_inds(candidates: Union[np.ndarray, List], remove_duplicates: bool = True) -> np.ndarray:
-    """A batched and fast version of the Pareto coverage set algorithm.
+def _dominated_by(points: np.ndarray, others: np.ndarray, max_block_elements: int) -> np.ndarray:
+    """Returns which points are dominated by at least one of the others, where all points are distinct.
+
+    Comparisons are made on blocks of at most `max_block_elements` point pairs, refined objective by objective, so
+    peak memory does not depend on the number of points.
+    """
+    dominated = np.zeros(len(points), dtype=bool)
+    block = max(1, int(np.sqrt(max_block_elements)))
+    for start in range(0, len(points), block):
+        rows = points[start : start + block]
+        for other_start in range(0, len(others), block):
+            cols = others[other_start : other_start + block]
+            geq = cols[None, :, 0] >= rows[:, None, 0]
+            greater = cols[None, :, 0] > rows[:, None, 0]
+            for i in range(1, points.shape[1]):
+                geq &= cols[None, :, i] >= rows[:, None, i]
+                greater |= cols[None, :, i] > rows[:, None, i]
+            dominated[start : start + block] |= np.any(geq & greater, axis=1)
+    return dominated
+
+
+def _non_dominated_2d(points: np.ndarray) -> np.ndarray:
+    # Sorted by decreasing first, then second objective, a point is dominated iff an earlier point has a second
+    # objective at least as large.
+    order = np.lexsort((-points[:, 1], -points[:, 0]))
+    second = points[order, 1]
+    best_before = np.maximum.accumulate(np.concatenate([[-np.inf], second[:-1]]))
+    keep = np.zeros(len(points), dtype=bool)
+    keep[order] = second > best_before
+    return keep
+
+
+def _non_dominated_3d(points: np.ndarray) -> np.ndarray:
+    # Sorted by decreasing objectives, a point is dominated iff an earlier point dominates it on the last two
+    # objectives. The earlier non-dominated points form a staircase of increasing second and decreasing third
+    # objective, so the largest third objective among those with a second objective at least as large is found by
+    # bisection.
+    order = np.lexsort((-points[:, 2], -points[:, 1], -points[:, 0]))
+    keep = np.zeros(len(points), dtype=bool)
+    stairs_y: List[float] = []
+    stairs_z: List[float] = []
+    for index in order:
+        y, z = points[index, 1], points[index, 2]
+        position = bisect.bisect_left(stairs_y, y)
+        if position < len(stairs_y) and stairs_z[position] >= z:
+            continue
+        keep[index] = True
+        # Remove the steps the new point dominates: second objective at most y, third at most z.
+        first = position
+        while first > 0 and stairs_z[first - 1] <= z:
+            first -= 1
+        stop = position + 1 if position < len(stairs_y) and stairs_y[position] == y else position
+        stairs_y[first:stop] = [y]
+        stairs_z[first:stop] = [z]
+    return keep
+
+
+def _non_dominated_blocks(points: np.ndarray, max_block_elements: int) -> np.ndarray:
+    # Processed by decreasing sum of objectives, so most dominated points meet a dominating one early and are
+    # discarded before they are compared with anything else.
+    order = np.argsort(-points.sum(axis=1), kind="stable")
+    block = max(1, int(np.sqrt(max_block_elements)))
+    front = np.empty(0, dtype=np.int64)
+    for start in range(0, len(order), block):
+        candidates = order[start : start + block]
+        candidates = candidates[~_dominated_by(points[candidates], points[front], max_block_elements)]
+        candidates = candidates[~_dominated_by(points[candidates], points[candidates], max_block_elements)]
+        # Rounding in the sums may order a dominating point after the one it dominates.
+        front = front[~_dominated_by(points[front], points[candidates], max_block_elements)]
+        front = np.concatenate([front, candidates])
+    keep = np.zeros(len(points), dtype=bool)
+    keep[front] = True
+    return keep
+
+
+def non_dominated_mask(
+    candidates: Union[np.ndarray, List], remove_duplicates: bool = True, max_block_elements: int = 2**22
+) -> np.ndarray:
+    """Returns which candidates are not Pareto dominated, with bounded peak memory.
+
+    Two and three objectives are handled by sorting and sweeping in O(n log n). More objectives are compared in
+    blocks of at most `max_block_elements` candidate pairs against the front found so far.
 
     Args:
         candidates (ndarray): A numpy array of vectors.
-        remove_duplicates (bool, optional): Whether to remove duplicate vectors. Defaults to True.
+        remove_duplicates (bool, optional): Whether to keep only the first of duplicate vectors. Defaults to True.
+        max_block_elements (int, optional): Largest number of candidate pairs compared at once.
 
     Returns:
-        ndarray: The indices of the elements that should be kept to form the Pareto front or coverage set.
+        ndarray: A boolean mask of the candidates forming the Pareto front or coverage set.
     """
     candidates = np.array(candidates)
-    uniques, indcs, invs, counts = np.unique(candidates, return_index=True, return_inverse=True, return_counts=True, axis=0)
+    if len(candidates) == 0:
+        return np.zeros(0, dtype=bool)
+    candidates = candidates.reshape(len(candidates), -1)
+    uniques, first, inverse = np.unique(candidates, return_index=True, return_inverse=True, axis=0)
+    inverse = inverse.reshape(-1)
+
+    if uniques.shape[1] == 1:
+        keep = uniques[:, 0] == uniques[:, 0].max()
+    elif uniques.shape[1] == 2:
+        keep = _non_dominated_2d(uniques)
+    elif uniques.shape[1] == 3:
+        keep = _non_dominated_3d(uniques)
+    else:
+        keep = _non_dominated_blocks(uniques, max_block_elements)
 
-    res_eq = np.all(candidates[:, None, None] <= candidates, axis=-1).squeeze()
-    res_g = np.all(candidates[:, None, None] < candidates, axis=-1).squeeze()
-    c1 = np.sum(res_eq, axis=-1) == counts[invs]
-    c2 = np.any(~res_g, axis=-1)
+    mask = keep[inverse]
     if remove_duplicates:
-        to_keep = np.zeros(len(candidates), dtype=bool)
-        to_keep[indcs] = 1
-    else:
-        to_keep = np.ones(len(candidates), dtype=bool)
+        mask &= np.arange(len(candidates)) == first[inverse]
+    return mask
+
 
-    return np.logical_and(c1, c2) & to_keep
+def get_non_pareto_dominated_inds(candidates: Union[np.ndarray, List], remove_duplicates: bool = True) -> np.ndarray:
+    """A batched and fast version of the Pareto coverage set algorithm.
+
+    Args:
+        candidates (ndarray): A numpy array of vectors.
+        remove_duplicates (bool, optional): Whether to remove duplicate vectors. Defaults to True.
+
+    Returns:
+        ndarray: The indices of the elements that should be kept to form the Pareto front or coverage set.
+    """
+    return non_dominated_mask(candidates, remove_duplicates=remove_duplicates)
 
 
 def filter_pareto_dominated(candidates: Union[np.ndarray, List], remove_duplicates: bool = True) -> np.ndarray:
@@ -71,9 +173,6 @@ def filter_convex_dominated(candidates: Union[np.ndarray, List]) -> np.ndarray:
 def get_non_dominated(candidates: set) -> set:
     """This function returns the non-dominated subset of elements.
 
-    Source: https://stackoverflow.com/questions/32791911/fast-calculation-of-pareto-front-in-python
-    The code provided in all the stackoverflow answers is wrong. Important changes have been made in this function.
-
     Args:
         candidates: The input set of candidate vectors.
 
@@ -81,70 +180,414 @@ def get_non_dominated(candidates: set) -> set:
         The non-dominated subset of this input set.
     """
     candidates = np.array(list(candidates))  # Turn the input set into a numpy array.
-    candidates = candidates[candidates.sum(1).argsort()[::-1]]  # Sort candidates by decreasing sum of coordinates.
-    for i in range(candidates.shape[0]):  # Process each point in turn.
-        n = candidates.shape[0]  # Check current size of the candidates.
-        if i >= n:  # If we've eliminated everything up until this size we stop.
-            break
-        non_dominated = np.ones(candidates.shape[0], dtype=bool)  # Initialize a boolean mask for undominated points.
-        # find all points not dominated by i
-        # since points are sorted by coordinate sum
-        # i cannot dominate any points in 1,...,i-1
-        non_dominated[i + 1 :] = np.any(candidates[i + 1 :] > candidates[i], axis=1)
-        candidates = candidates[non_dominated]  # Grab only the non-dominated vectors using the generated bitmask.
-
-    non_dominated = set()
-    for candidate in candidates:
-        non_dominated.add(tuple(candidate))  # Add the non dominated vectors to a set again.
-
-    return non_dominated
+    return {tuple(candidate) for candidate in candidates[non_dominated_mask(candidates)]}
 
 
 def get_non_dominated_inds(solutions: np.ndarray) -> np.ndarray:
-    """Returns a boolean array indicating which points are non-dominated."""
-    is_efficient = np.ones(solutions.shape[0], dtype=bool)
-    for i, c in enumerate(solutions):
-        if is_efficient[i]:
-            # Remove dominated points, will also remove itself
-            is_efficient[is_efficient] = np.any(solutions[is_efficient] > c, axis=1)
-            # keep this solution as non-dominated
-            is_efficient[i] = 1
-    return is_efficient
+    """Returns a boolean array indicating which points are non-dominated, keeping the first of duplicate points."""
+    return non_dominated_mask(solutions)
 
 
 class ParetoArchive:
-    """Pareto archive."""
+    """Pareto archive.
 
-    def __init__(self, convex_hull: bool = False):
-        """Initializes the Pareto archive."""
+    A new candidate is compared once with the current members: it is rejected if a member dominates or equals its
+    evaluation, otherwise it evicts the members it dominates and is appended. Evaluations are stored in a contiguous
+    NumPy array. Accepted candidates are stored as returned by `store_candidate`, a deep copy by default; pass `None`
+    to hold them by reference, or e.g. a function saving a checkpoint and returning its id.
+    """
+
+    def __init__(self, convex_hull: bool = False, store_candidate: Optional[Callable] = deepcopy):
+        """Initializes the Pareto archive.
+
+        Args:
+            convex_hull: Whether to only keep the members on the convex hull of the evaluations.
+            store_candidate: Function applied to an accepted candidate to get what is stored, None to store the candidate itself.
+        """
         self.convex_hull = convex_hull
+        self.store_candidate = store_candidate
         self.individuals: list = []
-        self.evaluations: List[np.ndarray] = []
-
-    def add(self, candidate, evaluation: np.ndarray):
+        self._evaluations: Optional[np.ndarray] = None
+        self._size = 0
+
+    @property
+    def evaluations(self) -> List[np.ndarray]:
+        """The evaluations of the members, in the order of `individuals`."""
+        return list(self.evaluations_array.copy())
+
+    @property
+    def evaluations_array(self) -> np.ndarray:
+        """The evaluations of the members as a (members, objectives) array, a view on the archive storage."""
+        if self._evaluations is None:
+            return np.empty((0, 0))
+        return self._evaluations[: self._size]
+
+    def __len__(self) -> int:
+        """Number of members of the archive."""
+        return self._size
+
+    def add(self, candidate, evaluation: np.ndarray) -> bool:
         """Adds the candidate to the memory and removes Pareto inefficient points.
 
         Args:
             candidate: The candidate to add.
             evaluation: The evaluation of the candidate.
+
+        Returns:
+            Whether the candidate entered the archive.
         """
-        self.evaluations.append(evaluation)
-        self.individuals.append(deepcopy(candidate))
+        evaluation = np.asarray(evaluation, dtype=np.float64)
+        if self._evaluations is None:
+            self._evaluations = np.empty((8, len(evaluation)), dtype=np.float64)
+
+        members = self._evaluations[: self._size]
+        if np.any(np.all(members >= evaluation, axis=1)):
+            return False
+
+        dominated = np.all(evaluation >= members, axis=1)
+        if np.any(dominated):
+            self._keep(~dominated)
+
+        if self._size == len(self._evaluations):
+            self._evaluations = np.concatenate([self._evaluations, np.empty_like(self._evaluations)])
+        self._evaluations[self._size] = evaluation
+        self._size += 1
+        self.individuals.append(candidate if self.store_candidate is None else self.store_candidate(candidate))
 
-        # Non-dominated sorting
         if self.convex_hull:
-            nd_candidates = {tuple(x) for x in filter_convex_dominated(self.evaluations)}
+            on_hull = {tuple(x) for x in filter_convex_dominated(self.evaluations_array)}
+            self._keep(np.array([tuple(e) in on_hull for e in self.evaluations_array]))
+            return tuple(evaluation) in on_hull
+        return True
+
+    def _keep(self, mask: np.ndarray):
+        kept = int(np.count_nonzero(mask))
+        self._evaluations[:kept] = self._evaluations[: self._size][mask]
+        self._size = kept
+        self.individuals = [individual for individual, keep in zip(self.individuals, mask) if keep]
+
+
+class _NDTreeNode:
+    """Node of an ND-Tree: a leaf holds archive members, an internal node holds children, both bound their points.
+
+    An internal node keeps the ideal points of its children stacked on their nadir points in `bounds`, so an
+    evaluation is compared with all its children at once.
+    """
+
+    def __init__(self, ids: List[int], points: np.ndarray, children: Optional[list] = None):
+        self.ids = ids
+        self.points = points
+        self.children: list = []
+        self.bounds: Optional[np.ndarray] = None
+        if children:
+            self.set_children(children)
         else:
-            nd_candidates = {tuple(x) for x in filter_pareto_dominated(self.evaluations)}
-
-        # Reconstruct the pareto archive (because Non-Dominated sorting might change the order of candidates)
-        non_dominated_evals = []
-        non_dominated_evals_tuples = []
-        non_dominated_individuals = []
-        for e, i in zip(self.evaluations, self.individuals):
-            if tuple(e) in nd_candidates and tuple(e) not in non_dominated_evals_tuples:
-                non_dominated_evals.append(e)
-                non_dominated_evals_tuples.append(tuple(e))
-                non_dominated_individuals.append(i)
-        self.evaluations = non_dominated_evals
-        self.individuals = non_dominated_individuals
+            self.ideal = points.max(axis=0)
+            self.nadir = points.min(axis=0)
+
+    @property
+    def is_leaf(self) -> bool:
+        return not self.children
+
+    def set_children(self, children: list):
+        self.children = children
+        self.bounds = np.array([child.ideal for child in children] + [child.nadir for child in children])
+        self.ideal = self.bounds[: len(children)].max(axis=0)
+        self.nadir = self.bounds[len(children) :].min(axis=0)
+
+    def compare(self, evaluation: np.ndarray) -> tuple:
+        """Returns which rows of the points of a leaf, or the bounds of an internal node, weakly dominate the evaluation
+        and which ones it weakly dominates."""
+        difference = (self.points if self.is_leaf else self.bounds) - evaluation
+        return (difference >= 0).all(axis=1), (difference <= 0).all(axis=1)
+
+
+class NDTreeArchive:
+    """Pareto archive indexed by an ND-Tree, for fronts with many objectives and members.
+
+    Every node of the tree bounds its members by their ideal (largest objectives) and nadir (smallest objectives)
+    points, so a new evaluation is only compared with the members of the nodes whose bounds overlap it: a node whose
+    nadir dominates it rejects it at once, a node whose ideal it dominates is dropped at once, and a node it cannot be
+    compared with is skipped. Leaves holding more than `max_leaf_size` members are split into `n_children` leaves of
+    close members. Same interface and acceptance rules as `ParetoArchive`, plus bulk insertion, deletion, dominance
+    and nearest-member queries.
+
+    Paper: A. Jaszkiewicz and T. Lust, "ND-Tree-Based Update: A Fast Algorithm for the Dynamic Nondominance Problem," 2018.
+    """
+
+    def __init__(
+        self, max_leaf_size: int = 20, n_children: Optional[int] = None, store_candidate: Optional[Callable] = deepcopy
+    ):
+        """Initializes the ND-Tree archive.
+
+        Args:
+            max_leaf_size: Largest number of members of a leaf before it is split.
+            n_children: Number of children of a split leaf, the number of objectives plus one by default.
+            store_candidate: Function applied to an accepted candidate to get what is stored, None to store the candidate itself.
+        """
+        self.max_leaf_size = max_leaf_size
+        self.n_children = n_children
+        self.store_candidate = store_candidate
+        self.root: Optional[_NDTreeNode] = None
+        self._members: dict = {}
+        self._next_id = 0
+
+    @property
+    def evaluations(self) -> List[np.ndarray]:
+        """The evaluations of the members, in insertion order."""
+        return [evaluation.copy() for evaluation, _ in self._members.values()]
+
+    @property
+    def individuals(self) -> list:
+        """The stored candidates of the members, in the order of `evaluations`."""
+        return [individual for _, individual in self._members.values()]
+
+    @property
+    def evaluations_array(self) -> np.ndarray:
+        """The evaluations of the members as a (members, objectives) array."""
+        if not self._members:
+            return np.empty((0, 0))
+        return np.array([evaluation for evaluation, _ in self._members.values()])
+
+    def __len__(self) -> int:
+        """Number of members of the archive."""
+        return len(self._members)
+
+    def add(self, candidate, evaluation: np.ndarray) -> bool:
+        """Adds the candidate unless a member dominates or equals it, and removes the members it dominates.
+
+        Args:
+            candidate: The candidate to add.
+            evaluation: The evaluation of the candidate.
+
+        Returns:
+            Whether the candidate entered the archive.
+        """
+        evaluation = np.asarray(evaluation, dtype=np.float64)
+        if self.root is not None:
+            if (self.root.nadir >= evaluation).all():
+                return False
+            if (evaluation >= self.root.ideal).all() and (evaluation > self.root.ideal).any():
+                self._members.clear()
+                self.root = None
+            else:
+                size = len(self._members)
+                if not self._update(self.root, evaluation):
+                    return False
+                if len(self._members) < size and self._refresh(self.root):
+                    self.root = None
+
+        member_id = self._next_id
+        self._next_id += 1
+        self._members[member_id] = (
+            evaluation,
+            candidate if self.store_candidate is None else self.store_candidate(candidate),
+        )
+        if self.root is None:
+            self.root = _NDTreeNode([member_id], evaluation[None, :].copy())
+        else:
+            self._insert(member_id, evaluation)
+        return True
+
+    def add_all(self, candidates: list, evaluations: Union[np.ndarray, List]) -> int:
+        """Adds many candidates, discarding those dominated within the batch before they reach the tree.
+
+        Args:
+            candidates: The candidates to add.
+            evaluations: Their evaluations.
+
+        Returns:
+            The number of candidates that entered the archive.
+        """
+        evaluations = np.asarray(evaluations, dtype=np.float64)
+        if len(evaluations) == 0:
+            return 0
+        keep = non_dominated_mask(evaluations)
+        return sum(self.add(candidates[i], evaluations[i]) for i in np.flatnonzero(keep))
+
+    def remove(self, evaluation: np.ndarray) -> bool:
+        """Removes the member with this evaluation.
+
+        Args:
+            evaluation: The evaluation of the member.
+
+        Returns:
+            Whether a member was removed.
+        """
+        evaluation = np.asarray(evaluation, dtype=np.float64)
+        if self.root is None or not self._remove(self.root, evaluation):
+            return False
+        if self._refresh(self.root):
+            self.root = None
+        return True
+
+    def _remove(self, node: _NDTreeNode, evaluation: np.ndarray) -> bool:
+        if node.is_leaf:
+            equal = np.flatnonzero((node.points == evaluation).all(axis=1))
+            if len(equal) == 0:
+                return False
+            del self._members[node.ids.pop(int(equal[0]))]
+            node.points = np.delete(node.points, int(equal[0]), axis=0)
+            return True
+        above, below = node.compare(evaluation)
+        n_children = len(node.children)
+        for index in (above[:n_children] & below[n_children:]).nonzero()[0].tolist():
+            child = node.children[index]
+            if self._remove(child, evaluation):
+                if self._refresh(child):
+                    node.children.remove(child)
+                return True
+        return False
+
+    def is_dominated(self, evaluation: np.ndarray) -> bool:
+        """Returns whether a member dominates or equals the evaluation."""
+        evaluation = np.asarray(evaluation, dtype=np.float64)
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            above, _ = node.compare(evaluation)
+            if node.is_leaf:
+                if above.any():
+                    return True
+                continue
+            # A child whose nadir dominates or equals the evaluation answers at once, one whose ideal does is visited.
+            n_children = len(node.children)
+            if above[n_children:].any():
+                return True
+            stack.extend(node.children[index] for index in above[:n_children].nonzero()[0].tolist())
+        return False
+
+    def nearest(self, point: np.ndarray, k: int = 1) -> List[tuple]:
+        """Finds the members whose evaluations are the closest to a point, e.g. to look up the policy of a target return.
+
+        Args:
+            point: The point.
+            k: Number of members returned.
+
+        Returns:
+            Up to k (individual, evaluation) pairs, by increasing Euclidean distance.
+        """
+        point = np.asarray(point, dtype=np.float64)
+        found: list = []  # max-heap of (-distance, id) of the k closest members so far
+        queue = [(0.0, 0, self.root)] if self.root is not None else []
+        counter = 1
+        while queue:
+            bound, _, node = heapq.heappop(queue)
+            if len(found) == k and bound > -found[0][0]:
+                break
+            if node.is_leaf:
+                distances = np.linalg.norm(node.points - point, axis=1)
+                for position in np.argsort(distances)[:k].tolist():
+                    if len(found) == k and distances[position] >= -found[0][0]:
+                        break
+                    item = (-float(distances[position]), node.ids[position])
+                    if len(found) < k:
+                        heapq.heappush(found, item)
+                    else:
+                        heapq.heapreplace(found, item)
+            else:
+                ideals, nadirs = np.split(node.bounds, 2)
+                gaps = np.linalg.norm(np.maximum(np.maximum(nadirs - point, point - ideals), 0.0), axis=1)
+                for child, gap in zip(node.children, gaps.tolist()):
+                    if len(found) < k or gap < -found[0][0]:
+                        heapq.heappush(queue, (gap, counter, child))
+                        counter += 1
+        return [
+            (self._members[member_id][1], self._members[member_id][0].copy())
+            for _, member_id in sorted(found, key=lambda item: -item[0])
+        ]
+
+    def _update(self, node: _NDTreeNode, evaluation: np.ndarray) -> bool:
+        # Removes the members below the node dominated by the evaluation, returns False if one dominates or equals it.
+        # The bounds of the node overlap the evaluation; the bounds of its children are checked all at once.
+        above, below = node.compare(evaluation)
+        if node.is_leaf:
+            if above.any():
+                return False
+            if below.any():
+                for member_id in np.array(node.ids)[below].tolist():
+                    del self._members[member_id]
+                node.ids = [member_id for member_id, drop in zip(node.ids, below) if not drop]
+                node.points = node.points[~below]
+            return True
+
+        n_children = len(node.children)
+        if above[n_children:].any():
+            return False
+        covered = below[:n_children] & ~above[:n_children]
+        overlapping = above[:n_children] | below[n_children:]
+
+        emptied = []
+        for index in (covered | overlapping).nonzero()[0].tolist():
+            child = node.children[index]
+            if covered[index]:
+                self._drop(child)
+                emptied.append(index)
+                continue
+            size = len(self._members)
+            if not self._update(child, evaluation):
+                return False
+            if len(self._members) < size and self._refresh(child):
+                emptied.append(index)
+        if emptied:
+            # The bounds are rebuilt when the parent refreshes the node.
+            node.children = [child for index, child in enumerate(node.children) if index not in emptied]
+        return True
+
+    def _refresh(self, node: _NDTreeNode) -> bool:
+        # Tightens the bounds of a node after members were removed, returns whether it is empty.
+        if node.is_leaf:
+            if not node.ids:
+                return True
+            node.ideal, node.nadir = node.points.max(axis=0), node.points.min(axis=0)
+            return False
+        if not node.children:
+            return True
+        if len(node.children) == 1:
+            child = node.children[0]
+            node.ids, node.points, node.children, node.bounds = child.ids, child.points, child.children, child.bounds
+            node.ideal, node.nadir = child.ideal, child.nadir
+            return False
+        node.set_children(node.children)
+        return False
+
+    def _drop(self, node: _NDTreeNode):
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for member_id in current.ids:
+                del self._members[member_id]
+            stack.extend(current.children)
+
+    def _insert(self, member_id: int, evaluation: np.ndarray):
+        node = self.root
+        node.ideal = np.maximum(node.ideal, evaluation)
+        node.nadir = np.minimum(node.nadir, evaluation)
+        while not node.is_leaf:
+            # Descends into the child with the closest middle, widening its bounds in the parent and in the child.
+            n_children = len(node.children)
+            ideals, nadirs = node.bounds[:n_children], node.bounds[n_children:]
+            index = int(np.argmin((((ideals + nadirs) / 2 - evaluation) ** 2).sum(axis=1)))
+            np.maximum(ideals[index], evaluation, out=ideals[index])
+            np.minimum(nadirs[index], evaluation, out=nadirs[index])
+            node = node.children[index]
+            node.ideal, node.nadir = ideals[index].copy(), nadirs[index].copy()
+        node.ids.append(member_id)
+        node.points = np.vstack([node.points, evaluation])
+        if len(node.ids) > self.max_leaf_size:
+            self._split(node)
+
+    def _split(self, node: _NDTreeNode):
+        points = node.points
+        n_children = min(self.n_children or points.shape[1] + 1, len(points))
+        # Seeds spread over the leaf: the member farthest from the others, then the farthest from the seeds so far.
+        distances = np.linalg.norm(points[:, None, :] - points[None, :, :], axis=2)
+        seeds = [int(np.argmax(distances.mean(axis=1)))]
+        while len(seeds) < n_children:
+            seeds.append(int(np.argmax(distances[:, seeds].min(axis=1))))
+        assignment = np.argmin(distances[:, seeds], axis=1)
+        node.set_children([
+            _NDTreeNode([node.ids[i] for i in np.flatnonzero(assignment == child)], points[assignment == child])
+            for child in range(n_children)
+        ])
+        node.ids, node.points = [], np.empty((0, points.shape[1]))
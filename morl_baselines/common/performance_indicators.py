@@ -2,8 +2,8 @@
 
 We mostly rely on pymoo for the computation of axiomatic indicators (HV and IGD), but some are customly made.
 """
-from copy import deepcopy
-from typing import Callable, List
+from statistics import NormalDist
+from typing import Callable, List, NamedTuple, Optional
 
 import numpy as np
 import numpy.typing as npt
@@ -11,19 +11,281 @@ from pymoo.indicators.hv import HV
 from pymoo.indicators.igd import IGD
 
 
-def hypervolume(ref_point: np.ndarray, points: List[npt.ArrayLike]) -> float:
-    """Computes the hypervolume metric for a set of points (value vectors) and a reference point (from Pymoo).
+MAX_EXACT_HV_OBJECTIVES = 5
+
+
+class HypervolumeEstimate(NamedTuple):
+    """Monte Carlo estimate of the hypervolume with its standard error and confidence interval."""
+
+    value: float
+    standard_error: float
+    lower: float
+    upper: float
+
+
+def select_hypervolume_method(n_objectives: int, max_exact_objectives: int = MAX_EXACT_HV_OBJECTIVES) -> str:
+    """Selects how to compute the hypervolume from the number of objectives.
+
+    Args:
+        n_objectives: number of objectives
+        max_exact_objectives: largest number of objectives for which the exact hypervolume is computed
+
+    Returns:
+        str: "exact" or "mc"
+    """
+    return "exact" if n_objectives <= max_exact_objectives else "mc"
+
+
+def hypervolume(
+    ref_point: np.ndarray,
+    points: List[npt.ArrayLike],
+    method: str = "exact",
+    samples: int = 100_000,
+    seed: Optional[int] = None,
+) -> float:
+    """Computes the hypervolume metric for a set of points (value vectors) and a reference point.
+
+    The exact hypervolume comes from Pymoo, whose cost grows quickly with the number of objectives. The Monte Carlo
+    estimate (see `monte_carlo_hypervolume`) costs O(samples * points * objectives) in any dimension.
 
     Args:
         ref_point (np.ndarray): Reference point
         points (List[np.ndarray]): List of value vectors
+        method (str): "exact", "mc" (Monte Carlo) or "auto" (see `select_hypervolume_method`)
+        samples (int): Number of samples of the Monte Carlo estimate
+        seed (Optional[int]): Seed of the Monte Carlo samples
 
     Returns:
         float: Hypervolume metric
     """
+    if method == "auto":
+        method = select_hypervolume_method(len(ref_point))
+    if method == "mc":
+        return monte_carlo_hypervolume(ref_point, points, samples=samples, seed=seed).value
+    if method != "exact":
+        raise ValueError(f"Unknown hypervolume method {method}")
     return HV(ref_point=ref_point * -1)(np.array(points) * -1)
 
 
+def monte_carlo_hypervolume(
+    ref_point: np.ndarray,
+    points: List[npt.ArrayLike],
+    samples: int = 100_000,
+    seed: Optional[int] = None,
+    confidence: float = 0.95,
+    max_batch_elements: int = 2**22,
+) -> HypervolumeEstimate:
+    """Estimates the hypervolume by uniform sampling in the box between the reference point and the ideal point.
+
+    The hypervolume is the volume of the box times the fraction of samples dominated by at least one point. Samples
+    are processed in batches of at most `max_batch_elements` sample-point pairs to bound memory.
+
+    Args:
+        ref_point: Reference point
+        points: List of value vectors
+        samples: Number of samples
+        seed: Seed of the samples
+        confidence: Level of the confidence interval
+
+    Returns:
+        HypervolumeEstimate: value, standard error and bounds of the normal-approximation confidence interval
+    """
+    ref_point = np.asarray(ref_point, dtype=np.float64)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, len(ref_point))
+    points = points[np.all(points > ref_point, axis=1)]
+    if len(points) == 0:
+        return HypervolumeEstimate(0.0, 0.0, 0.0, 0.0)
+
+    ideal = points.max(axis=0)
+    box_volume = float(np.prod(ideal - ref_point))
+    rng = np.random.default_rng(seed)
+    batch_size = max(1, max_batch_elements // len(points))
+    dominated = 0
+    for start in range(0, samples, batch_size):
+        batch = rng.uniform(ref_point, ideal, size=(min(batch_size, samples - start), len(ref_point)))
+        # One (batch, points) mask refined objective by objective is much faster than a (batch, points, objectives) one
+        dominates = points[None, :, 0] >= batch[:, 0, None]
+        for i in range(1, len(ref_point)):
+            dominates &= points[None, :, i] >= batch[:, i, None]
+        dominated += int(np.count_nonzero(dominates.any(axis=1)))
+
+    fraction = dominated / samples
+    value = box_volume * fraction
+    standard_error = box_volume * float(np.sqrt(fraction * (1.0 - fraction) / samples))
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    return HypervolumeEstimate(
+        value, standard_error, max(0.0, value - z * standard_error), min(box_volume, value + z * standard_error)
+    )
+
+
+def _contributions_2d(points: np.ndarray, ref_point: np.ndarray, order: Optional[np.ndarray] = None) -> np.ndarray:
+    """Exclusive hypervolume contributions of points with two objectives, all dominating the reference point.
+
+    Only the points indexed by `order`, sorted by decreasing first then second objective, are taken into account
+    (all points by default); the others get 0.
+    """
+    if order is None:
+        order = np.lexsort((-points[:, 1], -points[:, 0]))
+    xs, ys = points[order, 0], points[order, 1]
+    # Sorted by decreasing first objective, a point is non-dominated iff its second objective beats all earlier ones
+    # (the later copies of a point are dominated by the first one). The front has increasing second objectives.
+    non_dominated = ys > np.maximum.accumulate(np.concatenate([[-np.inf], ys[:-1]]))
+    front = np.flatnonzero(non_dominated)
+    front_x, front_y = xs[front], ys[front]
+
+    # Without the dominated points, a front point only shares its box with its two neighbours on the front.
+    next_x = np.append(front_x[1:], ref_point[0])
+    previous_y = np.insert(front_y[:-1], 0, ref_point[1])
+    sorted_contributions = np.zeros(len(order))
+    sorted_contributions[front] = (front_x - next_x) * (front_y - previous_y)
+
+    # A dominated point matters only when a single front point dominates it: removing that point uncovers it.
+    dominated = np.flatnonzero(~non_dominated)
+    first_after = np.searchsorted(-front_x, -xs[dominated], side="right")
+    first_above = np.searchsorted(front_y, ys[dominated], side="left")
+    single = first_after - first_above == 1
+    owned = dominated[single]
+    owners, inverse = np.unique(first_above[single], return_inverse=True)
+    if len(owners):
+        # For every owner, the hypervolume of its neighbours and owned points limited to its box, all at once.
+        previous = owners[owners > 0]
+        following = owners[owners < len(front) - 1]
+        group = np.concatenate([inverse, np.searchsorted(owners, previous), np.searchsorted(owners, following)])
+        members = np.concatenate([owned, front[previous - 1], front[following + 1]])
+        x = np.minimum(xs[members], front_x[owners][group])
+        y = np.minimum(ys[members], front_y[owners][group])
+        by_group = np.lexsort((-x, group))
+        group, x, y = group[by_group], x[by_group], y[by_group]
+        # Running maximum of y restarted in every group, on integer ranks offset by the group.
+        levels, y_rank = np.unique(y, return_inverse=True)
+        offset = group * len(levels)
+        running_y = levels[np.maximum.accumulate(y_rank.reshape(-1) + offset) - offset]
+        last = np.append(group[1:] != group[:-1], True)
+        next_x = np.where(last, ref_point[0], np.append(x[1:], ref_point[0]))
+        starts = np.flatnonzero(np.insert(group[1:] != group[:-1], 0, True))
+        covered = np.add.reduceat((x - next_x) * (running_y - ref_point[1]), starts)
+        boxes = (front_x[owners] - ref_point[0]) * (front_y[owners] - ref_point[1])
+        sorted_contributions[front[owners]] = boxes - covered
+
+    contributions = np.zeros(len(points))
+    contributions[order] = sorted_contributions
+    return contributions
+
+
+def _contributions_3d(points: np.ndarray, ref_point: np.ndarray) -> np.ndarray:
+    """Exclusive hypervolume contributions of points with three objectives, all dominating the reference point.
+
+    Sweeps the third objective downwards: between two consecutive values, the exclusive contribution of a point is
+    its two-objective contribution among the points reached so far, times the thickness of the slice.
+    """
+    order = np.argsort(-points[:, 2], kind="stable")
+    rank = np.empty(len(points), dtype=np.int64)
+    rank[order] = np.arange(len(points))
+    # Sorted once on the first two objectives, the points reached by the sweep are selected without sorting again.
+    planar_order = np.lexsort((-points[:, 1], -points[:, 0]))
+    zs = np.append(points[order, 2], ref_point[2])
+    contributions = np.zeros(len(points))
+    for k in range(len(points)):
+        thickness = zs[k] - zs[k + 1]
+        if thickness > 0:
+            active = planar_order[rank[planar_order] <= k]
+            contributions += thickness * _contributions_2d(points[:, :2], ref_point[:2], order=active)
+    return contributions
+
+
+def hypervolume_contributions(
+    ref_point: np.ndarray,
+    points: List[npt.ArrayLike],
+    method: str = "auto",
+    samples: int = 100_000,
+    seed: Optional[int] = None,
+    max_batch_elements: int = 2**22,
+) -> np.ndarray:
+    """Exclusive hypervolume contribution of every point: the hypervolume lost if only this point is removed.
+
+    With two and three objectives, the exact contributions come from a sweep over the sorted points. With more
+    objectives, "exact" computes the volume of the box of every point minus the hypervolume of the other points
+    limited to that box (n hypervolume computations), and "mc" samples the box between the reference point and the
+    ideal point, crediting every sample dominated by exactly one point to that point. Dominated and duplicate points
+    contribute 0.
+
+    Args:
+        ref_point: Reference point
+        points: List of value vectors
+        method: "exact", "mc" (Monte Carlo) or "auto" (exact up to three objectives, "mc" above)
+        samples: Number of samples of the Monte Carlo estimate
+        seed: Seed of the Monte Carlo samples
+        max_batch_elements: Largest number of sample-point pairs compared at once by the Monte Carlo estimate
+
+    Returns:
+        np.ndarray: contribution of every point, in the order of `points`
+    """
+    ref_point = np.asarray(ref_point, dtype=np.float64)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, len(ref_point))
+    contributions = np.zeros(len(points))
+    inside = np.flatnonzero(np.all(points > ref_point, axis=1))
+    if len(inside) == 0:
+        return contributions
+    candidates = points[inside]
+    n_objectives = len(ref_point)
+    if method == "auto":
+        method = "exact" if n_objectives <= 3 else "mc"
+
+    if method == "exact" and n_objectives == 1:
+        best = candidates[:, 0].max()
+        others = candidates[candidates[:, 0] < best, 0]
+        winners = candidates[:, 0] == best
+        if np.count_nonzero(winners) == 1:
+            contributions[inside[winners]] = best - (others.max() if len(others) else ref_point[0])
+    elif method == "exact" and n_objectives == 2:
+        contributions[inside] = _contributions_2d(candidates, ref_point)
+    elif method == "exact" and n_objectives == 3:
+        contributions[inside] = _contributions_3d(candidates, ref_point)
+    elif method == "exact":
+        for i, point in enumerate(candidates):
+            limited = np.minimum(np.delete(candidates, i, axis=0), point)
+            limited = limited[np.all(limited > ref_point, axis=1)]
+            volume = float(np.prod(point - ref_point))
+            contributions[inside[i]] = volume - (hypervolume(ref_point, limited) if len(limited) else 0.0)
+    elif method == "mc":
+        ideal = candidates.max(axis=0)
+        box_volume = float(np.prod(ideal - ref_point))
+        rng = np.random.default_rng(seed)
+        batch_size = max(1, max_batch_elements // len(candidates))
+        counts = np.zeros(len(candidates))
+        for start in range(0, samples, batch_size):
+            batch = rng.uniform(ref_point, ideal, size=(min(batch_size, samples - start), n_objectives))
+            dominates = candidates[None, :, 0] >= batch[:, 0, None]
+            for i in range(1, n_objectives):
+                dominates &= candidates[None, :, i] >= batch[:, i, None]
+            exclusive = dominates[np.count_nonzero(dominates, axis=1) == 1]
+            counts += np.bincount(np.argmax(exclusive, axis=1), minlength=len(candidates))
+        contributions[inside] = box_volume * counts / samples
+    else:
+        raise ValueError(f"Unknown hypervolume contribution method {method}")
+    return contributions
+
+
+def hypervolume_truncate(ref_point: np.ndarray, points: List[npt.ArrayLike], size: int, **kwargs) -> np.ndarray:
+    """Selects `size` points by repeatedly discarding the point with the smallest hypervolume contribution.
+
+    Args:
+        ref_point: Reference point
+        points: List of value vectors
+        size: Number of points kept
+        **kwargs: Arguments of `hypervolume_contributions`
+
+    Returns:
+        np.ndarray: indices of the kept points, in increasing order
+    """
+    points = np.asarray(points, dtype=np.float64)
+    kept = np.arange(len(points))
+    while len(kept) > size:
+        contributions = hypervolume_contributions(ref_point, points[kept], **kwargs)
+        kept = np.delete(kept, int(np.argmin(contributions)))
+    return kept
+
+
 def igd(known_front: List[np.ndarray], current_estimate: List[np.ndarray]) -> float:
     """Inverted generational distance metric. Requires to know the optimal front.
 
@@ -52,16 +314,19 @@ def sparsity(front: List[np.ndarray]) -> float:
     if len(front) < 2:
         return 0.0
 
-    sparsity_value = 0.0
-    m = len(front[0])
-    front = np.array(front)
-    for dim in range(m):
-        objs_i = np.sort(deepcopy(front.T[dim]))
-        for i in range(1, len(objs_i)):
-            sparsity_value += np.square(objs_i[i] - objs_i[i - 1])
-    sparsity_value /= len(front) - 1
+    sorted_front = np.sort(np.array(front), axis=0)
+    return np.sum(np.square(np.diff(sorted_front, axis=0))) / (len(front) - 1)
+
+
+def _max_scalarized_values(fronts: List[List[np.ndarray]], weights_set: np.ndarray) -> np.ndarray:
+    """Largest linear utility of every front for every weight, with a single (W, d) @ (d, F) product.
 
-    return sparsity_value
+    Returns:
+        np.ndarray: array of shape (number of weights, number of fronts)
+    """
+    points = np.concatenate([np.asarray(front).reshape(len(front), -1) for front in fronts])
+    offsets = np.cumsum([0] + [len(front) for front in fronts[:-1]])
+    return np.maximum.reduceat(np.asarray(weights_set) @ points.T, offsets, axis=1)
 
 
 def expected_utility(front: List[np.ndarray], weights_set: List[np.ndarray], utility: Callable = np.dot) -> float:
@@ -79,6 +344,9 @@ def expected_utility(front: List[np.ndarray], weights_set: List[np.ndarray], uti
     Returns:
         float: eum metric
     """
+    if utility is np.dot:
+        return expected_utility_batch([front], weights_set)[0]
+
     maxs = []
     for weights in weights_set:
         scalarized_front = np.array([utility(weights, point) for point in front])
@@ -87,6 +355,19 @@ def expected_utility(front: List[np.ndarray], weights_set: List[np.ndarray], uti
     return np.mean(np.array(maxs), axis=0)
 
 
+def expected_utility_batch(fronts: List[List[np.ndarray]], weights_set: List[np.ndarray]) -> np.ndarray:
+    """Expected Utility Metric of several fronts at once, e.g. of all seeds of a sweep, with linear utility.
+
+    Args:
+        fronts: non-empty pareto fronts to compute the eum on
+        weights_set: weights to use for the utility computation
+
+    Returns:
+        np.ndarray: eum metric of every front
+    """
+    return np.mean(_max_scalarized_values(fronts, weights_set), axis=0)
+
+
 def cardinality(front: List[np.ndarray]) -> float:
     """Cardinality Metric.
 
@@ -118,7 +399,27 @@ def maximum_utility_loss(
     Returns:
         float: mul metric
     """
+    if utility is np.dot:
+        return maximum_utility_loss_batch([front], reference_set, weights_set)[0]
+
     max_scalarized_values_ref = [np.max([utility(weight, point) for point in reference_set]) for weight in weights_set]
     max_scalarized_values = [np.max([utility(weight, point) for point in front]) for weight in weights_set]
     utility_losses = [max_scalarized_values_ref[i] - max_scalarized_values[i] for i in range(len(max_scalarized_values))]
     return np.max(utility_losses)
+
+
+def maximum_utility_loss_batch(
+    fronts: List[List[np.ndarray]], reference_set: List[np.ndarray], weights_set: np.ndarray
+) -> np.ndarray:
+    """Maximum Utility Loss Metric of several fronts at once, e.g. of all seeds of a sweep, with linear utility.
+
+    Args:
+        fronts: non-empty pareto fronts to compute the mul on
+        reference_set: reference set (e.g. true Pareto front) to compute the mul on
+        weights_set: weights to use for the utility computation
+
+    Returns:
+        np.ndarray: mul metric of every front
+    """
+    max_values = _max_scalarized_values([reference_set] + list(fronts), weights_set)
+    return np.max(max_values[:, :1] - max_values[:, 1:], axis=0)
@@ -1,13 +1,15 @@
 import numpy as np
-from examples.nile_river_simulation import create_nile_river_env
+from examples.nile_river_simulation import create_nile_river_env, create_nile_river_batched_env
 from rbf import rbf_functions
+from emodps import racing
 import mo_gymnasium
 
 import examples.nile_river_simulation
 
 
 
-water_management_system = mo_gymnasium.make('nile-v0')
+# Batched envs used by run_episodes, one per population size
+batched_water_management_systems = {}
 
 
 
@@ -24,13 +26,26 @@ class TrainNile():
         self.input_max = [117500000000.00,6095000000.0,579900000.0,182700000000.0,11]
         
         self.output_max = [10000.0,15000.0,7000.0,7000.0]
+
+        # largest reward of a single step per objective, for racing; 0 for objectives that can only decrease
+        # (GERD power is normalized by its production at capacity over the longest month)
+        self.reward_bounds = np.array([1.0, 0.0, 0.0, 1.0])
             
         self.rbf = rbf
+        # built on first use, so that in worker processes it attaches to the published series
+        self._water_management_system = None
         self.time = 0
 
         
 
 
+    @property
+    def water_management_system(self):
+        '''Env simulated by this trainer'''
+        if self._water_management_system is None:
+            self._water_management_system = mo_gymnasium.make('nile-v0', info_level='none')
+        return self._water_management_system
+
     def apply_rbf_policy(self, rbf_input):
 
 
@@ -41,15 +56,18 @@ class TrainNile():
 
 
 
-    def run_episode(self, rbf_params):
+    def run_episode(self, rbf_params, race_front=None):
+        '''Simulates one policy; with race_front (objectives of an archive), the episode is abandoned as soon as a
+        front member dominates the best objectives it can still reach, returning that bound as RacedObjectives'''
 
         #reset
-        final_observation, info = water_management_system.reset()
+        final_observation, info = self.water_management_system.reset()
 
         #set the rbf parameters
         self.rbf.set_decision_vars(np.asarray(rbf_params))
 
         all_rewards = []
+        partial_rewards = np.zeros(len(self.reward_bounds))
 
         final_truncated = False
         final_terminated = False
@@ -66,10 +84,16 @@ class TrainNile():
                             final_terminated,
                             final_truncated,
                             final_info
-                        ) = water_management_system.step(action)
+                        ) = self.water_management_system.step(action)
                 
                 
                 all_rewards.append(final_reward)
+
+                if race_front is not None and t + 1 < self.timesteps:
+                    partial_rewards += final_reward
+                    bound = racing.optimistic_bound(partial_rewards, self.reward_bounds, self.timesteps - t - 1)
+                    if racing.is_dominated(bound, race_front):
+                        return racing.RacedObjectives(bound, t + 1)
             else:
                 break
 
@@ -83,3 +107,77 @@ class TrainNile():
 
         return ethiopia_power, sudan_deficit, egypt_deficit, had_min_level
 
+    def run_windows(self, rbf_params, window_starts, window_steps):
+        '''Simulates one policy on short windows of the record, each starting from the initial state; the rewards are
+        summed over all windows and scaled to the full horizon, as a cheap estimate of the objectives'''
+
+        #set the rbf parameters
+        self.rbf.set_decision_vars(np.asarray(rbf_params))
+
+        total_rewards = np.zeros(4)
+        simulated_steps = 0
+        for window_start in window_starts:
+            final_observation, info = self.water_management_system.reset(options={"start_timestep": int(window_start)})
+            for t in range(window_steps):
+                action = self.apply_rbf_policy(np.asarray(final_observation))
+                (
+                            final_observation,
+                            final_reward,
+                            final_terminated,
+                            final_truncated,
+                            final_info
+                        ) = self.water_management_system.step(action)
+                total_rewards += final_reward
+                simulated_steps += 1
+                if final_terminated or final_truncated:
+                    break
+
+        # a window must continue from a fully known state, unknown delayed flows would turn the estimate into NaN
+        if np.isnan(total_rewards).any():
+            raise ValueError(f"Windows starting at {list(window_starts)} simulated NaN rewards")
+
+        return tuple(total_rewards * self.timesteps / max(simulated_steps, 1))
+
+    def run_episodes(self, population):
+        '''Simulates all decision vectors of a population in lockstep on a batched env, returns the objectives of each'''
+
+        population = np.asarray(population)
+        population_size = len(population)
+        if population_size not in batched_water_management_systems:
+            batched_water_management_systems[population_size] = create_nile_river_batched_env(population_size)
+        batched_water_management_system = batched_water_management_systems[population_size]
+
+        #reset
+        final_observation, info = batched_water_management_system.reset()
+
+        #set the rbf parameters of all policies
+        self.rbf.set_population_decision_vars(population)
+
+        all_rewards = []
+        steps = np.zeros(population_size, dtype=int)
+        running = np.ones(population_size, dtype=bool)
+        for t in range(self.timesteps):
+            if running.any():
+
+                action = self.rbf.apply_rbfs_batch(np.asarray(final_observation))
+
+                (
+                            final_observation,
+                            final_reward,
+                            final_terminated,
+                            final_truncated,
+                            final_info
+                        ) = batched_water_management_system.step(action)
+
+                all_rewards.append(final_reward)
+                steps += running
+                running &= ~(final_terminated | final_truncated)
+            else:
+                break
+
+        # summed per policy over its own steps, exactly like run_episode
+        all_rewards = np.stack(all_rewards, axis=1)
+        return [
+            tuple(np.sum(all_rewards[policy, :steps[policy], objective]) for objective in range(4))
+            for policy in range(population_size)
+        ]
@@ -356,6 +356,331 @@ rbfs = [
 ]
 
 
+# Batched kernels, evaluating a whole population of parameter sets in one vectorized call. They compute the same
+# scores as the kernels above, the distances of the cdist based kernels are computed with NumPy.
+
+
+def _batch_differences(rbf_input, centers):
+    # P x n_rbfs x n_inputs
+    return rbf_input[:, np.newaxis, :] - centers
+
+
+def _batch_distances(rbf_input, centers):
+    # Euclidean distance between the input and every center, P x n_rbfs x 1
+    return np.sqrt(np.sum(_batch_differences(rbf_input, centers) ** 2, axis=2))[:, :, np.newaxis]
+
+
+def _batch_output(rbf_scores, weights):
+    # P x n_rbf x n_output, P x n_rbf
+    weighted_rbfs = weights * rbf_scores[:, :, np.newaxis]
+    return weighted_rbfs.sum(axis=1)
+
+
+def original_rbf_batch(rbf_input, centers, radii, weights):
+    """
+    Batched `original_rbf`, evaluating P parameter sets on P inputs at once.
+
+    Parameters
+    ----------
+    rbf_input : numpy array
+                2-D, shape is (P X n_inputs)
+    centers :   numpy array
+                3-D, shape is (P X n_rbfs X n_inputs)
+    radii :     3-D, shape is (P X n_rbfs X n_inputs)
+    weights :   3-D, shape is (P X n_rbfs X n_outputs)
+
+    Returns
+    -------
+    numpy array
+                2-D, shape is (P X n_outputs)
+
+
+    """
+    a = _batch_differences(rbf_input, centers)
+    rbf_scores = np.exp(-(np.sum(a**2 / radii**2, axis=2)))
+
+    return _batch_output(rbf_scores, weights)
+
+
+def squared_exponential_rbf_batch(rbf_input, centers, radii, weights):
+    """
+    Batched `squared_exponential_rbf`, evaluating P parameter sets on P inputs at once.
+
+    Parameters
+    ----------
+    rbf_input : numpy array
+                2-D, shape is (P X n_inputs)
+    centers :   numpy array
+                3-D, shape is (P X n_rbfs X n_inputs)
+    radii :     3-D, shape is (P X n_rbfs X n_inputs)
+    weights :   3-D, shape is (P X n_rbfs X n_outputs)
+
+    Returns
+    -------
+    numpy array
+                2-D, shape is (P X n_outputs)
+
+
+    """
+    b = _batch_distances(rbf_input, centers) ** 2
+    c = 2 * radii**2
+    rbf_scores = np.exp(-(np.sum(b / c, axis=2)))
+
+    return _batch_output(rbf_scores, weights)
+
+
+def gaussian_rbf_batch(rbf_input, centers, radii, weights):
+    """
+    Batched `gaussian_rbf`, evaluating P parameter sets on P inputs at once.
+
+    Parameters
+    ----------
+    rbf_input : numpy array
+                2-D, shape is (P X n_inputs)
+    centers :   numpy array
+                3-D, shape is (P X n_rbfs X n_inputs)
+    radii :     3-D, shape is (P X n_rbfs X n_inputs)
+    weights :   3-D, shape is (P X n_rbfs X n_outputs)
+
+    Returns
+    -------
+    numpy array
+                2-D, shape is (P X n_outputs)
+
+
+    """
+    n = _batch_differences(rbf_input, centers) / radii
+    rbf_scores = np.exp(-1 * np.sum(n**2, axis=2))
+
+    return _batch_output(rbf_scores, weights)
+
+
+def gaussian_rbf_lit_batch(rbf_input, centers, radii, weights):
+    """
+    Batched `gaussian_rbf_lit`, evaluating P parameter sets on P inputs at once.
+
+    Parameters
+    ----------
+    rbf_input : numpy array
+                2-D, shape is (P X n_inputs)
+    centers :   numpy array
+                3-D, shape is (P X n_rbfs X n_inputs)
+    radii :     3-D, shape is (P X n_rbfs X n_inputs)
+    weights :   3-D, shape is (P X n_rbfs X n_outputs)
+
+    Returns
+    -------
+    numpy array
+                2-D, shape is (P X n_outputs)
+
+
+    """
+    n = _batch_distances(rbf_input, centers) * radii
+    rbf_scores = np.exp(-1 * np.sum(n**2, axis=2))
+
+    return _batch_output(rbf_scores, weights)
+
+
+def inverse_quadratic_rbf_batch(rbf_input, centers, radii, weights):
+    """
+    Batched `inverse_quadratic_rbf`, evaluating P parameter sets on P inputs at once.
+
+    Parameters
+    ----------
+    rbf_input : numpy array
+                2-D, shape is (P X n_inputs)
+    centers :   numpy array
+                3-D, shape is (P X n_rbfs X n_inputs)
+    radii :     3-D, shape is (P X n_rbfs X n_inputs)
+    weights :   3-D, shape is (P X n_rbfs X n_outputs)
+
+    Returns
+    -------
+    numpy array
+                2-D, shape is (P X n_outputs)
+
+
+    """
+    b = _batch_distances(rbf_input, centers) / radii
+    rbf_scores = 1 / (1 + np.sum(b**2, axis=2))
+
+    return _batch_output(rbf_scores, weights)
+
+
+def inverse_quadratic_rbf_lit_batch(rbf_input, centers, radii, weights):
+    """
+    Batched `inverse_quadratic_rbf_lit`, evaluating P parameter sets on P inputs at once.
+
+    Parameters
+    ----------
+    rbf_input : numpy array
+                2-D, shape is (P X n_inputs)
+    centers :   numpy array
+                3-D, shape is (P X n_rbfs X n_inputs)
+    radii :     3-D, shape is (P X n_rbfs X n_inputs)
+    weights :   3-D, shape is (P X n_rbfs X n_outputs)
+
+    Returns
+    -------
+    numpy array
+                2-D, shape is (P X n_outputs)
+
+
+    """
+    b = _batch_distances(rbf_input, centers) * radii
+    rbf_scores = 1 / (1 + np.sum(b**2, axis=2))
+
+    return _batch_output(rbf_scores, weights)
+
+
+def inverse_multiquadric_rbf_batch(rbf_input, centers, radii, weights):
+    """
+    Batched `inverse_multiquadric_rbf`, evaluating P parameter sets on P inputs at once.
+
+    Parameters
+    ----------
+    rbf_input : numpy array
+                2-D, shape is (P X n_inputs)
+    centers :   numpy array
+                3-D, shape is (P X n_rbfs X n_inputs)
+    radii :     3-D, shape is (P X n_rbfs X n_inputs)
+    weights :   3-D, shape is (P X n_rbfs X n_outputs)
+
+    Returns
+    -------
+    numpy array
+                2-D, shape is (P X n_outputs)
+
+
+    """
+    b = (_batch_distances(rbf_input, centers) / radii) ** 2
+    rbf_scores = 1 / np.sqrt(1 + np.sum(b, axis=2))
+
+    return _batch_output(rbf_scores, weights)
+
+
+def inverse_multiquadric_rbf_lit_batch(rbf_input, centers, radii, weights):
+    """
+    Batched `inverse_multiquadric_rbf_lit`, evaluating P parameter sets on P inputs at once.
+
+    Parameters
+    ----------
+    rbf_input : numpy array
+                2-D, shape is (P X n_inputs)
+    centers :   numpy array
+                3-D, shape is (P X n_rbfs X n_inputs)
+    radii :     3-D, shape is (P X n_rbfs X n_inputs)
+    weights :   3-D, shape is (P X n_rbfs X n_outputs)
+
+    Returns
+    -------
+    numpy array
+                2-D, shape is (P X n_outputs)
+
+
+    """
+    b = (_batch_distances(rbf_input, centers) * radii) ** 2
+    rbf_scores = 1 / np.sqrt(1 + np.sum(b, axis=2))
+
+    return _batch_output(rbf_scores, weights)
+
+
+def exponential_rbf_batch(rbf_input, centers, radii, weights):
+    """
+    Batched `exponential_rbf`, evaluating P parameter sets on P inputs at once.
+
+    Parameters
+    ----------
+    rbf_input : numpy array
+                2-D, shape is (P X n_inputs)
+    centers :   numpy array
+                3-D, shape is (P X n_rbfs X n_inputs)
+    radii :     3-D, shape is (P X n_rbfs X n_inputs)
+    weights :   3-D, shape is (P X n_rbfs X n_outputs)
+
+    Returns
+    -------
+    numpy array
+                2-D, shape is (P X n_outputs)
+
+
+    """
+    b = _batch_distances(rbf_input, centers) / radii
+    rbf_scores = np.exp(-1 * np.sum(b, axis=2))
+
+    return _batch_output(rbf_scores, weights)
+
+
+def matern32_rbf_batch(rbf_input, centers, radii, weights):
+    """
+    Batched `matern32_rbf`, evaluating P parameter sets on P inputs at once.
+
+    Parameters
+    ----------
+    rbf_input : numpy array
+                2-D, shape is (P X n_inputs)
+    centers :   numpy array
+                3-D, shape is (P X n_rbfs X n_inputs)
+    radii :     3-D, shape is (P X n_rbfs X n_inputs)
+    weights :   3-D, shape is (P X n_rbfs X n_outputs)
+
+    Returns
+    -------
+    numpy array
+                2-D, shape is (P X n_outputs)
+
+
+    """
+    distances = _batch_distances(rbf_input, centers)
+    sqrt = np.sqrt(3) * np.sum(distances / radii, axis=2)
+    rbf_scores = (1 + sqrt) * (np.exp(-sqrt))
+
+    return _batch_output(rbf_scores, weights)
+
+
+def matern52_rbf_batch(rbf_input, centers, radii, weights):
+    """
+    Batched `matern52_rbf`, evaluating P parameter sets on P inputs at once.
+
+    Parameters
+    ----------
+    rbf_input : numpy array
+                2-D, shape is (P X n_inputs)
+    centers :   numpy array
+                3-D, shape is (P X n_rbfs X n_inputs)
+    radii :     3-D, shape is (P X n_rbfs X n_inputs)
+    weights :   3-D, shape is (P X n_rbfs X n_outputs)
+
+    Returns
+    -------
+    numpy array
+                2-D, shape is (P X n_outputs)
+
+
+    """
+    distances = _batch_distances(rbf_input, centers)
+    sqrt = np.sqrt(5) * np.sum(distances / radii, axis=2)
+    sq = 5 * np.sum(np.square(distances) / 3 * np.square(radii), axis=2)
+    rbf_scores = (1 + sqrt + sq) * (np.exp(-sqrt))
+
+    return _batch_output(rbf_scores, weights)
+
+
+batched_rbfs = {
+    original_rbf: original_rbf_batch,
+    squared_exponential_rbf: squared_exponential_rbf_batch,
+    gaussian_rbf: gaussian_rbf_batch,
+    gaussian_rbf_lit: gaussian_rbf_lit_batch,
+    inverse_quadratic_rbf: inverse_quadratic_rbf_batch,
+    inverse_quadratic_rbf_lit: inverse_quadratic_rbf_lit_batch,
+    inverse_multiquadric_rbf: inverse_multiquadric_rbf_batch,
+    inverse_multiquadric_rbf_lit: inverse_multiquadric_rbf_lit_batch,
+    exponential_rbf: exponential_rbf_batch,
+    matern32_rbf: matern32_rbf_batch,
+    matern52_rbf: matern52_rbf_batch,
+}
+
+
 class RBF:
     def __init__(
         self, n_rbfs, n_inputs, n_outputs, rbf_function=squared_exponential_rbf
@@ -391,6 +716,10 @@ class RBF:
         self.radii = None
         self.weights = None
 
+        self.population_centers = None
+        self.population_radii = None
+        self.population_weights = None
+
     def set_decision_vars(self, decision_vars):
         decision_vars = decision_vars.copy()
 
@@ -406,6 +735,47 @@ class RBF:
 
         return outputs
 
+    def set_population_decision_vars(self, decision_vars):
+        """
+        Sets the parameters of P policies at once, for `apply_rbfs_batch`.
+
+        Parameters
+        ----------
+        decision_vars : numpy array
+                        2-D, shape is (P X n_decision_vars), one row per policy
+        """
+        decision_vars = np.array(decision_vars, dtype=float)
+        population_size = decision_vars.shape[0]
+
+        self.population_centers = decision_vars[:, self.c_i].reshape((population_size, self.n_rbfs, self.n_inputs))
+        self.population_radii = decision_vars[:, self.r_i].reshape((population_size, self.n_rbfs, self.n_inputs))
+        self.population_weights = decision_vars[:, self.w_i].reshape((population_size, self.n_rbfs, self.n_outputs))
+
+        # sum of weights per input is 1
+        self.population_weights /= self.population_weights.sum(axis=1)[:, np.newaxis, :]
+
+    def apply_rbfs_batch(self, inputs):
+        """
+        Applies the P policies set by `set_population_decision_vars`, each to its own input.
+
+        Parameters
+        ----------
+        inputs : numpy array
+                 2-D, shape is (P X n_inputs)
+
+        Returns
+        -------
+        numpy array
+                 2-D, shape is (P X n_outputs)
+        """
+        if self.rbf not in batched_rbfs:
+            raise ValueError(f"There is no batched version of {self.rbf.__name__}.")
+        outputs = batched_rbfs[self.rbf](
+            inputs, self.population_centers, self.population_radii, self.population_weights
+        )
+
+        return outputs
+
 
 # def multiquadric_rbf(rbf_input, centers, radii, weights):
 #     """
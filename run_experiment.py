@@ -7,14 +7,23 @@ import random
 
 from platypus.core import Problem
 from platypus.algorithms import EpsNSGAII
-from platypus.evaluator import ProcessPoolEvaluator
 from nile_rbf import TrainNile
 from susquehanna_rbf import TrainSusquehanna
+import mo_gymnasium
+from core.utils.shared_series import SharedSeries, series_fingerprint
+from emodps.cache import ObjectiveCache
+from emodps.checkpoint import Checkpointer
+from emodps.evaluator import WarmPoolEvaluator
+from emodps.fidelity import MultiFidelityEvaluator, select_windows
+from emodps.hypervolume import HypervolumeTracker
+from emodps.surrogate import SurrogateEvaluator
+from emodps.islands import IslandModel
+from emodps.progress import ProgressStore
 
 from rbf import rbf_functions
 import csv
 import argparse
-from morl_baselines.common.performance_indicators import hypervolume, sparsity, cardinality
+from morl_baselines.common.performance_indicators import sparsity, cardinality
 import wandb
 
 def parse_args():
@@ -28,17 +37,61 @@ def parse_args():
     parser.add_argument("--wandb_entity", type=str,help="WANDB entity", default='osikaz')
     parser.add_argument(
     "--ref-point", type=float, nargs="+", help="Reference point to use for the hypervolume calculation", required=True)
-
-
-    return parser.parse_args()
+    parser.add_argument("--workers", type=int, help="Number of evaluator worker processes", default=None)
+    parser.add_argument("--chunk-size", type=str, help="Decision vectors sent to a worker at once, or 'auto'", default="auto")
+    parser.add_argument("--batch-episodes", action="store_true", help="Simulate the decision vectors of a chunk in lockstep")
+    parser.add_argument("--islands", type=int, help="Number of EpsNSGAII islands running in parallel", default=1)
+    parser.add_argument("--migration-interval", type=int, help="NFE of an island between two migrations", default=1000)
+    parser.add_argument("--race", action="store_true", help="Abandon episodes that provably cannot enter the archive")
+    parser.add_argument("--screen-windows", type=int, help="Number of short windows candidates are screened on before a full simulation (0 disables screening)", default=0)
+    parser.add_argument("--window-steps", type=int, help="Steps of a screening window, defaults to a twentieth of the horizon", default=None)
+    parser.add_argument("--surrogate-fraction", type=float, help="Fraction of offspring simulated after surrogate screening (0 disables screening)", default=0.0)
+    parser.add_argument("--surrogate-exploration", type=float, help="Fraction of offspring simulated at random despite the surrogate", default=0.1)
+    parser.add_argument("--checkpoint-interval", type=int, help="NFE between two checkpoints, 5000 by default (0 disables checkpoints)", default=None)
+    parser.add_argument("--resume", action="store_true", help="Continue from the latest checkpoint in the output directory")
+    parser.add_argument("--objective-cache", action="store_true", help="Reuse the objectives of decision vectors already simulated")
+    parser.add_argument("--objective-cache-dir", type=str, help="Directory sharing cached objectives across runs", default=None)
+    parser.add_argument("--hv-max-exact-dimension", type=int, help="Largest number of objectives with an exact hypervolume", default=5)
+    parser.add_argument("--hv-max-exact-size", type=int, help="Largest archive with an exact hypervolume", default=1000)
+    parser.add_argument("--hv-samples", type=int, help="Samples of the hypervolume estimate beyond the exact limits", default=100000)
+
+    args = parser.parse_args()
+
+    if args.islands > 1:
+        # Islands run their own EpsNSGAII and evaluators, which support none of these features.
+        unsupported = [
+            flag
+            for flag, used in (
+                ("--race", args.race),
+                ("--screen-windows", args.screen_windows > 0),
+                ("--surrogate-fraction", args.surrogate_fraction > 0),
+                ("--batch-episodes", args.batch_episodes),
+                ("--objective-cache", args.objective_cache),
+                ("--objective-cache-dir", args.objective_cache_dir is not None),
+                ("--checkpoint-interval", args.checkpoint_interval),
+                ("--resume", args.resume),
+            )
+            if used
+        ]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} cannot be used with --islands")
+    if args.screen_windows > 0 and args.surrogate_fraction > 0:
+        # Both screen the candidates in their own evaluator, only one of them can evaluate the run.
+        parser.error("--screen-windows cannot be used with --surrogate-fraction")
+    if args.checkpoint_interval is None:
+        args.checkpoint_interval = 0 if args.islands > 1 else 5000
+
+    return args
 
 
 class TrackProgress:
-    def __init__(self, n_obj, env, epsilons, nfes, seed, ref_point):
+    def __init__(self, n_obj, env, epsilons, nfes, seed, ref_point, cache=None, hv_tracker=None, store=None):
         self.nfe = []
+        self.cache = cache
         self.improvements = []
-        self.objectives = {}
+        self.objectives = store or ProgressStore(n_obj)
         self.ref_point = ref_point
+        self.hv_tracker = hv_tracker or HypervolumeTracker(ref_point, seed=seed)
         wandb.init(project="MORL4Water", entity='osikaz', name=f'{env}_{n_obj}_{nfes}_EMODPS_{epsilons}_{seed}', config={
             "algorithm": "EMODPS-EpsNSGAII",
             "num_of_obj": n_obj,
@@ -48,13 +101,10 @@ class TrackProgress:
     def __call__(self, algorithm):
         self.nfe.append(algorithm.nfe)
         self.improvements.append(algorithm.archive.improvements)
-        temp = {}
-        objectives = []
-        for i, solution in enumerate(algorithm.archive):
-            temp[i] = np.array(solution.objectives)
-            objectives.append(solution.objectives)
+        objectives = [solution.objectives for solution in algorithm.archive]
+        self.objectives.record(algorithm.nfe, objectives)
         if algorithm.nfe%1000==0:
-            hv = hypervolume(ref_point=np.array(self.ref_point), points=objectives)
+            hv = self.hv_tracker.update(objectives)
             sp = sparsity(objectives)
             cd = cardinality(objectives)
 
@@ -63,16 +113,25 @@ class TrackProgress:
                 
                 "Hypervolume": hv,
                 "Sparsity": sp,
-                "Cardinality": cd
+                "Cardinality": cd,
+                **({"Hypervolume standard error": self.hv_tracker.standard_error} if not self.hv_tracker.exact else {}),
+                **({"Objective cache hit rate": self.cache.hit_rate} if self.cache is not None else {})
             }, step=algorithm.nfe)
-        
-        self.objectives[algorithm.nfe] = pd.DataFrame.from_dict(temp, orient="index")
+
+    def get_state(self):
+        return dict(nfe=list(self.nfe), improvements=list(self.improvements), objectives=self.objectives.get_state())
+
+    def set_state(self, state):
+        self.nfe = list(state["nfe"])
+        self.improvements = list(state["improvements"])
+        self.objectives.set_state(state["objectives"])
+        self.hv_tracker.reset()
 
     def to_dataframe(self):
         df_imp = pd.DataFrame.from_dict(
             dict(nfe=self.nfe, improvements=self.improvements)
         )
-        df_hv = pd.concat(self.objectives, axis=0)
+        df_hv = self.objectives.to_dataframe()
         return df_imp, df_hv
 
 
@@ -105,31 +164,41 @@ def store_results(algorithm, track_progress, output_dir, rbf_name, seed_id):
             writer.writerow(solution.variables)
 
     # save progress info
-    df_conv, df_hv = track_progress.to_dataframe()
+    df_conv = pd.DataFrame.from_dict(dict(nfe=track_progress.nfe, improvements=track_progress.improvements))
     df_conv.to_csv(f"{output_dir}/{seed_id}_convergence.csv")
-    df_hv.to_csv(f"{output_dir}/{seed_id}_hypervolume.csv")
-
-
-def main():
-    args = parse_args()
-    print(args)
+    # Streamed from the progress store, so the archives of all NFE are never held in memory at once.
+    track_progress.objectives.to_csv(f"{output_dir}/{seed_id}_hypervolume.csv")
 
 
-    random.seed(args.seed)
-
+def create_trainer(water_sim):
     # RBF parameters - function to predict releases
-    if args.water_sim=='nile':
+    if water_sim=='nile':
         n_inputs = 5  # (storage in 4 reservoirs, month)
         n_outputs = 4
         n_rbfs = 9
         rbf = rbf_functions.RBF(n_rbfs, n_inputs, n_outputs, rbf_function=rbf_functions.original_rbf)
-        reservoir = TrainNile(rbf, 240)
-    elif args.water_sim=='susquehanna':
+        return TrainNile(rbf, 240)
+    elif water_sim=='susquehanna':
         n_inputs = 2  # (time, storage of Conowingo)
         n_outputs = 4
         n_rbfs = 6
         rbf = rbf_functions.RBF(n_rbfs, n_inputs, n_outputs, rbf_function=rbf_functions.original_rbf)
-        reservoir = TrainSusquehanna(rbf, 2190)
+        return TrainSusquehanna(rbf, 2190)
+    raise ValueError(f"Unknown water simulation {water_sim}")
+
+
+def main():
+    args = parse_args()
+    print(args)
+
+
+    random.seed(args.seed)
+
+    reservoir = create_trainer(args.water_sim)
+    rbf = reservoir.rbf
+    # Env of the main process, whose series are published to the workers; the trainers build their own envs lazily,
+    # after publishing, so that they attach to the shared series.
+    env = mo_gymnasium.make(f"{args.water_sim}-v0", info_level='none')
 
 
 
@@ -148,12 +217,84 @@ def main():
     for objective in range(n_objectives):
         problem.directions[objective] = Problem.MAXIMIZE 
 
-    track_progress = TrackProgress(n_obj=n_objectives, env=args.water_sim, epsilons=epsilons, nfes=args.nfes, seed=args.seed, ref_point=args.ref_point)
-
+    cache = None
+    if args.objective_cache or args.objective_cache_dir is not None:
+        # Keyed by the series of the basin, the horizon and the policy and screening settings, so cached objectives
+        # are only reused for the same rollout.
+        scenario_id = f"{series_fingerprint(env.unwrapped.water_systems)}-{reservoir.timesteps}"
+        config = dict(
+            n_rbfs=rbf.n_rbfs, n_inputs=rbf.n_inputs, n_outputs=rbf.n_outputs, rbf_function=rbf.rbf.__name__,
+            input_min=list(reservoir.input_min), input_max=list(reservoir.input_max),
+            output_max=list(reservoir.output_max), horizon=reservoir.timesteps,
+            screen_windows=args.screen_windows, window_steps=args.window_steps,
+        )
+        cache = ObjectiveCache(env.spec.id, scenario_id, config=config, directory=args.objective_cache_dir)
 
-    with ProcessPoolEvaluator() as evaluator:
-        algorithm = EpsNSGAII(problem, epsilons=epsilons, evaluator=evaluator)
-        algorithm.run(args.nfes, track_progress)
+    hv_tracker = HypervolumeTracker(
+        args.ref_point, max_exact_dimension=args.hv_max_exact_dimension, max_exact_size=args.hv_max_exact_size,
+        n_samples=args.hv_samples, seed=args.seed,
+    )
+    store = ProgressStore(n_objectives, directory=f"{args.directory}/{args.seed}_progress")
+    track_progress = TrackProgress(n_obj=n_objectives, env=args.water_sim, epsilons=epsilons, nfes=args.nfes, seed=args.seed, ref_point=args.ref_point, cache=cache, hv_tracker=hv_tracker, store=store)
+
+
+    # Workers attach to the inflow and demand series published here instead of holding their own copies.
+    chunk_size = args.chunk_size if args.chunk_size == "auto" else int(args.chunk_size)
+    if args.islands > 1:
+        with SharedSeries(env.unwrapped.water_systems):
+            algorithm = IslandModel(
+                problem, epsilons, args.islands, migration_interval=args.migration_interval, seed=args.seed,
+                create_trainer=create_trainer, create_trainer_args=(args.water_sim,),
+                workers_per_island=(args.workers or os.cpu_count() or 1) // args.islands,
+            )
+            algorithm.run(args.nfes, track_progress)
+    else:
+        evaluator_kwargs = dict(
+            create_trainer_args=(args.water_sim,), n_workers=args.workers, chunk_size=chunk_size,
+            batch_episodes=args.batch_episodes, cache=cache,
+        )
+        with SharedSeries(env.unwrapped.water_systems):
+            # The workers start with the evaluator, after the series are published.
+            if args.screen_windows > 0:
+                window_steps = args.window_steps or reservoir.timesteps // 20
+                window_starts = select_windows(env.unwrapped.water_systems, reservoir.timesteps, window_steps, args.screen_windows)
+                evaluator = MultiFidelityEvaluator(create_trainer, window_starts, window_steps, **evaluator_kwargs)
+            elif args.surrogate_fraction > 0:
+                evaluator = SurrogateEvaluator(
+                    create_trainer, fraction=args.surrogate_fraction, exploration=args.surrogate_exploration, **evaluator_kwargs
+                )
+            else:
+                evaluator = WarmPoolEvaluator(create_trainer, **evaluator_kwargs)
+
+            checkpointer = Checkpointer(
+                f"{args.directory}/{args.seed}_checkpoints", interval=args.checkpoint_interval or args.nfes,
+                components={"track_progress": track_progress},
+            )
+
+            def callback(algorithm):
+                track_progress(algorithm)
+                if args.checkpoint_interval > 0:
+                    checkpointer(algorithm)
+
+            with evaluator, checkpointer:
+                algorithm = EpsNSGAII(problem, epsilons=epsilons, evaluator=evaluator)
+                if args.resume:
+                    checkpointer.restore(algorithm)
+                if args.race:
+                    unbounded = np.flatnonzero(~np.isfinite(reservoir.reward_bounds))
+                    if len(unbounded):
+                        # An objective without a bound makes every optimistic bound undominated.
+                        logging.warning(
+                            "Objectives %s have no bound on their reward per step, no episode can be abandoned",
+                            unbounded.tolist(),
+                        )
+                    evaluator.race_against(algorithm)
+                if args.screen_windows > 0 or args.surrogate_fraction > 0:
+                    evaluator.screen_against(algorithm)
+                algorithm.run(args.nfes - algorithm.nfe, callback)
+                evaluator.log_stats()
+                if cache is not None:
+                    logging.info("Objective cache hit rate: %.1f%%", 100 * cache.hit_rate)
 
     store_results(
         algorithm, track_progress, args.directory, "rbf_original", args.seed
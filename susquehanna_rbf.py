@@ -1,12 +1,29 @@
 import numpy as np
-from examples.susquehanna_river_simulation import create_susquehanna_river_env
+from examples.susquehanna_river_simulation import create_susquehanna_river_env, create_susquehanna_river_batched_env
 import mo_gymnasium
+from emodps import racing
+from core.utils.data_cache import load_data
+from scipy.constants import g
 
 import examples.susquehanna_river_simulation
 
 
 
-water_management_system = mo_gymnasium.make('susquehanna-v0')
+# Batched envs used by run_episodes, one per population size
+batched_water_management_systems = {}
+
+
+
+def energy_revenue_bound(power_plant, timesteps):
+    '''Largest normalized energy revenue of a single step, following PowerPlant.determine_production_detailed: the
+    turbines at capacity under the largest head (highest reservoir level above the lowest tailwater level), over the
+    longest timestep and at the highest energy price'''
+    prices = load_data(examples.susquehanna_river_simulation.data_directory / "reservoirs" / "avg_energy_prices.txt")
+    turbine_flow = min(power_plant.max_turbine_flow, np.sum(power_plant.turbines[0]))
+    head = max(0.0, np.max(power_plant.reservoir.storage_to_level_rel[1]) - np.min(power_plant.tailwater[1]))
+    power = power_plant.efficiency * g * 1000 * (0.0283 * turbine_flow) * (0.3048 * head) * 3600 / (3600 * 1000)
+    timestep_hours = max(power_plant.calendar.seconds(timestep) for timestep in range(timesteps)) / 3600
+    return power * timestep_hours * max(np.max(prices), 0.0) / power_plant.normalize_objective
 
 
 
@@ -21,11 +38,34 @@ class TrainSusquehanna():
         self.input_min = []
         self.input_max = [self.timesteps, 120.0]
         self.output_max = [41.302169, 464.16667, 54.748458, 85412]
+
         self.rbf = rbf
+        # derived from the env on first use, see reward_bounds
+        self._reward_bounds = None
+        # built on first use, so that in worker processes it attaches to the published series
+        self._water_management_system = None
 
         
 
 
+    @property
+    def water_management_system(self):
+        '''Env simulated by this trainer'''
+        if self._water_management_system is None:
+            self._water_management_system = mo_gymnasium.make('susquehanna-v0', info_level='none')
+        return self._water_management_system
+
+    @property
+    def reward_bounds(self):
+        '''Largest reward of a single step per objective, for racing; 0 for objectives that can only decrease'''
+        if self._reward_bounds is None:
+            power_plant = next(
+                water_system for water_system in self.water_management_system.unwrapped.water_systems
+                if getattr(water_system, "objective_name", "") == "energy_revenue"
+            )
+            self._reward_bounds = np.array([1.0, energy_revenue_bound(power_plant, self.timesteps), 1.0, 1.0, 1.0, 0.0])
+        return self._reward_bounds
+
     def apply_rbf_policy(self, rbf_input):
 
         # apply rbf
@@ -35,16 +75,19 @@ class TrainSusquehanna():
 
 
 
-    def run_episode(self, rbf_params):
+    def run_episode(self, rbf_params, race_front=None):
+        '''Simulates one policy; with race_front (objectives of an archive), the episode is abandoned as soon as a
+        front member dominates the best objectives it can still reach, returning that bound as RacedObjectives'''
 
 
         #reset
-        final_observation, info = water_management_system.reset()
+        final_observation, info = self.water_management_system.reset()
 
         #set the rbf parameters
         self.rbf.set_decision_vars(np.asarray(rbf_params))
 
         all_rewards = []
+        partial_rewards = np.zeros(len(self.reward_bounds))
 
         #initial level
         final_terminated = False
@@ -62,9 +105,15 @@ class TrainSusquehanna():
                             final_terminated,
                             final_truncated,
                             final_info
-                        ) = water_management_system.step(action)
+                        ) = self.water_management_system.step(action)
                 
                 all_rewards.append(final_reward)
+
+                if race_front is not None and t + 1 < self.timesteps:
+                    partial_rewards += final_reward
+                    bound = racing.optimistic_bound(partial_rewards, self.reward_bounds, self.timesteps - t - 1)
+                    if racing.is_dominated(bound, race_front):
+                        return racing.RacedObjectives(bound, t + 1)
             else:
                 break
 
@@ -79,4 +128,77 @@ class TrainSusquehanna():
 
         return recreation, energy_revenue, baltimore, atomic, chester, environment
 
+    def run_windows(self, rbf_params, window_starts, window_steps):
+        '''Simulates one policy on short windows of the record, each starting from the initial state; the rewards are
+        summed over all windows and scaled to the full horizon, as a cheap estimate of the objectives'''
+
+        #set the rbf parameters
+        self.rbf.set_decision_vars(np.asarray(rbf_params))
+
+        total_rewards = np.zeros(6)
+        simulated_steps = 0
+        for window_start in window_starts:
+            final_observation, info = self.water_management_system.reset(options={"start_timestep": int(window_start)})
+            for t in range(window_steps):
+                action = self.apply_rbf_policy(np.asarray(final_observation))
+                (
+                            final_observation,
+                            final_reward,
+                            final_terminated,
+                            final_truncated,
+                            final_info
+                        ) = self.water_management_system.step(action)
+                total_rewards += final_reward
+                simulated_steps += 1
+                if final_terminated or final_truncated:
+                    break
+
+        # a window must continue from a fully known state, unknown delayed flows would turn the estimate into NaN
+        if np.isnan(total_rewards).any():
+            raise ValueError(f"Windows starting at {list(window_starts)} simulated NaN rewards")
+
+        return tuple(total_rewards * self.timesteps / max(simulated_steps, 1))
+
+    def run_episodes(self, population):
+        '''Simulates all decision vectors of a population in lockstep on a batched env, returns the objectives of each'''
+
+        population = np.asarray(population)
+        population_size = len(population)
+        if population_size not in batched_water_management_systems:
+            batched_water_management_systems[population_size] = create_susquehanna_river_batched_env(population_size)
+        batched_water_management_system = batched_water_management_systems[population_size]
+
+        #reset
+        final_observation, info = batched_water_management_system.reset()
+
+        #set the rbf parameters of all policies
+        self.rbf.set_population_decision_vars(population)
+
+        all_rewards = []
+        steps = np.zeros(population_size, dtype=int)
+        running = np.ones(population_size, dtype=bool)
+        for t in range(self.timesteps):
+            if running.any():
+
+                action = self.rbf.apply_rbfs_batch(np.asarray(final_observation))
+
+                (
+                            final_observation,
+                            final_reward,
+                            final_terminated,
+                            final_truncated,
+                            final_info
+                        ) = batched_water_management_system.step(action)
+
+                all_rewards.append(final_reward)
+                steps += running
+                running &= ~(final_terminated | final_truncated)
+            else:
+                break
 
+        # summed per policy over its own steps, exactly like run_episode
+        all_rewards = np.stack(all_rewards, axis=1)
+        return [
+            tuple(np.sum(all_rewards[policy, :steps[policy], objective]) for objective in range(6))
+            for policy in range(population_size)
+        ]